@@ -0,0 +1,131 @@
+"""
+Times every command's own format and parse on their own, without the event tree around them, reported as calls per
+second. Commands whose format and parse are generated from a spec are marked as such, so a run saved with --output
+from before a command got one can be compared against one from after.
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, List, Tuple
+
+from gbstoolkit.dsl.command import COMMANDS
+from gbstoolkit.dsl.marshalling import JsonSafe
+from gbstoolkit.dsl.util import NameUtil, NodeData
+
+from .events import setup_scene
+from .generate import ProjectGenerator, ScriptContext
+
+OPERATIONS = ["format", "parse"]
+
+
+def sample_args(gen: ProjectGenerator, ctx: ScriptContext, samples: int) -> Dict[str, List[JsonSafe]]:
+    """
+    A few different sets of args for every command, made up the same way the generator fills in scripts. Switches and
+    custom event calls are left out, since the event code handles half of what goes in their KDL.
+    """
+    ret = {}
+    for command in sorted(COMMANDS.keys()):
+        info = COMMANDS[command].info
+        if command in ["", "EVENT_END"] or info.is_switch or info.is_custom_event_call:
+            continue
+        ret[command] = [gen.make_event(ctx, command, 0).get("args") for _ in range(samples)]
+    return ret
+
+
+def best_rate(run, calls: int, repeat: int, fresh=None) -> float:
+    best = None
+    for _ in range(repeat):
+        given = fresh() if fresh is not None else None
+        start = time.perf_counter()
+        run(given)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return calls / best if best > 0 else 0.0
+
+
+def time_commands(samples: Dict[str, List[JsonSafe]], names: NameUtil, loops: int,
+                  repeat: int) -> Dict[str, Dict[str, float]]:
+    ret = {}
+    for command, all_args in samples.items():
+        cls = COMMANDS[command]
+        calls = len(all_args) * loops
+
+        def format_all(_):
+            for _ in range(loops):
+                for args in all_args:
+                    cls.format(args, names)
+
+        def fresh_nodes() -> List[NodeData]:
+            # parse is allowed to eat into the node it's given, so every run gets its own, shaped like the ones event
+            # parsing hands it (which always have a list of children, even an empty one)
+            ret = []
+            for _ in range(loops):
+                for args in all_args:
+                    data = cls.format(args, names)
+                    ret.append(NodeData(data.props, data.args, data.children if data.children is not None else []))
+            return ret
+
+        def parse_all(nodes: List[NodeData]):
+            for data in nodes:
+                cls.parse(data, names)
+
+        ret[command] = {
+            "spec": getattr(cls, "spec", None) is not None,
+            "format": best_rate(format_all, calls, repeat),
+            "parse": best_rate(parse_all, calls, repeat, fresh_nodes),
+        }
+    return ret
+
+
+def totals(results: Dict[str, Dict[str, float]], commands: List[str]) -> Tuple[float, float]:
+    """Calls per second over every command in `commands`, one call each, for format and parse."""
+    return tuple(len(commands) / sum(1 / results[i][op] for i in commands) if len(commands) > 0 else 0.0
+                 for op in OPERATIONS)
+
+
+def change(rate: float, old: float) -> str:
+    if old <= 0:
+        return ""
+    return ("+" if rate >= old else "") + str(round((rate / old - 1) * 100)) + "%"
+
+
+def print_results(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]] = None):
+    print("command".ljust(36) + "spec" + "format/s".rjust(12) + "parse/s".rjust(20))
+    for command, result in results.items():
+        line = command.ljust(36) + ("yes" if result["spec"] else "").ljust(4)
+        for op in OPERATIONS:
+            old = baseline[command][op] if baseline is not None and command in baseline else 0.0
+            line += str(round(result[op])).rjust(12) + change(result[op], old).rjust(8)
+        print(line)
+    spec = [i for i, result in results.items() if result["spec"]]
+    for label, commands in [("all commands", list(results.keys())), ("commands with a spec", spec)]:
+        rates = totals(results, commands)
+        old_rates = (0.0, 0.0)
+        if baseline is not None and all(i in baseline for i in commands):
+            old_rates = totals(baseline, commands)
+        line = (label + " (" + str(len(commands)) + ")").ljust(40)
+        for rate, old in zip(rates, old_rates):
+            line += str(round(rate)).rjust(12) + change(rate, old).rjust(8)
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark format and parse for every command on its own")
+    parser.add_argument("--samples", type=int, default=20, help="Different sets of args made up for every command")
+    parser.add_argument("--loops", type=int, default=50, help="Times every set of args is run through per sample")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Runs per command, the fastest one is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, help="Save the results as JSON")
+    parser.add_argument("--compare", type=str, help="Compare against results saved with --output")
+    args = parser.parse_args()
+    gen, ctx, names = setup_scene(args.seed)
+    results = time_commands(sample_args(gen, ctx, args.samples), names, args.loops, args.repeat)
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+    print_results(results, baseline)
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=4)
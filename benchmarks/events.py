@@ -0,0 +1,117 @@
+"""
+Microbenchmarks for the event tree code on its own: format, parse, serialize, deserialize, protofy and deprotofy,
+reported as event nodes per second.
+"""
+
+import argparse
+import time
+from typing import Callable, Dict, List, Tuple
+
+from gbstoolkit.dsl.event import Event
+from gbstoolkit.dsl.marshalling import JsonSafe, serialize
+from gbstoolkit.dsl.project import Project
+from gbstoolkit.dsl.util import BufferedProgressTracker, NameUtil
+
+from .generate import GeneratorConfig, ProjectGenerator, ScriptContext
+
+OPERATIONS = ["format", "parse", "serialize", "deserialize", "protofy", "deprotofy"]
+
+NESTING_COMMANDS = ["EVENT_IF_TRUE", "EVENT_LOOP", "EVENT_GROUP", "EVENT_SWITCH"]
+
+
+def deep_script(gen: ProjectGenerator, ctx: ScriptContext, depth: int, width: int) -> List[JsonSafe]:
+    """`width` events at every level, plus one if/loop/group/switch holding the next level, `depth` levels down."""
+    # built top down, so there's no limit on how deep it can go
+    levels = [[]]
+    for level in range(depth, -1, -1):
+        script = levels[-1]
+        script.extend(gen.make_event(ctx, gen.commands[(gen.next_command + i) % len(gen.commands)], 0)
+                      for i in range(width))
+        gen.next_command = (gen.next_command + width) % len(gen.commands)
+        if level > 0:
+            nest = gen.make_event(ctx, NESTING_COMMANDS[level % len(NESTING_COMMANDS)], 0)
+            first = next(iter(nest["children"].keys()))
+            nest["children"][first] = []
+            script.append(nest)
+            levels.append(nest["children"][first])
+    # the innermost level gets closed off first
+    for script in reversed(levels):
+        script.append(gen.event("EVENT_END", None))
+    return levels[0]
+
+
+def count_nodes(events: List[Event]) -> int:
+    ret = 0
+    stack = [events]
+    while len(stack) > 0:
+        for event in stack.pop():
+            ret += 1
+            if event.children is not None:
+                stack.extend(event.children.values())
+    return ret
+
+
+def setup_scene(seed: int) -> Tuple[ProjectGenerator, ScriptContext, NameUtil]:
+    """A small generated project with one formatted scene, for making up events that only use what's in it."""
+    gen = ProjectGenerator(GeneratorConfig(scenes=1, actors=4, triggers=0, custom_events=2, depth=1, seed=seed))
+    obj = gen.generate()
+    project = Project.deserialize(obj)
+    progress = BufferedProgressTracker()
+    _, names = project.format(progress)
+    for event in project.custom_events:
+        names.add_event_script(str(event.id), event.name, [i.protofy() for i in event.script])
+    scene = project.scenes[0]
+    _, scene_names = scene.format(names, progress)
+    ctx = ScriptContext(gen, ["player", "$self$"] + [str(i.id) for i in scene.actors], False)
+    return gen, ctx, scene_names
+
+
+def setup(depth: int, width: int, seed: int):
+    gen, ctx, scene_names = setup_scene(seed)
+    script = deep_script(gen, ctx, depth, width)
+    return script, scene_names
+
+
+def time_operations(script: List[JsonSafe], names: NameUtil, repeat: int,
+                    operations: List[str]) -> Dict[str, float]:
+    progress = BufferedProgressTracker()
+    events = [Event.deserialize(i) for i in script]
+    protos = [i.protofy() for i in events]
+    nodes = count_nodes(events)
+    runs: Dict[str, Callable[[], object]] = {
+        "format": lambda: [i.format(names) for i in events],
+        "serialize": lambda: serialize(events),
+        "deserialize": lambda: [Event.deserialize(i) for i in script],
+        "protofy": lambda: [i.protofy() for i in events],
+        "deprotofy": lambda: [Event.deprotofy(i) for i in protos],
+    }
+    ret = {}
+    for operation in operations:
+        best = None
+        for _ in range(repeat):
+            if operation == "parse":
+                # parsing eats into the nodes it's given, so every run gets a fresh set
+                kdl_nodes = [i.format(names) for i in events]
+                start = time.perf_counter()
+                [Event.parse(i, names, progress) for i in kdl_nodes]
+            else:
+                start = time.perf_counter()
+                runs[operation]()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        ret[operation] = nodes / best if best > 0 else 0.0
+    return ret
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the event tree operations on one deeply nested script")
+    parser.add_argument("--depth", type=int, default=100, help="How many blocks deep the script nests")
+    parser.add_argument("--width", type=int, default=20, help="Events at every level of nesting")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Runs per operation, the fastest one is reported")
+    parser.add_argument("--operations", type=str, nargs="+", choices=OPERATIONS, default=OPERATIONS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    script, names = setup(args.depth, args.width, args.seed)
+    print("depth " + str(args.depth) + ", " + str(count_nodes([Event.deserialize(i) for i in script])) + " nodes")
+    for operation, rate in time_operations(script, names, args.repeat, args.operations).items():
+        print(operation.ljust(12) + str(round(rate)).rjust(10) + " nodes/sec")
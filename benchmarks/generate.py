@@ -0,0 +1,480 @@
+"""
+Builds synthetic .gbsproj files to benchmark against, with every registered command showing up in the scripts.
+"""
+
+import argparse
+from dataclasses import dataclass
+import json
+import random
+from typing import Callable, Dict, List, Optional
+from uuid import UUID
+
+from gbstoolkit.dsl.command import COMMANDS
+from gbstoolkit.dsl.marshalling import JsonSafe
+
+TIMESTAMP = 1600000000000
+
+
+@dataclass
+class GeneratorConfig:
+    scenes: int = 20
+    actors: int = 6
+    triggers: int = 4
+    custom_events: int = 4
+    depth: int = 2  # how deep if/loop/switch blocks nest inside each other
+    events: int = 12  # events in each script block, not counting the ones nested inside it
+    plugins: float = 0.0  # share of events that are plugin commands, on top of the one that's always cycled through
+    seed: int = 0
+
+
+class ScriptContext:
+    """What a script is allowed to point at: the actors in its scene (or custom event), and the project's assets."""
+
+    def __init__(self, gen: "ProjectGenerator", actors: List[str], in_custom_event: bool):
+        self.gen = gen
+        self.rng = gen.rng
+        self.actors = actors
+        self.in_custom_event = in_custom_event
+
+    def actor(self) -> str:
+        return self.rng.choice(self.actors)
+
+    def variable(self) -> str:
+        return self.rng.choice(self.gen.variable_ids)
+
+    def sprite(self) -> str:
+        return self.rng.choice(self.gen.sprite_sheets)["id"]
+
+    def palette(self) -> str:
+        return self.rng.choice(self.gen.palettes)["id"]
+
+    def scene(self) -> str:
+        return self.rng.choice(self.gen.scene_ids)
+
+    def song(self) -> str:
+        return self.rng.choice(self.gen.music)["id"]
+
+    def number(self, low: int = 0, high: int = 31) -> int:
+        return self.rng.randint(low, high)
+
+    def flag(self) -> bool:
+        return self.rng.random() < 0.5
+
+    def union_number(self) -> Dict[str, JsonSafe]:
+        if self.rng.random() < 0.25:
+            return {"type": "variable", "value": self.variable()}
+        return {"type": "number", "value": self.number()}
+
+    def direction(self) -> str:
+        return self.rng.choice(["up", "down", "left", "right"])
+
+    def inputs(self) -> List[str]:
+        return self.rng.sample(["a", "b", "up", "down", "left", "right", "start", "select"], self.rng.randint(1, 3))
+
+    def text(self) -> str:
+        return self.rng.choice(["Hello there!", "It's dangerous to go alone.", "Press A to continue",
+                                "You found a key!", "The door is locked.", "Welcome back, $00$"])
+
+
+def _flags(ctx: ScriptContext) -> Dict[str, JsonSafe]:
+    ret = {"variable": ctx.variable()}
+    for i in range(8):
+        ret["flag" + str(i + 1)] = ctx.flag()
+    return ret
+
+
+def _if_args(ctx: ScriptContext) -> Dict[str, JsonSafe]:
+    return {"__collapseElse": False, "__disableElse": ctx.rng.random() < 0.2}
+
+
+def _menu(ctx: ScriptContext) -> Dict[str, JsonSafe]:
+    items = ctx.number(2, 6)
+    ret = {"variable": ctx.variable(), "items": items}
+    for i in range(items):
+        ret["option" + str(i + 1)] = "Option " + str(i + 1)
+    ret.update({"cancelOnB": ctx.flag(), "layout": ctx.rng.choice(["menu", "dialogue"]),
+                "cancelOnLastOption": ctx.flag()})
+    return ret
+
+
+def _variable_math(ctx: ScriptContext) -> Dict[str, JsonSafe]:
+    ret = {"vectorX": ctx.variable(), "operation": ctx.rng.choice(["set", "add", "sub", "mul", "div", "mod"])}
+    other = ctx.rng.choice(["val", "var", "rnd"])
+    ret["other"] = other
+    if other == "val":
+        ret["value"] = ctx.number(0, 255)
+    elif other == "var":
+        ret["vectorY"] = ctx.variable()
+    else:
+        ret["minValue"] = ctx.number(0, 10)
+        ret["maxValue"] = ctx.number(11, 255)
+    ret["clamp"] = ctx.flag()
+    return ret
+
+
+def _sound(ctx: ScriptContext) -> Dict[str, JsonSafe]:
+    type = ctx.rng.choice(["beep", "tone", "crash"])
+    ret = {"type": type}
+    if type == "beep":
+        ret["pitch"] = ctx.number(1, 8)
+    elif type == "tone":
+        ret["frequency"] = ctx.number(100, 2000)
+    ret.update({"duration": ctx.number(0, 2), "wait": ctx.flag()})
+    return ret
+
+
+def _text(ctx: ScriptContext) -> Dict[str, JsonSafe]:
+    if ctx.rng.random() < 0.3:
+        text = [ctx.text() for _ in range(ctx.number(2, 4))]
+    else:
+        text = ctx.text()
+    ret = {"text": text}
+    if ctx.rng.random() < 0.5:
+        ret["avatarId"] = ctx.sprite()
+    return ret
+
+
+def _engine_field(ctx: ScriptContext) -> Dict[str, JsonSafe]:
+    if ctx.rng.random() < 0.3:
+        return {"engineFieldKey": "fade_style", "value": {"type": "number", "value": ctx.number(0, 1)}}
+    key = ctx.rng.choice(["plat_walk_vel", "plat_run_vel", "plat_jump_vel", "plat_grav", "topdown_grid"])
+    return {"engineFieldKey": key, "value": ctx.union_number()}
+
+
+def _projectile(ctx: ScriptContext) -> Dict[str, JsonSafe]:
+    return {"spriteSheetId": ctx.sprite(), "actorId": ctx.actor(),
+            "direction": {"type": "direction", "value": ctx.direction()}, "speed": ctx.number(1, 4),
+            "collisionGroup": str(ctx.number(1, 3)), "collisionMask": ["player"]}
+
+
+def _weapon(ctx: ScriptContext) -> Dict[str, JsonSafe]:
+    return {"spriteSheetId": ctx.sprite(), "actorId": ctx.actor(),
+            "direction": {"type": "direction", "value": ctx.direction()}, "offset": ctx.number(0, 16),
+            "collisionGroup": str(ctx.number(1, 3)), "collisionMask": ["1", "2"]}
+
+
+# Realistic arguments for every command, in the shape GB Studio saves them
+ARGS: Dict[str, Callable[[ScriptContext], Optional[Dict[str, JsonSafe]]]] = {
+    "EVENT_ACTOR_COLLISIONS_DISABLE": lambda ctx: {"actorId": ctx.actor()},
+    "EVENT_ACTOR_COLLISIONS_ENABLE": lambda ctx: {"actorId": ctx.actor()},
+    "EVENT_ACTOR_EMOTE": lambda ctx: {"actorId": ctx.actor(), "emoteId": str(ctx.number(0, 7))},
+    "EVENT_ACTOR_GET_DIRECTION": lambda ctx: {"actorId": ctx.actor(), "direction": ctx.variable()},
+    "EVENT_ACTOR_GET_POSITION": lambda ctx: {"actorId": ctx.actor(), "vectorX": ctx.variable(),
+                                             "vectorY": ctx.variable()},
+    "EVENT_ACTOR_HIDE": lambda ctx: {"actorId": ctx.actor()},
+    "EVENT_ACTOR_INVOKE": lambda ctx: {"actorId": ctx.actor()},
+    "EVENT_ACTOR_MOVE_RELATIVE": lambda ctx: {"actorId": ctx.actor(), "x": ctx.number(-8, 8), "y": ctx.number(-8, 8),
+                                              "moveType": "horizontal", "useCollisions": ctx.flag()},
+    "EVENT_ACTOR_MOVE_TO": lambda ctx: {"actorId": ctx.actor(), "x": ctx.union_number(), "y": ctx.union_number(),
+                                        "moveType": ctx.rng.choice(["horizontal", "vertical", "diagonal"]),
+                                        "useCollisions": ctx.flag()},
+    "EVENT_ACTOR_PUSH": lambda ctx: {"continue": ctx.flag()},
+    "EVENT_ACTOR_SET_ANIMATE": lambda ctx: {"actorId": ctx.actor(), "animate": ctx.flag()},
+    "EVENT_ACTOR_SET_ANIMATION_SPEED": lambda ctx: {"actorId": ctx.actor(), "animSpeed": ctx.number(0, 4)},
+    "EVENT_ACTOR_SET_DIRECTION": lambda ctx: {"actorId": ctx.actor(),
+                                              "direction": {"type": "direction", "value": ctx.direction()}},
+    "EVENT_ACTOR_SET_FRAME": lambda ctx: {"actorId": ctx.actor(), "frame": ctx.union_number()},
+    "EVENT_ACTOR_SET_MOVEMENT_SPEED": lambda ctx: {"actorId": ctx.actor(), "speed": ctx.number(0, 4)},
+    "EVENT_ACTOR_SET_POSITION": lambda ctx: {"actorId": ctx.actor(), "x": ctx.union_number(),
+                                             "y": ctx.union_number()},
+    "EVENT_ACTOR_SET_POSITION_RELATIVE": lambda ctx: {"actorId": ctx.actor(), "x": ctx.number(-8, 8),
+                                                      "y": ctx.number(-8, 8)},
+    "EVENT_ACTOR_SET_SPRITE": lambda ctx: {"actorId": ctx.actor(), "spriteSheetId": ctx.sprite()},
+    "EVENT_ACTOR_SHOW": lambda ctx: {"actorId": ctx.actor()},
+    "EVENT_ACTOR_STOP_UPDATE": lambda ctx: {"actorId": ctx.actor()},
+    "EVENT_ADD_FLAGS": _flags,
+    "EVENT_AWAIT_INPUT": lambda ctx: {"input": ctx.inputs()},
+    "EVENT_CAMERA_LOCK": lambda ctx: {"speed": ctx.number(0, 5)},
+    "EVENT_CAMERA_MOVE_TO": lambda ctx: {"x": ctx.number(), "y": ctx.number(), "speed": ctx.number(0, 5)},
+    "EVENT_CAMERA_SHAKE": lambda ctx: {"time": 0.5, "shakeDirection": ctx.rng.choice(["horizontal", "vertical"])},
+    "EVENT_CHOICE": lambda ctx: {"variable": ctx.variable(), "trueText": "Yes", "falseText": "No"},
+    "EVENT_CLEAR_FLAGS": _flags,
+    "EVENT_COMMENT": lambda ctx: {"text": "TODO: " + ctx.text()},
+    "EVENT_DATA_CLEAR": lambda ctx: None,
+    "EVENT_DEC_VALUE": lambda ctx: {"variable": ctx.variable()},
+    "EVENT_DEFINE_LABEL": lambda ctx: {"label": str(ctx.number(1, 8))},
+    "EVENT_ENGINE_FIELD_SET": _engine_field,
+    "EVENT_ENGINE_FIELD_STORE": lambda ctx: {"engineFieldKey": "plat_jump_vel", "value": ctx.variable()},
+    "EVENT_GOTO_LABEL": lambda ctx: {"label": str(ctx.number(1, 8))},
+    "EVENT_GROUP": lambda ctx: None,
+    "EVENT_IF_ACTOR_AT_POSITION": lambda ctx: dict(_if_args(ctx), actorId=ctx.actor(), x=ctx.number(), y=ctx.number()),
+    "EVENT_IF_ACTOR_DIRECTION": lambda ctx: dict(_if_args(ctx), actorId=ctx.actor(), direction=ctx.direction()),
+    "EVENT_IF_ACTOR_RELATIVE_TO_ACTOR": lambda ctx: dict(_if_args(ctx), actorId=ctx.actor(),
+                                                         operation=ctx.direction(), otherActorId=ctx.actor()),
+    "EVENT_IF_COLOR_SUPPORTED": _if_args,
+    "EVENT_IF_FALSE": lambda ctx: dict(_if_args(ctx), variable=ctx.variable()),
+    "EVENT_IF_FLAGS_COMPARE": lambda ctx: dict(_if_args(ctx), variable=ctx.variable(), flag=ctx.number(0, 7)),
+    "EVENT_IF_INPUT": lambda ctx: dict(_if_args(ctx), input=ctx.inputs()),
+    "EVENT_IF_SAVED_DATA": _if_args,
+    "EVENT_IF_TRUE": lambda ctx: dict(_if_args(ctx), variable=ctx.variable()),
+    "EVENT_IF_VALUE": lambda ctx: dict(_if_args(ctx), variable=ctx.variable(),
+                                       operator=ctx.rng.choice(["==", "!=", "<", ">", "<=", ">="]),
+                                       comparator=ctx.number(0, 255)),
+    "EVENT_IF_VALUE_COMPARE": lambda ctx: dict(_if_args(ctx), vectorX=ctx.variable(),
+                                               operation=ctx.rng.choice(["==", "!=", "<", ">"]),
+                                               vectorY=ctx.variable()),
+    "EVENT_INC_VALUE": lambda ctx: {"variable": ctx.variable()},
+    "EVENT_LAUNCH_PROJECTILE": _projectile,
+    "EVENT_LOAD_DATA": lambda ctx: None,
+    "EVENT_LOOP": lambda ctx: None,
+    "EVENT_MENU": _menu,
+    "EVENT_MUSIC_PLAY": lambda ctx: {"musicId": ctx.song(), "loop": ctx.flag()},
+    "EVENT_MUSIC_STOP": lambda ctx: None,
+    "EVENT_OVERLAY_HIDE": lambda ctx: None,
+    "EVENT_OVERLAY_MOVE_TO": lambda ctx: {"x": ctx.number(0, 20), "y": ctx.number(0, 18), "speed": ctx.number(0, 5)},
+    "EVENT_OVERLAY_SHOW": lambda ctx: {"color": ctx.rng.choice(["black", "white"]), "x": ctx.number(0, 20),
+                                       "y": ctx.number(0, 18)},
+    "EVENT_PALETTE_SET_BACKGROUND": lambda ctx: {"palette" + str(i): ctx.palette() if ctx.flag() else ""
+                                                 for i in range(6)},
+    "EVENT_PALETTE_SET_UI": lambda ctx: {"palette": ctx.palette()},
+    "EVENT_PLAYER_BOUNCE": lambda ctx: {"height": ctx.rng.choice(["low", "medium", "high"])},
+    "EVENT_PLAYER_SET_SPRITE": lambda ctx: {"spriteSheetId": ctx.sprite(), "persist": ctx.flag()},
+    "EVENT_REMOVE_INPUT_SCRIPT": lambda ctx: {"input": ctx.inputs()},
+    "EVENT_RESET_VARIABLES": lambda ctx: None,
+    "EVENT_SAVE_DATA": lambda ctx: None,
+    "EVENT_SCENE_POP_ALL_STATE": lambda ctx: {"fadeSpeed": str(ctx.number(1, 4))},
+    "EVENT_SCENE_POP_STATE": lambda ctx: {"fadeSpeed": str(ctx.number(1, 4))},
+    "EVENT_SCENE_PUSH_STATE": lambda ctx: None,
+    "EVENT_SCENE_RESET_STATE": lambda ctx: None,
+    "EVENT_SET_FALSE": lambda ctx: {"variable": ctx.variable()},
+    "EVENT_SET_FLAGS": _flags,
+    "EVENT_SET_INPUT_SCRIPT": lambda ctx: {"input": ctx.inputs(), "persist": ctx.flag()},
+    "EVENT_SET_TIMER_SCRIPT": lambda ctx: {"duration": 10.0, "scriptTabs": "end"},
+    "EVENT_SET_TRUE": lambda ctx: {"variable": ctx.variable()},
+    "EVENT_SET_VALUE": lambda ctx: {"variable": ctx.variable(), "value": ctx.union_number()},
+    "EVENT_SOUND_PLAY_EFFECT": _sound,
+    "EVENT_SPRITES_HIDE": lambda ctx: None,
+    "EVENT_SPRITES_SHOW": lambda ctx: None,
+    "EVENT_STOP": lambda ctx: None,
+    "EVENT_SWITCH_SCENE": lambda ctx: {"sceneId": ctx.scene(), "x": ctx.number(0, 19), "y": ctx.number(0, 17),
+                                       "direction": ctx.direction(), "fadeSpeed": ctx.number(1, 4)},
+    "EVENT_TEXT": _text,
+    "EVENT_TEXT_SET_ANIMATION_SPEED": lambda ctx: {"speedIn": ctx.number(0, 5), "speedOut": ctx.number(0, 5),
+                                                   "speed": ctx.number(0, 5), "allowFastForward": ctx.flag()},
+    "EVENT_TIMER_DISABLE": lambda ctx: None,
+    "EVENT_TIMER_RESTART": lambda ctx: None,
+    "EVENT_VARIABLE_MATH": _variable_math,
+    "EVENT_WAIT": lambda ctx: {"time": ctx.rng.choice([0.25, 0.5, 1.0, 2.0])},
+    "EVENT_WEAPON_ATTACK": _weapon,
+}
+
+# Commands from made-up plugins, which the toolkit doesn't know and has to fall back on writing out as they are
+PLUGINS: Dict[str, Callable[[ScriptContext], Dict[str, JsonSafe]]] = {
+    "EVENT_PLUGIN_SCREEN_SHAKE": lambda ctx: {"intensity": ctx.number(1, 5), "frames": [ctx.number(), ctx.number()],
+                                              "options": {"loop": ctx.flag()}},
+    "EVENT_PLUGIN_SET_TILE": lambda ctx: {"x": ctx.union_number(), "y": ctx.union_number(),
+                                          "tileIndex": ctx.number(0, 255), "sceneId": ctx.scene()},
+    "EVENT_PLUGIN_PLAY_EFFECT": lambda ctx: {"effect": ctx.rng.choice(["explosion", "sparkle", "smoke"]),
+                                             "priority": ctx.number(0, 3),
+                                             "channels": [ctx.flag(), ctx.flag(), ctx.flag(), ctx.flag()],
+                                             "wait": ctx.flag()},
+    "EVENT_PLUGIN_ACTOR_TINT": lambda ctx: {"actorId": ctx.actor(), "frames": ctx.number(1, 60),
+                                            "color": {"r": ctx.number(), "g": ctx.number(), "b": ctx.number()},
+                                            "text": ctx.text(), "__collapse": False},
+}
+
+
+class ProjectGenerator:
+    """
+    Builds a .gbsproj-shaped dict. Scripts cycle through every command in `COMMANDS` (plus a plugin command, to hit
+    the fallback path), so even a small project exercises every format and parse function at least once.
+    """
+
+    def __init__(self, config: GeneratorConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.commands = [i for i in sorted(COMMANDS.keys()) if i not in ["", "EVENT_END"]]
+        self.commands.append("EVENT_PLUGIN_SCREEN_SHAKE")
+        self.next_command = 0
+        self.variable_ids = [str(i) for i in range(64)] + ["L0", "L1", "T0"]
+        self.backgrounds = [self.asset("background", i, {"width": 20, "height": 18, "imageWidth": 160,
+                                                         "imageHeight": 144}) for i in range(4)]
+        self.sprite_sheets = [self.asset("sprite", i, {"numFrames": 3, "type": "actor"}) for i in range(6)]
+        self.music = [self.asset("song", i, {"settings": {}}) for i in range(3)]
+        self.palettes = [{"id": "default-bg-" + str(i), "name": "", "colors": ["E8F8E0", "B0F088", "509878", "202850"],
+                          "defaultName": "Default BG " + str(i),
+                          "defaultColors": ["E8F8E0", "B0F088", "509878", "202850"]} for i in range(1, 7)]
+        self.palettes.extend({"id": self.uuid(), "name": "Custom " + str(i),
+                              "colors": ["F8E8C8", "D89048", "A82820", "301850"]} for i in range(3))
+        self.scene_ids = [self.uuid() for _ in range(max(config.scenes, 1))]
+        self.custom_events = []
+
+    def uuid(self) -> str:
+        return str(UUID(int=self.rng.getrandbits(128), version=4))
+
+    def asset(self, kind: str, index: int, fields: Dict[str, JsonSafe]) -> Dict[str, JsonSafe]:
+        ret = {"id": self.uuid(), "name": kind + "-" + str(index), "filename": kind + "-" + str(index) + ".png"}
+        ret.update(fields)
+        ret["_v"] = TIMESTAMP
+        return ret
+
+    def event(self, command: str, args: Optional[Dict[str, JsonSafe]],
+              children: Optional[Dict[str, List[JsonSafe]]] = None) -> Dict[str, JsonSafe]:
+        ret = {"id": self.uuid(), "command": command}
+        if args is not None:
+            ret["args"] = args
+        if children is not None:
+            ret["children"] = children
+        return ret
+
+    def script(self, ctx: ScriptContext, depth: int) -> List[JsonSafe]:
+        ret = []
+        for _ in range(self.config.events):
+            if self.config.plugins > 0 and self.rng.random() < self.config.plugins:
+                ret.append(self.make_event(ctx, self.rng.choice(sorted(PLUGINS.keys())), depth))
+                continue
+            command = self.commands[self.next_command]
+            self.next_command = (self.next_command + 1) % len(self.commands)
+            ret.append(self.make_event(ctx, command, depth))
+        ret.append(self.event("EVENT_END", None))
+        return ret
+
+    def block(self, ctx: ScriptContext, depth: int) -> List[JsonSafe]:
+        if depth <= 0:
+            return [self.event("EVENT_END", None)]
+        return self.script(ctx, depth - 1)
+
+    def make_event(self, ctx: ScriptContext, command: str, depth: int) -> Dict[str, JsonSafe]:
+        if command == "EVENT_SWITCH":
+            choices = ctx.number(2, 4)
+            args = {"variable": ctx.variable(), "choices": choices}
+            children = {}
+            for i in range(choices):
+                args["value" + str(i)] = i
+                args["__collapseCase" + str(i)] = False
+                children["true" + str(i)] = self.block(ctx, depth)
+            args["__collapseElse"] = False
+            args["__disableElse"] = False
+            children["false"] = self.block(ctx, depth)
+            return self.event(command, args, children)
+        if command == "EVENT_CALL_CUSTOM_EVENT":
+            if ctx.in_custom_event or len(self.custom_events) == 0:
+                return self.event("EVENT_COMMENT", {"text": "No custom event to call here"})
+            custom_event = self.rng.choice(self.custom_events)
+            args = {"customEventId": custom_event["id"], "__name": custom_event["name"]}
+            for k in custom_event["variables"].keys():
+                args["$variable[" + k + "]$"] = ctx.variable()
+            for k in custom_event["actors"].keys():
+                args["$actor[" + k + "]$"] = ctx.actor()
+            script = [dict(i, id=self.uuid()) for i in custom_event["script"]]
+            return self.event(command, args, {"script": script})
+        if command in PLUGINS:
+            return self.event(command, PLUGINS[command](ctx))
+        args = ARGS[command](ctx)
+        children_names = COMMANDS[command].children_names()
+        if children_names is None or command == "EVENT_REMOVE_INPUT_SCRIPT":
+            return self.event(command, args)
+        if args is not None and args.get("__disableElse"):
+            children_names = [i for i in children_names if i != "false"]
+        return self.event(command, args, {k: self.block(ctx, depth) for k in children_names})
+
+    def custom_event(self, index: int) -> Dict[str, JsonSafe]:
+        variables = {str(i): {"id": str(i), "name": "Variable " + chr(ord("A") + i)} for i in range(2)}
+        actors = {str(i): {"id": str(i), "name": "Actor " + chr(ord("A") + i)} for i in range(2)}
+        ctx = ScriptContext(self, ["player", "$self$"] + list(actors.keys()), True)
+        return {"id": self.uuid(), "name": "Custom Event " + str(index), "description": "Generated for benchmarks",
+                "variables": variables, "actors": actors, "script": self.script(ctx, self.config.depth)}
+
+    def collisions(self, tiles: int) -> List[int]:
+        return [self.rng.choice([0, 0, 0, 0, 15, 1, 2, 4, 8, 16]) for _ in range(tiles)]
+
+    def tile_colors(self, tiles: int) -> List[int]:
+        return [self.rng.choice([0, 0, 0, 1, 2, 7]) for _ in range(tiles)]
+
+    def scene(self, index: int) -> Dict[str, JsonSafe]:
+        width = self.rng.choice([20, 32, 40])
+        height = self.rng.choice([18, 24, 32])
+        actors = []
+        for i in range(self.config.actors):
+            actors.append({
+                "id": self.uuid(), "name": "Actor " + str(i) if i % 4 != 3 else "",
+                "spriteSheetId": self.rng.choice(self.sprite_sheets)["id"], "spriteType": "static", "frame": 0,
+                "x": self.rng.randint(0, width - 2), "y": self.rng.randint(1, height - 1),
+                "movementType": self.rng.choice(["static", "randomWalk", "faceInteraction"]),
+                "direction": self.rng.choice(["up", "down", "left", "right"]), "moveSpeed": 1, "animSpeed": 3,
+                "collisionGroup": ""
+            })
+        actor_ids = ["player", "$self$"] + [i["id"] for i in actors]
+        ctx = ScriptContext(self, actor_ids, False)
+        for actor in actors:
+            actor["script"] = self.script(ctx, self.config.depth)
+            actor["startScript"] = self.script(ctx, 0) if self.rng.random() < 0.3 else []
+            actor["updateScript"] = []
+            actor["hit1Script"] = []
+            actor["hit2Script"] = []
+            actor["hit3Script"] = []
+        triggers = []
+        for i in range(self.config.triggers):
+            triggers.append({"id": self.uuid(), "name": "", "x": self.rng.randint(0, width - 2),
+                             "y": self.rng.randint(0, height - 2), "width": 2, "height": 1,
+                             "script": self.script(ctx, self.config.depth)})
+        return {
+            "id": self.scene_ids[index], "name": "Scene " + str(index) if index % 5 != 4 else "",
+            "backgroundId": self.rng.choice(self.backgrounds)["id"], "type": "0",
+            "x": (index % 10) * 200, "y": (index // 10) * 200, "width": width, "height": height,
+            "paletteIds": [self.palettes[0]["id"], None, self.palettes[-1]["id"]],
+            "actors": actors, "triggers": triggers, "script": self.script(ctx, self.config.depth),
+            "playerHit1Script": [], "playerHit2Script": [], "playerHit3Script": [],
+            "collisions": self.collisions(width * height),
+            "tileColors": self.tile_colors(width * height)
+        }
+
+    def generate(self) -> Dict[str, JsonSafe]:
+        for i in range(self.config.custom_events):
+            self.custom_events.append(self.custom_event(i))
+        scenes = [self.scene(i) for i in range(self.config.scenes)]
+        return {
+            "name": "Benchmark", "author": "gbstoolkit", "_version": "2", "_release": "3",
+            "scenes": scenes, "backgrounds": self.backgrounds, "spriteSheets": self.sprite_sheets,
+            "palettes": self.palettes, "customEvents": self.custom_events, "music": self.music,
+            "variables": [{"id": str(i), "name": "Variable " + str(i)} for i in range(0, 64, 4)],
+            "settings": {
+                "startSceneId": self.scene_ids[0], "playerSpriteSheetId": self.sprite_sheets[0]["id"],
+                "startX": 1, "startY": 1, "startDirection": "down", "showCollisions": True, "showConnections": True,
+                "worldScrollX": 0, "worldScrollY": 0, "zoom": 100, "customColorsEnabled": False,
+                "defaultBackgroundPaletteIds": [i["id"] for i in self.palettes[:6]],
+                "defaultSpritePaletteId": self.palettes[0]["id"], "defaultUIPaletteId": self.palettes[1]["id"],
+                "playerPaletteId": self.palettes[0]["id"]
+            }
+        }
+
+
+def generate_project(config: GeneratorConfig) -> Dict[str, JsonSafe]:
+    # Fallback registers itself under an empty name, and switches and custom event calls get built specially
+    missing = [i for i in COMMANDS.keys() if i not in ARGS and i not in ["", "EVENT_END", "EVENT_SWITCH",
+                                                                          "EVENT_CALL_CUSTOM_EVENT"]]
+    if len(missing) > 0:
+        raise RuntimeError("No sample arguments for " + ", ".join(missing) + "! Add them to benchmarks/generate.py")
+    return ProjectGenerator(config).generate()
+
+
+def write_project(config: GeneratorConfig, path: str):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(generate_project(config), file, indent=4)
+
+
+def add_config_args(parser: argparse.ArgumentParser):
+    defaults = GeneratorConfig()
+    parser.add_argument("--scenes", type=int, default=defaults.scenes)
+    parser.add_argument("--actors", type=int, default=defaults.actors, help="Actors per scene")
+    parser.add_argument("--triggers", type=int, default=defaults.triggers, help="Triggers per scene")
+    parser.add_argument("--custom-events", type=int, default=defaults.custom_events)
+    parser.add_argument("--depth", type=int, default=defaults.depth, help="How deep event blocks nest")
+    parser.add_argument("--events", type=int, default=defaults.events, help="Events per script block")
+    parser.add_argument("--plugins", type=float, default=defaults.plugins,
+                        help="Share of events that are plugin commands, from 0 to 1")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_args(args: argparse.Namespace) -> GeneratorConfig:
+    return GeneratorConfig(scenes=args.scenes, actors=args.actors, triggers=args.triggers,
+                           custom_events=args.custom_events, depth=args.depth, events=args.events,
+                           plugins=args.plugins, seed=args.seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic .gbsproj file for benchmarking")
+    parser.add_argument("file", type=str, help="The .gbsproj file to write")
+    add_config_args(parser)
+    args = parser.parse_args()
+    write_project(config_from_args(args), args.file)
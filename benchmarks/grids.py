@@ -0,0 +1,171 @@
+"""
+Times writing out a scene's collisions and tile colors as KDL, for scenes of different sizes: tile by tile the way
+it's done for grids that aren't plain ints, with the byte table, and with NumPy if it's installed. Every run includes
+printing the documents, since that's what the time goes into when they're written out.
+
+Then compares writing them a tile at a time with writing them as rectangles and as rows, by how big the files are
+and how long they take to write and parse, both on the generator's maps (noise, about the worst case for rectangles)
+and on ones drawn in blocks, the way real maps are.
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, List, Tuple
+
+import kdl
+
+from gbstoolkit.dsl import grid
+from gbstoolkit.dsl.scene import Scene
+from gbstoolkit.dsl.util import BufferedProgressTracker
+
+from .generate import GeneratorConfig, ProjectGenerator
+
+SIZES = [(20, 18), (32, 32), (64, 64), (128, 128), (255, 255)]
+METHODS = ["by tile", "bytes", "numpy"]
+MAPS = ["noise", "drawn"]
+
+
+class GridScene:
+    """Just what Scene._format_grids_by_tile looks at."""
+
+    def __init__(self, name: str, width: int, height: int, collisions: List[int], tile_colors: List[int]):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.collisions = collisions
+        self.tile_colors = tile_colors
+
+
+def by_tile(scene: GridScene) -> Tuple[str, str]:
+    collisions, tile_colors = Scene._format_grids_by_tile(scene, BufferedProgressTracker())
+    return str(collisions), str(tile_colors)
+
+
+def drawn_map(rng: random.Random, width: int, height: int) -> Tuple[List[int], List[int]]:
+    """Collisions and tile colors like a map drawn by hand: walls around it, platforms, blocks and ladders."""
+    collisions = [0 for _ in range(width * height)]
+    tile_colors = [0 for _ in range(width * height)]
+
+    def fill(values: List[int], x: int, y: int, w: int, h: int, value: int):
+        for row in range(y, min(y + h, height)):
+            for index in range(row * width + x, row * width + min(x + w, width)):
+                values[index] |= value
+
+    fill(collisions, 0, 0, width, 1, 0xF)
+    fill(collisions, 0, height - 1, width, 1, 0xF)
+    fill(collisions, 0, 0, 1, height, 0xF)
+    fill(collisions, width - 1, 0, 1, height, 0xF)
+    for _ in range(width * height // 64):
+        x, y = rng.randrange(width), rng.randrange(height)
+        kind = rng.random()
+        if kind < 0.5:
+            fill(collisions, x, y, rng.randint(3, 12), 1, 0x1)
+        elif kind < 0.8:
+            fill(collisions, x, y, rng.randint(2, 6), rng.randint(2, 6), 0xF)
+        else:
+            fill(collisions, x, y, 1, rng.randint(3, 10), 0x10)
+    for _ in range(width * height // 256 + 1):
+        fill(tile_colors, rng.randrange(width), rng.randrange(height), rng.randint(4, 24), rng.randint(4, 24),
+             rng.randint(1, 7))
+    return collisions, [i & 0x7 for i in tile_colors]
+
+
+def vectorized(scene: GridScene) -> Tuple[str, str]:
+    return (str(grid.format_collisions(scene.collisions, scene.width, scene.height)),
+            str(grid.format_tile_colors(scene.tile_colors, scene.width, scene.height)))
+
+
+def encoded(scene: GridScene, grids: str) -> Tuple[str, str]:
+    return (str(grid.format_collisions(scene.collisions, scene.width, scene.height, grids)),
+            str(grid.format_tile_colors(scene.tile_colors, scene.width, scene.height, grids)))
+
+
+def parsed(scene: GridScene, texts: Tuple[str, str]) -> Tuple[List[int], List[int]]:
+    return (grid.parse_collisions(kdl.parse(texts[0]), scene.width, scene.height),
+            grid.parse_tile_colors(kdl.parse(texts[1]), scene.width, scene.height))
+
+
+def best_of(run: Callable[[], object], repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def time_sizes(sizes: List[Tuple[int, int]], repeat: int, seed: int) -> Dict[str, Dict[str, float]]:
+    gen = ProjectGenerator(GeneratorConfig(seed=seed))
+    has_numpy = grid._load_numpy()
+    min_tiles = grid.NUMPY_MIN_TILES
+    ret = {}
+    for width, height in sizes:
+        scene = GridScene(str(width) + "x" + str(height), width, height, gen.collisions(width * height),
+                          gen.tile_colors(width * height))
+        expected = by_tile(scene)
+        result = {"by tile": best_of(lambda: by_tile(scene), repeat)}
+        for method, threshold in [("bytes", width * height + 1), ("numpy", 0)]:
+            if method == "numpy" and not has_numpy:
+                continue
+            grid.NUMPY_MIN_TILES = threshold
+            try:
+                if vectorized(scene) != expected:
+                    raise RuntimeError(method + " wrote something different for " + scene.name + "!")
+                result[method] = best_of(lambda: vectorized(scene), repeat)
+            finally:
+                grid.NUMPY_MIN_TILES = min_tiles
+        ret[scene.name] = result
+    return ret
+
+
+def compare_encodings(sizes: List[Tuple[int, int]], maps: List[str], repeat: int,
+                      seed: int) -> Dict[Tuple[str, str, str], Dict[str, float]]:
+    gen = ProjectGenerator(GeneratorConfig(seed=seed))
+    rng = random.Random(seed)
+    ret = {}
+    for kind in maps:
+        for width, height in sizes:
+            if kind == "noise":
+                collisions, tile_colors = gen.collisions(width * height), gen.tile_colors(width * height)
+            else:
+                collisions, tile_colors = drawn_map(rng, width, height)
+            scene = GridScene(str(width) + "x" + str(height), width, height, collisions, tile_colors)
+            expected = None
+            for grids in grid.GRID_FORMATS:
+                texts = encoded(scene, grids)
+                values = parsed(scene, texts)
+                if expected is not None and values != expected:
+                    raise RuntimeError(grids + " parsed back different for " + kind + " " + scene.name + "!")
+                expected = values
+                ret[(kind, scene.name, grids)] = {
+                    "bytes": sum(len(i.encode("utf-8")) for i in texts),
+                    "format": best_of(lambda: encoded(scene, grids), repeat),
+                    "parse": best_of(lambda: parsed(scene, texts), repeat)
+                }
+    return ret
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark writing out collisions and tile colors")
+    parser.add_argument("--sizes", type=str, nargs="+", help="Scene sizes to try, like 64x64",
+                        default=[str(w) + "x" + str(h) for w, h in SIZES])
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Runs per size, the fastest one is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--maps", type=str, nargs="+", choices=MAPS, default=MAPS,
+                        help="Which maps to compare writing as tiles, rectangles and rows on")
+    args = parser.parse_args()
+    sizes = [(int(i.split("x")[0]), int(i.split("x")[1])) for i in args.sizes]
+    results = time_sizes(sizes, args.repeat, args.seed)
+    print("size".ljust(10) + "".join((i + " (ms)").rjust(14) for i in METHODS) + "   NumPy from " +
+          str(grid.NUMPY_MIN_TILES) + " tiles")
+    for name, result in results.items():
+        print(name.ljust(10) + "".join((str(round(result[i] * 1000, 2)) if i in result else "-").rjust(14)
+                                       for i in METHODS))
+    print()
+    print("map".ljust(8) + "size".ljust(10) + "grids".ljust(8) + "KiB".rjust(10) + "format (ms)".rjust(14)
+          + "parse (ms)".rjust(14))
+    for (kind, name, grids), result in compare_encodings(sizes, args.maps, args.repeat, args.seed).items():
+        print(kind.ljust(8) + name.ljust(10) + grids.ljust(8) + str(round(result["bytes"] / 1024, 1)).rjust(10)
+              + str(round(result["format"] * 1000, 2)).rjust(14) + str(round(result["parse"] * 1000, 2)).rjust(14))
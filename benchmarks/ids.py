@@ -0,0 +1,74 @@
+"""
+Times the passes over a loaded project that turn IDs back and forth between strings and UUIDs: deserialize, format
+and serialize. Each one runs with the ID table cleared first, the way the first pass of a format or parse run sees
+it, and with it already filled, the way every pass after that and every change in watch mode see it.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict
+
+from gbstoolkit.dsl.marshalling import ID_TABLE, serialize
+from gbstoolkit.dsl.project import Project
+from gbstoolkit.dsl.util import BufferedProgressTracker
+
+from .generate import add_config_args, config_from_args, write_project
+
+PASSES = ["deserialize", "format", "serialize"]
+
+
+def format_all(project: Project):
+    progress = BufferedProgressTracker()
+    _, names = project.format(progress)
+    for scene in project.scenes:
+        _, scene_names = scene.format(names, progress)
+        [i.format(scene_names) for i in scene.actors + scene.triggers]
+
+
+def best_of(run: Callable[[], object], repeat: int, cold: bool) -> float:
+    best = None
+    for _ in range(repeat):
+        if cold:
+            ID_TABLE.clear()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def time_passes(obj: Dict[str, object], repeat: int) -> Dict[str, Dict[str, float]]:
+    project = Project.deserialize(obj)
+    runs: Dict[str, Callable[[], object]] = {
+        "deserialize": lambda: Project.deserialize(obj),
+        "format": lambda: format_all(project),
+        "serialize": lambda: serialize(serialize(project.fields())),
+    }
+    return {name: {"cold": best_of(runs[name], repeat, True), "warm": best_of(runs[name], repeat, False)}
+            for name in PASSES}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the ID-heavy passes over a loaded project")
+    parser.add_argument("--project", type=str, help="Benchmark an existing .gbsproj instead of generating one")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Runs per pass, the fastest one is reported")
+    add_config_args(parser)
+    args = parser.parse_args()
+    project_file = args.project
+    if project_file is None:
+        with tempfile.TemporaryDirectory(prefix="gbstoolkit-bench-") as temp_dir:
+            project_file = temp_dir + "/generated.gbsproj"
+            write_project(config_from_args(args), project_file)
+            with open(project_file, encoding="utf-8") as file:
+                obj = json.load(file)
+    else:
+        with open(project_file, encoding="utf-8") as file:
+            obj = json.load(file)
+    results = time_passes(obj, args.repeat)
+    print(str(len(ID_TABLE.ints)) + " IDs in " + os.path.basename(project_file))
+    print("pass          cold (s)   warm (s)")
+    for name, result in results.items():
+        print(name.ljust(12) + str(round(result["cold"], 3)).rjust(10) + str(round(result["warm"], 3)).rjust(11))
@@ -0,0 +1,67 @@
+"""
+Measures how much memory a generated project's scripts take once they're loaded, in total and per event, and how much
+of that is collisions and tile colors.
+"""
+
+import argparse
+from dataclasses import fields
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+from typing import Dict, List
+
+from gbstoolkit.dsl.event import Event
+from gbstoolkit.dsl.marshalling import iter_object
+from gbstoolkit.dsl.scene import Scene
+
+from .events import count_nodes
+from .generate import add_config_args, config_from_args, write_project
+
+
+def scripts_of(scene: Scene) -> List[List[Event]]:
+    return [getattr(i, field.name) for i in [scene] + scene.actors + scene.triggers for field in fields(i)
+            if field.name.endswith("script")]
+
+
+def measure(project_file: str) -> Dict[str, float]:
+    """Load every scene the same way parsing holds them, and see how much memory stays allocated afterwards."""
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    scenes = []
+    with open(project_file, encoding="utf-8") as file:
+        for k, v in iter_object(file, ["scenes"]):
+            if k == "scenes":
+                scenes = [Scene.deserialize(scene, index) for index, scene in enumerate(v)]
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    events = sum(count_nodes(script) for scene in scenes for script in scripts_of(scene))
+    # the small ints in them are shared, so this is all they cost
+    tiles = sum(sys.getsizeof(scene.collisions) + sys.getsizeof(scene.tile_colors) for scene in scenes)
+    return {"events": events, "bytes": retained, "bytes_per_event": retained / events if events > 0 else 0.0,
+            "tile_bytes": tiles}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the memory taken by a loaded project's scenes")
+    parser.add_argument("--project", type=str, help="Measure an existing .gbsproj instead of generating one")
+    add_config_args(parser)
+    args = parser.parse_args()
+    project_file = args.project
+    temp_dir = None
+    if project_file is None:
+        temp_dir = tempfile.TemporaryDirectory(prefix="gbstoolkit-bench-")
+        project_file = temp_dir.name + "/generated.gbsproj"
+        write_project(config_from_args(args), project_file)
+    try:
+        result = measure(project_file)
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+    print(str(result["events"]) + " events in " + os.path.basename(project_file))
+    print("scenes hold " + str(round(result["bytes"] / 1024 / 1024, 1)) + " MiB, "
+          + str(round(result["bytes_per_event"])) + " bytes per event")
+    print("collisions and tile colors hold " + str(round(result["tile_bytes"] / 1024 / 1024, 2)) + " MiB of that")
@@ -0,0 +1,88 @@
+"""
+Times looking names and IDs up through a scene's names, the way formatting and parsing events does for every actor,
+sprite, scene, palette etc. they point at, and how long it takes to pickle a project's names for a worker process,
+both as they are and from a snapshot.
+"""
+
+import argparse
+import pickle
+import random
+import time
+import uuid
+from typing import Callable, Dict, List, Tuple
+
+from gbstoolkit.dsl.project import ProjectNameUtil
+from gbstoolkit.dsl.scene import SceneNameUtil
+from gbstoolkit.dsl.util import BufferedProgressTracker, NameUtil, snapshot
+
+LOOKUPS = ["actor", "sprite", "scene", "palette", "song", "background"]
+
+
+def make_names(rng: random.Random, assets: int, actors: int) -> Tuple[NameUtil, Dict[str, List[Tuple[str, str]]]]:
+    """A scene's names, in a project with `assets` of each kind of thing, and the (id, name) pairs for each kind."""
+    progress = BufferedProgressTracker()
+    names = ProjectNameUtil()
+    pairs = {i: [(str(uuid.UUID(int=rng.getrandbits(128))), i + " " + str(j)) for j in range(assets)]
+             for i in LOOKUPS if i != "actor"}
+    for id, name in pairs["sprite"]:
+        names.add_sprite(id, name)
+    for id, name in pairs["scene"]:
+        names.add_scene(id, name, progress)
+    for id, name in pairs["palette"]:
+        names.add_palette(id, name, progress)
+    for id, name in pairs["song"]:
+        names.add_song(id, name)
+    for id, name in pairs["background"]:
+        names.add_background(id, name)
+    scene_names = SceneNameUtil(names)
+    pairs["actor"] = [(str(uuid.UUID(int=rng.getrandbits(128))), "actor " + str(j)) for j in range(actors)]
+    for id, name in pairs["actor"]:
+        scene_names.add_actor(id, name, progress)
+    # events point at the player and at themselves about as often as at any one actor
+    pairs["actor"] += [("player", "player"), ("$self$", "$self$"), ("3", "3")]
+    return scene_names, pairs
+
+
+def best_of(run: Callable[[], object], repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def time_lookups(names: NameUtil, pairs: Dict[str, List[Tuple[str, str]]], count: int,
+                 repeat: int) -> Dict[str, Tuple[float, float]]:
+    """Nanoseconds per lookup of each kind, ID to name and name to ID, less what the loop around them takes."""
+    ret = {}
+    keys = [str(i) for i in range(count)]
+    loop = best_of(lambda: [i for i in keys], repeat)
+    for kind in LOOKUPS:
+        to_name = getattr(names, kind + "_for_id")
+        to_id = getattr(names, "id_for_" + kind)
+        ids = [pairs[kind][i % len(pairs[kind])][0] for i in range(count)]
+        given = [pairs[kind][i % len(pairs[kind])][1] for i in range(count)]
+        ret[kind] = ((best_of(lambda: [to_name(i) for i in ids], repeat) - loop) / count * 1e9,
+                     (best_of(lambda: [to_id(i) for i in given], repeat) - loop) / count * 1e9)
+    return ret
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark looking up names and IDs")
+    parser.add_argument("--assets", type=int, default=200, help="How many of each kind of thing the project has")
+    parser.add_argument("--actors", type=int, default=20, help="Actors in the scene")
+    parser.add_argument("-n", "--count", type=int, default=100000, help="Lookups of each kind per run")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Runs per lookup, the fastest one is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    scene_names, id_pairs = make_names(random.Random(args.seed), args.assets, args.actors)
+    print("kind".ljust(12) + "for id (ns)".rjust(14) + "id for (ns)".rjust(14))
+    for name, (forward, reverse) in time_lookups(scene_names, id_pairs, args.count, args.repeat).items():
+        print(name.ljust(12) + str(round(forward, 1)).rjust(14) + str(round(reverse, 1)).rjust(14))
+    project_names = scene_names.parent
+    shared_names = snapshot(project_names)
+    print("pickling the project's names for a worker: "
+          + str(round(best_of(lambda: pickle.dumps(project_names), args.repeat) * 1e6, 1)) + " us, "
+          + str(round(best_of(lambda: pickle.dumps(shared_names), args.repeat) * 1e6, 1)) + " us from a snapshot")
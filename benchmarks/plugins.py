@@ -0,0 +1,34 @@
+"""
+Times the event operations on a script of nothing but plugin commands, which the toolkit doesn't know and writes out
+through Fallback, reported as events per second. Every plugin command shows up over and over with the same keys, the
+way it does in a real project that leans on plugins.
+"""
+
+import argparse
+from typing import List
+
+from gbstoolkit.dsl.marshalling import JsonSafe
+
+from .events import OPERATIONS, setup_scene, time_operations
+from .generate import PLUGINS, ProjectGenerator, ScriptContext
+
+
+def plugin_script(gen: ProjectGenerator, ctx: ScriptContext, events: int) -> List[JsonSafe]:
+    commands = sorted(PLUGINS.keys())
+    ret = [gen.make_event(ctx, commands[i % len(commands)], 0) for i in range(events)]
+    ret.append(gen.event("EVENT_END", None))
+    return ret
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the event tree operations on plugin commands")
+    parser.add_argument("--events", type=int, default=5000, help="Plugin events in the script")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Runs per operation, the fastest one is reported")
+    parser.add_argument("--operations", type=str, nargs="+", choices=OPERATIONS, default=OPERATIONS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    gen, ctx, names = setup_scene(args.seed)
+    script = plugin_script(gen, ctx, args.events)
+    print(str(len(script)) + " events, " + str(len(PLUGINS)) + " plugin commands")
+    for operation, rate in time_operations(script, names, args.repeat, args.operations).items():
+        print(operation.ljust(12) + str(round(rate)).rjust(10) + " events/sec")
@@ -0,0 +1,159 @@
+"""
+End-to-end benchmarks for formatting and parsing a generated project. Every phase runs in a fresh interpreter, so
+peak memory is measured per phase and one phase's caches and garbage can't skew the next.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from gbstoolkit import format_project, parse_project
+from gbstoolkit.dsl.util import BufferedProgressTracker
+
+from .generate import add_config_args, config_from_args, write_project
+
+PHASES = ["format", "parse", "roundtrip"]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Peak resident memory of this process and any worker processes it waited on, in KiB."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS reports bytes, everyone else KiB
+
+
+def count_files(project_root: str) -> int:
+    ret = 0
+    for _, _, files in os.walk(project_root):
+        ret += len([i for i in files if i.endswith(".kdl")])
+    return ret
+
+
+def run_phase(phase: str, project_file: str, project_root: str, out_file: str, jobs: int) -> Dict[str, object]:
+    """Run a single phase in this process. The benchmark calls this through a subprocess for every sample."""
+    progress = BufferedProgressTracker()
+    start = time.perf_counter()
+    if phase in ["format", "roundtrip"]:
+        format_project(project_file, project_root, progress, jobs)
+    if phase in ["parse", "roundtrip"]:
+        parse_project(out_file, project_root, progress, jobs)
+    wall = time.perf_counter() - start
+    errors = [message for kind, message in progress.log if kind == "error"]
+    return {"wall": wall, "rss_kb": peak_rss_kb(), "errors": errors}
+
+
+def sample(phase: str, project_file: str, work_dir: str, jobs: int) -> Dict[str, object]:
+    project_root = work_dir + "/kdl"
+    out_file = work_dir + "/parsed.gbsproj"
+    # format always writes into an empty tree, so it never gets to skip unchanged files
+    if phase in ["format", "roundtrip"] and os.path.exists(project_root):
+        shutil.rmtree(project_root)
+    for i in [out_file, out_file + ".bak"]:
+        if os.path.exists(i):
+            os.remove(i)
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.run", "--phase", phase, "--jobs", str(jobs), project_file, work_dir],
+        capture_output=True, text=True, cwd=REPO_ROOT
+    )
+    if result.returncode != 0:
+        raise RuntimeError("Benchmark phase '" + phase + "' crashed:\n" + result.stderr)
+    ret = json.loads(result.stdout.splitlines()[-1])
+    if len(ret["errors"]) > 0:
+        raise RuntimeError("Benchmark phase '" + phase + "' failed: " + ret["errors"][-1])
+    ret["files"] = count_files(project_root)
+    return ret
+
+
+def run_benchmarks(project_file: str, work_dir: str, phases: List[str], repeat: int, jobs: int) -> Dict[str, object]:
+    # parse needs a tree to read, so make sure there's one no matter which phases got picked
+    if "parse" in phases and not os.path.exists(work_dir + "/kdl"):
+        sample("format", project_file, work_dir, jobs)
+    ret = {}
+    for phase in phases:
+        samples = [sample(phase, project_file, work_dir, jobs) for _ in range(repeat)]
+        best = min(samples, key=lambda i: i["wall"])
+        rss = [i["rss_kb"] for i in samples if i["rss_kb"] is not None]
+        ret[phase] = {
+            "wall": best["wall"],
+            "rss_kb": max(rss) if len(rss) > 0 else None,
+            "files": best["files"],
+            "files_per_sec": best["files"] / best["wall"] if best["wall"] > 0 else 0.0
+        }
+    return ret
+
+
+def print_results(results: Dict[str, object], baseline: Optional[Dict[str, object]] = None):
+    print("phase        wall (s)   peak RSS (MiB)   files   files/sec")
+    for phase, result in results.items():
+        rss = str(round(result["rss_kb"] / 1024, 1)) if result["rss_kb"] is not None else "n/a"
+        line = phase.ljust(10) + str(round(result["wall"], 3)).rjust(10) + rss.rjust(17)
+        line += str(result["files"]).rjust(8) + str(round(result["files_per_sec"], 1)).rjust(12)
+        if baseline is not None and phase in baseline and baseline[phase]["wall"] > 0:
+            change = (result["wall"] - baseline[phase]["wall"]) / baseline[phase]["wall"] * 100
+            line += "   " + ("+" if change >= 0 else "") + str(round(change, 1)) + "% wall vs baseline"
+        print(line)
+
+
+def run_cli():
+    parser = argparse.ArgumentParser(description="Benchmark formatting and parsing a generated GB Studio project")
+    parser.add_argument("--project", type=str, help="Benchmark an existing .gbsproj instead of generating one")
+    parser.add_argument("--phases", type=str, nargs="+", choices=PHASES, default=PHASES)
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Runs per phase, the fastest one is reported")
+    parser.add_argument("-j", "--jobs", type=int, default=1)
+    parser.add_argument("--work-dir", type=str, help="Where to put the generated project and trees (kept)")
+    parser.add_argument("--output", type=str, help="Save the results as JSON")
+    parser.add_argument("--compare", type=str, help="Compare against results saved with --output")
+    add_config_args(parser)
+    args = parser.parse_args()
+    if args.work_dir is not None:
+        work_dir = os.path.abspath(args.work_dir)
+    else:
+        work_dir = tempfile.mkdtemp(prefix="gbstoolkit-bench-")
+    os.makedirs(work_dir, exist_ok=True)
+    try:
+        project_file = args.project
+        if project_file is None:
+            project_file = work_dir + "/generated.gbsproj"
+            config = config_from_args(args)
+            print("Generating " + str(config))
+            write_project(config, project_file)
+        project_file = os.path.abspath(project_file)
+        results = run_benchmarks(project_file, work_dir, args.phases, args.repeat, args.jobs)
+        baseline = None
+        if args.compare is not None:
+            with open(args.compare, encoding="utf-8") as file:
+                baseline = json.load(file)
+        print_results(results, baseline)
+        if args.output is not None:
+            with open(args.output, "w", encoding="utf-8") as file:
+                json.dump(results, file, indent=4)
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--phase":
+        # internal: one sample, run by `sample` in a fresh interpreter
+        phase_parser = argparse.ArgumentParser()
+        phase_parser.add_argument("--phase", choices=PHASES)
+        phase_parser.add_argument("--jobs", type=int, default=1)
+        phase_parser.add_argument("project_file")
+        phase_parser.add_argument("work_dir")
+        phase_args = phase_parser.parse_args()
+        print(json.dumps(run_phase(phase_args.phase, phase_args.project_file, phase_args.work_dir + "/kdl",
+                                   phase_args.work_dir + "/parsed.gbsproj", phase_args.jobs)))
+    else:
+        run_cli()
@@ -0,0 +1,47 @@
+"""
+Times deserializing one scene with more and more actors in it, to check the time per actor stays flat as scenes grow
+rather than each actor costing more the more of them there already are.
+"""
+
+import argparse
+import gc
+import time
+from typing import Callable
+
+from gbstoolkit.dsl.scene import Scene
+
+from .generate import GeneratorConfig, ProjectGenerator
+
+
+def best_of(run: Callable[[], object], repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark deserializing scenes against how many actors they have")
+    parser.add_argument("--actors", type=int, nargs="+", default=[10, 100, 1000, 10000],
+                        help="Actor counts to try, one scene each")
+    parser.add_argument("--events", type=int, default=4, help="Events in each actor's script")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Runs per scene, the fastest one is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-gc", action="store_true",
+                        help="Turn the garbage collector off while timing, to leave out its share of the growth")
+    args = parser.parse_args()
+    if args.no_gc:
+        gc.disable()
+    print("actors".ljust(10) + "total (ms)".rjust(14) + "per actor (us)".rjust(16) + "vs smallest".rjust(14))
+    smallest = None
+    for count in args.actors:
+        scene = ProjectGenerator(GeneratorConfig(scenes=1, actors=count, triggers=0, depth=0, events=args.events,
+                                                 seed=args.seed)).scene(0)
+        total = best_of(lambda: Scene.deserialize(scene, 0), args.repeat)
+        per_actor = total / count * 1e6
+        smallest = per_actor if smallest is None else smallest
+        print(str(count).ljust(10) + str(round(total * 1e3, 2)).rjust(14) + str(round(per_actor, 1)).rjust(16)
+              + (str(round(per_actor / smallest, 2)) + "x").rjust(14))
@@ -0,0 +1,98 @@
+"""
+Times how long the toolkit takes to start, using `python -X importtime` in a fresh interpreter for every sample: the
+total import time of `gbstoolkit`, the modules that take the longest, and the wall time of `gbstoolkit --help`. Also
+checks that nothing is imported at startup that only some runs need (tkinter, NumPy, or any command module besides
+the base ones), which is what keeps startup quick. With --budget it exits with 1 if startup got slower than that, so
+it can be run as a regression check.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# shouldn't be imported just to start up
+LAZY_PREFIXES = ["tkinter", "numpy", "gbstoolkit.gui", "gbstoolkit.dsl.command.cmd_"]
+EAGER_ALLOWED = ["gbstoolkit.dsl.command.cmd_base", "gbstoolkit.dsl.command.cmd_shape",
+                 "gbstoolkit.dsl.command.cmd_spec"]
+
+
+def import_times() -> Dict[str, int]:
+    """Cumulative import time of every module imported by `import gbstoolkit`, in microseconds."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import gbstoolkit"], capture_output=True,
+                            text=True, cwd=REPO_ROOT, check=True)
+    ret = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        ret[name.strip()] = int(cumulative)
+    return ret
+
+
+def help_time() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "gbstoolkit", "--help"], capture_output=True, cwd=REPO_ROOT, check=True)
+    return time.perf_counter() - start
+
+
+def lazy_imports(times: Dict[str, int]) -> List[str]:
+    return sorted(i for i in times.keys() if any(i.startswith(j) for j in LAZY_PREFIXES) and i not in EAGER_ALLOWED)
+
+
+def measure(repeat: int, top: int) -> Dict[str, object]:
+    samples = [import_times() for _ in range(repeat)]
+    best = min(samples, key=lambda i: i["gbstoolkit"])
+    slowest = sorted(((k, v) for k, v in best.items() if k != "gbstoolkit"), key=lambda i: i[1], reverse=True)
+    return {
+        "import_ms": best["gbstoolkit"] / 1000,
+        "help_ms": min(help_time() for _ in range(repeat)) * 1000,
+        "slowest": [[k, v / 1000] for k, v in slowest[:top]],
+        "lazy_imported": lazy_imports(best),
+    }
+
+
+def change(value: float, baseline: Dict[str, object], key: str) -> str:
+    if baseline is None or key not in baseline or baseline[key] <= 0:
+        return ""
+    diff = (value - baseline[key]) / baseline[key] * 100
+    return "   " + ("+" if diff >= 0 else "") + str(round(diff, 1)) + "% vs baseline"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time how long gbstoolkit takes to import and start up")
+    parser.add_argument("-r", "--repeat", type=int, default=10, help="Fresh interpreters to sample, the fastest counts")
+    parser.add_argument("--top", type=int, default=10, help="How many of the slowest imports to list")
+    parser.add_argument("--budget", type=float, help="Exit with 1 if importing gbstoolkit takes longer than this (ms)")
+    parser.add_argument("--output", type=str, help="Save the results as JSON")
+    parser.add_argument("--compare", type=str, help="Compare against results saved with --output")
+    args = parser.parse_args()
+    result = measure(args.repeat, args.top)
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+    print("import gbstoolkit   " + str(round(result["import_ms"], 1)).rjust(8) + " ms"
+          + change(result["import_ms"], baseline, "import_ms"))
+    print("gbstoolkit --help   " + str(round(result["help_ms"], 1)).rjust(8) + " ms"
+          + change(result["help_ms"], baseline, "help_ms"))
+    print("slowest imports (cumulative):")
+    for name, ms in result["slowest"]:
+        print("    " + name.ljust(40) + str(round(ms, 1)).rjust(8) + " ms")
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=4)
+    failed = False
+    if len(result["lazy_imported"]) > 0:
+        print("imported at startup, but should only be when needed: " + ", ".join(result["lazy_imported"]))
+        failed = True
+    if args.budget is not None and result["import_ms"] > args.budget:
+        print("over the budget of " + str(args.budget) + " ms!")
+        failed = True
+    if failed:
+        sys.exit(1)
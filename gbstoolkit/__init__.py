@@ -1,203 +1,163 @@
 import argparse
-import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import os
-from queue import SimpleQueue
 import sys
-from threading import Thread
-import tkinter
-from tkinter import CENTER, END, filedialog, Frame, StringVar, ttk
 import traceback
+from typing import List, Tuple
 
-from kdl import parse
-
+from .dsl.cache import DocumentCache, load_documents
+from .dsl.grid import GRID_FORMATS, TILES
+from .dsl.manifest import MANIFEST, SceneEntry
+from .dsl.marshalling import ID_TABLE, dump_fields, iter_object
 from .dsl.project import Project
-from .dsl.util import serialize, ProgressTracker, PrintProgressTracker, QueueProgressTracker
-
-def format_project(project_file: str, project_root: str, progress: ProgressTracker):
+from .dsl.scene import Scene
+from .dsl.util import BufferedProgressTracker, IdSource, NameUtil, ProgressTracker, PrintProgressTracker, snapshot
+from .plan import OutputPlan
+from .watch import watch_project
+
+
+# Returns how many files were [unchanged, written], indexed by what OutputPlan.export returned for them, and what
+# index.kdl lists for the scene
+def format_scene(scene: Scene, names: NameUtil, scene_dir: str, plan: OutputPlan,
+                 progress: ProgressTracker, grids: str = TILES) -> Tuple[List[int], SceneEntry]:
+    counts = [0, 0]
+    scene_docs, scene_names = scene.format(names, progress, grids)
+    actor_docs = {scene_names.actor_for_id(ID_TABLE.to_str(i.id)): i.format(scene_names) for i in scene.actors}
+    trigger_docs = {scene_names.trigger_for_id(ID_TABLE.to_str(i.id)): i.format(scene_names) for i in scene.triggers}
+    # the scene directory itself was planned along with the rest of the project
+    for kind, docs in [("actors", actor_docs), ("triggers", trigger_docs)]:
+        if len(docs) > 0:
+            plan.add_dir(scene_dir + "/" + kind)
+        for entity in docs.keys():
+            plan.add_dir(scene_dir + "/" + kind + "/" + entity)
+    plan.create_dirs()
+    for name, doc in scene_docs.items():
+        counts[plan.export(scene_dir, name + ".kdl", str(doc), progress)] += 1
+    for kind, docs in [("actors", actor_docs), ("triggers", trigger_docs)]:
+        for entity, entity_docs in docs.items():
+            for name, doc in entity_docs.items():
+                counts[plan.export(scene_dir + "/" + kind + "/" + entity, name + ".kdl", str(doc), progress)] += 1
+    return counts, scene.manifest_entry(scene_names)
+
+
+# Runs in a worker process, so progress gets buffered and handed back to be replayed in order
+def _format_scene_worker(scene: Scene, names: NameUtil, scene_name: str, plan: OutputPlan,
+                         grids: str) -> Tuple[List[int], SceneEntry, int, List[Tuple[str, str]]]:
+    progress = BufferedProgressTracker()
+    progress.current_scene = scene_name
+    counts, entry = format_scene(scene, names, "scenes/" + scene_name, plan, progress, grids)
+    return counts, entry, plan.syscalls, progress.log
+
+
+def format_project(project_file: str, project_root: str, progress: ProgressTracker, jobs: int = 1,
+                   grids: str = TILES):
     try:
-        if not os.path.exists(project_root):
-            os.mkdir(project_root)
+        ID_TABLE.clear()  # the GUI can run one project after another in the same process
+        plan = OutputPlan(project_root)
+        plan.scan()
+        # First pass: everything but the scenes, which only need their IDs and names for now
+        progress.set_status("Deserializing " + project_file)
+        contents = {}
+        scene_headers = []
+        with open(project_file, encoding="utf-8") as file:
+            for k, v in iter_object(file, ["scenes"]):
+                if k == "scenes":
+                    scene_headers = [(ID_TABLE.to_str(i["id"]), i["name"]) for i in v]
+                else:
+                    contents[k] = v
+        contents["scenes"] = []
+        project = Project.deserialize(contents)
+        proj_docs, names = project.format(progress, scene_headers)
+        # Everything above the actors and triggers is known by now, so make those directories in one go
+        plan.add_dir("")
+        if len(project.custom_events) > 0:
+            plan.add_dir("custom-events")
+        if len(scene_headers) > 0:
+            plan.add_dir("scenes")
+        for id, _ in scene_headers:
+            plan.add_dir("scenes/" + names.scene_for_id(id))
+        plan.create_dirs()
+        counts = [0, 0]
+        for name, doc in proj_docs.items():
+            counts[plan.export("", name + ".kdl", str(doc), progress)] += 1
+        for event in project.custom_events:
+            name = names.custom_event_for_id(ID_TABLE.to_str(event.id)) + ".kdl"
+            counts[plan.export("custom-events", name, str(event.format(names)), progress)] += 1
+        # Second pass: deserialize and format one scene at a time, so they never all have to be in memory
+        scene_entries = []
         with open(project_file, encoding="utf-8") as file:
-            progress.set_status("Deserializing " + project_file)
-            contents = json.load(file)
-            project = Project.deserialize(contents)
-            proj_docs, names = project.format(progress)
-            for name, doc in proj_docs.items():
-                path = project_root + "/" + name + ".kdl"
-                with open(path, mode="w", encoding="utf-8") as out:
-                    out.write(str(doc))
-                    progress.set_status("Exported " + path + "!")
-            if len(project.custom_events) > 0 and not os.path.exists(project_root + "/custom-events"):
-                os.mkdir(project_root + "/custom-events")
-            for event in project.custom_events:
-                path = project_root + "/custom-events/" + names.custom_event_for_id(str(event.id)) + ".kdl"
-                with open(path, mode="w", encoding="utf-8") as out:
-                    out.write(str(event.format(names)))
-                    progress.set_status("Exported " + path + "!")
-            if len(project.scenes) > 0 and not os.path.exists(project_root + "/scenes"):
-                os.mkdir(project_root + "/scenes")
-            for scene in project.scenes:
-                progress.current_scene = names.scene_for_id(str(scene.id))
-                scene_path = project_root + "/scenes/" + names.scene_for_id(str(scene.id)) + "/"
-                if not os.path.exists(scene_path):
-                    os.mkdir(scene_path)
-                scene_docs, scene_names = scene.format(names, progress)
-                for name, doc in scene_docs.items():
-                    with open(scene_path + name + ".kdl", mode="w", encoding="utf-8") as out:
-                        out.write(str(doc))
-                        progress.set_status("Exported " + scene_path + name + ".kdl!")
-                if len(scene.actors) > 0 and not os.path.exists(scene_path + "actors"):
-                    os.mkdir(scene_path + "actors")
-                for actor in scene.actors:
-                    actor_path = scene_path + "actors/" + scene_names.actor_for_id(str(actor.id)) + "/"
-                    if not os.path.exists(actor_path):
-                        os.mkdir(actor_path)
-                    actor_docs = actor.format(scene_names)
-                    for name, doc in actor_docs.items():
-                        with open(actor_path + name + ".kdl", mode="w", encoding="utf-8") as out:
-                            out.write(str(doc))
-                            progress.set_status("Exported " + actor_path + name + ".kdl!")
-                if len(scene.triggers) > 0 and not os.path.exists(scene_path + "triggers"):
-                    os.mkdir(scene_path + "triggers")
-                for trigger in scene.triggers:
-                    trigger_path = scene_path + "triggers/" + scene_names.trigger_for_id(str(trigger.id)) + "/"
-                    if not os.path.exists(trigger_path):
-                        os.mkdir(trigger_path)
-                    trigger_docs = trigger.format(scene_names)
-                    for name, doc in trigger_docs.items():
-                        with open(trigger_path + name + ".kdl", mode="w", encoding="utf-8") as out:
-                            out.write(str(doc))
-                            progress.set_status("Exported " + trigger_path + name + ".kdl!")
-            progress.set_status("Project converted to KDL!")
+            for k, v in iter_object(file, ["scenes"]):
+                if k != "scenes":
+                    continue
+                if jobs > 1 and len(scene_headers) > 1:
+                    def collect(future):
+                        scene_counts, entry, syscalls, log = future.result()
+                        BufferedProgressTracker.replay(log, progress)
+                        counts[0] += scene_counts[0]
+                        counts[1] += scene_counts[1]
+                        scene_entries.append(entry)
+                        plan.syscalls += syscalls
+
+                    shared_names = snapshot(names)  # so they only get pickled once, not once per scene
+                    with ProcessPoolExecutor(max_workers=jobs) as executor:
+                        # only keep a few scenes in flight, and collect in order so the log matches a serial run
+                        futures = deque()
+                        for index, obj in enumerate(v):
+                            scene = Scene.deserialize(obj, index)
+                            scene_name = names.scene_for_id(ID_TABLE.to_str(scene.id))
+                            futures.append(executor.submit(_format_scene_worker, scene, shared_names, scene_name,
+                                                           plan.subplan("scenes/" + scene_name), grids))
+                            if len(futures) > jobs * 2:
+                                collect(futures.popleft())
+                        while len(futures) > 0:
+                            collect(futures.popleft())
+                else:
+                    for index, obj in enumerate(v):
+                        scene = Scene.deserialize(obj, index)
+                        progress.current_scene = names.scene_for_id(ID_TABLE.to_str(scene.id))
+                        scene_dir = "scenes/" + names.scene_for_id(ID_TABLE.to_str(scene.id))
+                        scene_counts, entry = format_scene(scene, names, scene_dir, plan, progress, grids)
+                        counts[0] += scene_counts[0]
+                        counts[1] += scene_counts[1]
+                        scene_entries.append(entry)
+        # Last, since it needs every actor and trigger's name: what lets parsing skip reading every meta.kdl twice
+        manifest = project.manifest(scene_entries, names)
+        counts[plan.export("", MANIFEST + ".kdl", str(manifest.format()), progress)] += 1
+        progress.set_status("Project converted to KDL! " + str(counts[1]) + " files written, "
+                            + str(counts[0]) + " unchanged, " + str(plan.syscalls) + " filesystem calls.")
     except RuntimeError as err:
         traceback.print_exc()
         progress.log_error("Conversion failed: " + str(err))
 
 
-def parse_project(project_file: str, project_root: str, progress: ProgressTracker):
+def parse_project(project_file: str, project_root: str, progress: ProgressTracker, jobs: int = 1,
+                  use_cache: bool = False, derive_ids: bool = False):
     try:
+        ID_TABLE.clear()
         progress.set_status("Parsing project metadata and assets")
-        docs = {i.name[:-4]: parse(open(project_root + "/" + i.name, encoding="utf-8").read()) for i in
-                os.scandir(project_root)
-                if i.is_file() and i.name.endswith(".kdl")}
-        project = Project.parse(docs, project_root, progress)
+        cache = DocumentCache(project_root) if use_cache else None
+        project = Project.parse(load_documents(project_root, cache), project_root, progress, jobs, cache,
+                                IdSource(derive_ids))
+        if cache is not None:
+            cache.prune()  # the whole tree just got loaded, so whatever wasn't is for a file that's gone
         progress.set_status("Exporting into JSON")
-        contents = project.serialize()
         if os.path.exists(project_file):
             if os.path.exists(project_file + ".bak"):
                 os.remove(project_file + ".bak")
             os.rename(project_file, project_file + ".bak")
         with open(project_file, "w", encoding="utf-8") as out:
-            json.dump(serialize(contents), out, indent=4)
+            dump_fields(project.fields(), out)
         progress.set_status("Project converted to JSON!")
     except RuntimeError as err:
         traceback.print_exc()
         progress.log_error("Conversion failed: " + str(err))
 
 
-class Application(Frame):
-    def __init__(self, master=None):
-        super().__init__(master)
-        self.master = master
-        self.grid()
-        self.status = StringVar()
-        self.errors = StringVar()
-        self.status_queue = SimpleQueue()
-        self.errors_queue = SimpleQueue()
-        self.proj_file_label = ttk.Label(self, text=".gbsproj location")
-        self.proj_file_field = ttk.Entry(self)
-        self.proj_file_browse = ttk.Button(self, text="Browse...", command=self.browse_file)
-        self.proj_dir_label = ttk.Label(self, text=".kdl tree location")
-        self.proj_dir_field = ttk.Entry(self)
-        self.proj_dir_browse = ttk.Button(self, text="Browse...", command=self.browse_dir)
-        self.format_btn = ttk.Button(self, text="Convert .gbsproj to .kdl tree", command=self.execute_format)
-        self.parse_btn = ttk.Button(self, text="Convert .kdl tree to .gbsproj", command=self.execute_parse)
-        self.status_label = ttk.Label(self, textvar=self.status, justify=CENTER)
-        self.error_label = ttk.Label(self, textvar=self.errors, foreground="red", justify=CENTER)
-        self.proj_file_label.grid(row=0, column=0)
-        self.proj_file_field.grid(row=0, column=1)
-        self.proj_file_browse.grid(row=0, column=2)
-        self.proj_dir_label.grid(row=1, column=0)
-        self.proj_dir_field.grid(row=1, column=1)
-        self.proj_dir_browse.grid(row=1, column=2)
-        self.format_btn.grid(row=2, column=0)
-        self.parse_btn.grid(row=2, column=2)
-        self.status_label.grid(row=3, column=0, columnspan=3)
-        self.error_label.grid(row=4, column=0, columnspan=3)
-
-    def browse_file(self):
-        result = filedialog.askopenfilename(filetypes=[("GB Studio projects", "*.gbsproj")])
-        self.proj_file_field.delete(0, END)
-        self.proj_file_field.insert(0, result)
-
-    def browse_dir(self):
-        result = filedialog.askdirectory()
-        self.proj_dir_field.delete(0, END)
-        self.proj_dir_field.insert(0, result)
-
-    def execute_format(self):
-        file = self.proj_file_field.get()
-        dir = self.proj_dir_field.get()
-        can_run = True
-        errors = []
-        if file == "" or not os.path.exists(file):
-            can_run = False
-            errors.append("Cound not find file '" + file + "'")
-        if dir == "" or not os.path.exists(dir):
-            can_run = False
-            errors.append("Could not find directory '" + dir + "'")
-        if can_run:
-            self.master.after(50, self.update_status())
-            exec_thread = Thread(
-                target=format_project,
-                args=(file, dir, QueueProgressTracker(self.status_queue, self.errors_queue))
-            )
-            exec_thread.start()
-        else:
-            self.status.set("Could not format project")
-            self.errors.set("\n".join(errors))
-
-    def execute_parse(self):
-        file = self.proj_file_field.get()
-        dir = self.proj_dir_field.get()
-        can_run = True
-        errors = []
-        if file == "" or not os.path.exists(file):
-            can_run = False
-            errors.append("Cound not find file '" + file + "'")
-        if dir == "" or not os.path.exists(dir):
-            can_run = False
-            errors.append("Could not find directory '" + dir + "'")
-        if can_run:
-            self.master.after(50, self.update_status())
-            exec_thread = Thread(
-                target=parse_project,
-                args=(file, dir, QueueProgressTracker(self.status_queue, self.errors_queue))
-            )
-            exec_thread.start()
-        else:
-            self.status.set("Could not parse project")
-            self.errors.set("\n".join(errors))
-
-    def update_status(self):
-        while not self.status_queue.empty():
-            self.status.set(self.status_queue.get())
-        while not self.errors_queue.empty():
-            current = self.errors.get()
-            if current == "":
-                self.errors.set(self.errors_queue.get())
-            else:
-                self.errors.set(current + "\n" + self.errors_queue.get())
-        self.master.after(50, self.update_status)
-
-
 def run_cli():
     if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
         # running from a bundle!
-        root = tkinter.Tk()
-        app = Application(root)
-        app.master.title("GBS Toolkit")
-        app.mainloop()
+        run_app()
     else:
         parser = argparse.ArgumentParser()
         subparsers = parser.add_subparsers(dest="action")
@@ -205,26 +165,56 @@ def run_cli():
         parser_format = subparsers.add_parser("format", help="Format a .gbsproj file into a tree of .kdl files.")
         parser_format.add_argument("file", help="The .gbsproj file to read from.")
         parser_format.add_argument("dir", help="The directory to write the .kdl tree to.")
+        parser_format.add_argument("-j", "--jobs", type=int, default=1,
+                                   help="The number of worker processes to format scenes with.")
+        parser_format.add_argument("--grids", choices=GRID_FORMATS, default=TILES,
+                                   help="Write collisions and tile colors as a node for every tile, for every "
+                                        "rectangle of tiles that are the same, which is much smaller for most maps, "
+                                        "or as a string of hex digits for every row.")
         parser_parse = subparsers.add_parser("parse", help="Parse a tree of .kdl files into a .gbsproj file.")
         parser_parse.add_argument("dir", help="The directory to read the .kdl tree from.")
         parser_parse.add_argument("file", help="The .gbsproj file to write to. Will be backed up if exists.")
+        parser_parse.add_argument("-j", "--jobs", type=int, default=1,
+                                  help="The number of worker processes to parse scenes with.")
+        parser_parse.add_argument("--cache", action="store_true",
+                                  help="Cache parsed files in the .kdl tree, so only changed files are parsed next time.")
+        parser_parse.add_argument("--derive-ids", action="store_true",
+                                  help="Work out missing IDs from where things are in the tree instead of randomly, "
+                                       "so parsing the same tree always gives the same .gbsproj.")
+        parser_watch = subparsers.add_parser(
+            "watch",
+            help="Keep a .gbsproj file up to date with a tree of .kdl files as they're edited."
+        )
+        parser_watch.add_argument("dir", help="The directory to watch the .kdl tree in.")
+        parser_watch.add_argument("file", help="The .gbsproj file to write to. Will be backed up if exists.")
+        parser_watch.add_argument("-j", "--jobs", type=int, default=1,
+                                  help="The number of worker processes to parse scenes with.")
+        parser_watch.add_argument("--cache", action="store_true",
+                                  help="Cache parsed files in the .kdl tree, so only changed files are parsed next time.")
+        parser_watch.add_argument("--interval", type=float, default=0.25,
+                                  help="How many seconds to wait between checks for changes.")
+        parser_watch.add_argument("--derive-ids", action="store_true",
+                                  help="Work out missing IDs from where things are in the tree instead of randomly, "
+                                       "so parsing the same tree always gives the same .gbsproj.")
         args = parser.parse_args()
         if args.action == "gui":
-            root = tkinter.Tk()
-            app = Application(root)
-            app.master.title("GBS Toolkit")
-            app.mainloop()
+            run_app()
         elif args.action == "format":
-            format_project(args.file, args.dir, PrintProgressTracker())
+            format_project(args.file, args.dir, PrintProgressTracker(), args.jobs, args.grids)
         elif args.action == "parse":
-            parse_project(args.file, args.dir, PrintProgressTracker())
+            parse_project(args.file, args.dir, PrintProgressTracker(), args.jobs, args.cache, args.derive_ids)
+        elif args.action == "watch":
+            try:
+                watch_project(args.dir, args.file, PrintProgressTracker(), args.jobs, args.cache, args.interval,
+                              args.derive_ids)
+            except KeyboardInterrupt:
+                pass
 
 
 def run_app():
-    root = tkinter.Tk()
-    app = Application(root)
-    app.master.title("GBS Toolkit")
-    app.mainloop()
+    # tkinter only gets imported from here
+    from .gui import run_gui
+    run_gui()
 
 
 if __name__ == "__main__":
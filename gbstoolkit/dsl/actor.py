@@ -1,13 +1,12 @@
 from dataclasses import dataclass
 from typing import Dict, List, Optional
-import uuid
 from uuid import UUID
 
 from kdl import Document
 
 from .enums import Direction, AutoMovementType, SpriteType
 from .event import Event
-from .marshalling import JsonSafe, serialize, Serializable
+from .marshalling import ID_TABLE, JsonSafe, serialize, Serializable
 from .util import NameUtil, ProgressTracker, prop_node, map_nodes
 
 
@@ -62,9 +61,9 @@ class Actor(Serializable):
     @staticmethod
     def deserialize(obj: Dict[str, JsonSafe], scene_index: int) -> "Actor":
         return Actor(
-            id=UUID(obj["id"]),
+            id=ID_TABLE.to_uuid(obj["id"]),
             name=obj["name"] if "name" in obj else "",
-            sprite_sheet_id=UUID(obj["spriteSheetId"]),
+            sprite_sheet_id=ID_TABLE.to_uuid(obj["spriteSheetId"]),
             sprite_type=SpriteType.deserialize(obj["spriteType"]),
             frame=obj["frame"] if "frame" in obj else 0,
             x=obj["x"],
@@ -132,19 +131,16 @@ class Actor(Serializable):
         return docs
 
     @staticmethod
-    def parse(docs: Dict[str, Document], names: NameUtil, progress: ProgressTracker) -> "Actor":
+    def parse(docs: Dict[str, Document], names: NameUtil, progress: ProgressTracker, path: str = "") -> "Actor":
         meta = docs["meta"]
         contents = map_nodes(meta.nodes)
-        interact = [Event.parse(i, names, progress) for i in docs["interact"].nodes] if "interact" in docs else []
-        init = [Event.parse(i, names, progress) for i in docs["init"].nodes] if "init" in docs else []
-        update = [Event.parse(i, names, progress) for i in docs["update"].nodes] if "update" in docs else []
-        hit_1 = [Event.parse(i, names, progress) for i in docs["hit-1"].nodes] if "hit-1" in docs else []
-        hit_2 = [Event.parse(i, names, progress) for i in docs["hit-2"].nodes] if "hit-2" in docs else []
-        hit_3 = [Event.parse(i, names, progress) for i in docs["hit-3"].nodes] if "hit-3" in docs else []
+        scripts = {}
+        for i in ["interact", "init", "update", "hit-1", "hit-2", "hit-3"]:
+            scripts[i] = Event.parse_script(docs[i].nodes, names, progress, path + "/" + i) if i in docs else []
         return Actor(
-            id=UUID(contents["id"]) if "id" in contents else uuid.uuid4(),
+            id=ID_TABLE.to_uuid(contents["id"]) if "id" in contents else names.new_id(path),
             name=contents["name"] if "name" in contents else "",
-            sprite_sheet_id=UUID(names.id_for_sprite(contents["spriteSheet"])),
+            sprite_sheet_id=ID_TABLE.to_uuid(names.id_for_sprite(contents["spriteSheet"])),
             sprite_type=SpriteType.deserialize(contents["spriteType"]),
             frame=contents["startFrame"],
             x=contents["x"],
@@ -156,11 +152,11 @@ class Actor(Serializable):
             anim_speed=contents["animSpeed"] if "moveSpeed" in contents else 3,
             collision_group=contents["collisionGroup"],
             notes=contents["notes"] if "notes" in contents else None,
-            script=interact,
-            start_script=init,
-            update_script=update,
-            hit1_script=hit_1,
-            hit2_script=hit_2,
-            hit3_script=hit_3,
+            script=scripts["interact"],
+            start_script=scripts["init"],
+            update_script=scripts["update"],
+            hit1_script=scripts["hit-1"],
+            hit2_script=scripts["hit-2"],
+            hit3_script=scripts["hit-3"],
             scene_index=int(contents["__index"])
         )
@@ -1,14 +1,21 @@
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, Any
-import uuid
 from uuid import UUID
 
 from kdl import Node
 
 from .enums import SpriteSheetType
-from .marshalling import JsonSafe, serialize, Serializable
-from .util import prop_node, map_nodes
+from .marshalling import ID_TABLE, JsonSafe, serialize, Serializable
+from .util import RANDOM_IDS, IdSource, prop_node, map_nodes
+
+
+def _parse_timestamp(contents: Dict[str, Any]) -> datetime:
+    # trees from before sprite sheets and songs got the name right say "timesamp"
+    for key in ["timestamp", "timesamp"]:
+        if key in contents:
+            return datetime.fromtimestamp(contents[key] / 1000)
+    return datetime.now()
 
 
 @dataclass
@@ -37,7 +44,7 @@ class Background(Serializable):
     @staticmethod
     def deserialize(obj: Dict[str, JsonSafe]) -> "Background":
         return Background(
-            id=UUID(obj["id"]),
+            id=ID_TABLE.to_uuid(obj["id"]),
             name=obj["name"],
             width=obj["width"],
             height=obj["height"],
@@ -60,18 +67,17 @@ class Background(Serializable):
         return Node(name=self.name, nodes=nodes)
 
     @staticmethod
-    def parse(node: Node) -> "Background":
+    def parse(node: Node, ids: IdSource = RANDOM_IDS) -> "Background":
         contents = map_nodes(node.nodes)
         return Background(
-            id=UUID(contents["id"]) if "id" in contents else uuid.uuid4(),
+            id=ID_TABLE.to_uuid(contents["id"]) if "id" in contents else ids.new_id("backgrounds/" + node.name),
             name=node.name,
             width=contents["width"],
             height=contents["height"],
             image_width=contents["imageWidth"],
             image_height=contents["imageHeight"],
             filename=contents["filename"],
-            timestamp=datetime.fromtimestamp(contents["timestamp"] / 1000) if "timestamp" in contents
-            else datetime.now()
+            timestamp=_parse_timestamp(contents)
         )
 
 
@@ -97,7 +103,7 @@ class SpriteSheet(Serializable):  # TODO: gonna break entirely in v3! be ready!
     @staticmethod
     def deserialize(obj: Dict[str, JsonSafe]) -> "SpriteSheet":
         return SpriteSheet(
-            id=UUID(obj["id"]),
+            id=ID_TABLE.to_uuid(obj["id"]),
             name=obj["name"],
             num_frames=obj["numFrames"],
             type=SpriteSheetType.deserialize(obj["type"]),
@@ -111,21 +117,20 @@ class SpriteSheet(Serializable):  # TODO: gonna break entirely in v3! be ready!
             prop_node("numFrames", self.num_frames),
             prop_node("type", self.type.serialize()),
             prop_node("filename", self.filename),
-            prop_node("timesamp", self.timestamp.timestamp() * 1000)
+            prop_node("timestamp", self.timestamp.timestamp() * 1000)
         ]
         return Node(name=self.name, nodes=nodes)
 
     @staticmethod
-    def parse(node: Node) -> "SpriteSheet":
+    def parse(node: Node, ids: IdSource = RANDOM_IDS) -> "SpriteSheet":
         contents = map_nodes(node.nodes)
         return SpriteSheet(
-            id=UUID(contents["id"]) if "id" in contents else uuid.uuid4(),
+            id=ID_TABLE.to_uuid(contents["id"]) if "id" in contents else ids.new_id("sprite-sheets/" + node.name),
             name=node.name,
             num_frames=contents["numFrames"],
             type=SpriteSheetType.deserialize(contents["type"]),
             filename=contents["filename"],
-            timestamp=datetime.fromtimestamp(contents["timestamp"] / 1000) if "timestamp" in contents
-            else datetime.now()
+            timestamp=_parse_timestamp(contents)
         )
 
 
@@ -149,7 +154,7 @@ class Song(Serializable):
     @staticmethod
     def deserialize(obj: Dict[str, JsonSafe]) -> "Song":
         return Song(
-            id=UUID(obj["id"]),
+            id=ID_TABLE.to_uuid(obj["id"]),
             name=obj["name"],
             filename=obj["filename"],
             settings=obj["settings"],
@@ -161,18 +166,17 @@ class Song(Serializable):
             prop_node("id", serialize(self.id)),
             prop_node("filename", self.filename),
             # prop_node("settings", ) TODO: can't do this bc I don't know what settings is
-            prop_node("timesamp", self.timestamp.timestamp() * 1000)
+            prop_node("timestamp", self.timestamp.timestamp() * 1000)
         ]
         return Node(name=self.name, nodes=nodes)
 
     @staticmethod
-    def parse(node: Node) -> "Song":
+    def parse(node: Node, ids: IdSource = RANDOM_IDS) -> "Song":
         contents = map_nodes(node.nodes)
         return Song(
-            id=UUID(contents["id"]) if "id" in contents else uuid.uuid4(),
+            id=ID_TABLE.to_uuid(contents["id"]) if "id" in contents else ids.new_id("music/" + node.name),
             name=node.name,
             filename=contents["filename"],
             settings={},  # TODO: can't do this bc I don't know what settings is
-            timestamp=datetime.fromtimestamp(contents["timestamp"] / 1000) if "timestamp" in contents
-            else datetime.now()
+            timestamp=_parse_timestamp(contents)
         )
@@ -0,0 +1,126 @@
+"""
+On-disk cache of parsed .kdl documents, so unchanged files in a tree don't have to be parsed again.
+"""
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Set
+
+from kdl import Document, Node, parse
+
+from .marshalling import JsonSafe
+
+CACHE_DIR = ".gbstoolkit-cache"
+
+
+class DocumentCache:
+    """
+    Caches parsed documents under `.gbstoolkit-cache/` in the tree root, one entry per file, keyed by its path.
+    An entry is reused when the file's size and mtime still match, or when its contents still hash the same. Like
+    git's index, the size and mtime only get trusted if the file was last changed before the entry was written, going
+    by the entry's own mtime: otherwise a same-size edit in the same mtime tick (or the same two seconds, on FAT)
+    would look unchanged, so those get hashed.
+    Entries are plain JSON rather than pickles, so a cache directory from someone else can't run code.
+    Every entry is written by a single rename, so scene worker processes can share one cache safely.
+    """
+
+    def __init__(self, project_root: str):
+        self.project_root = project_root
+        self.cache_dir = project_root + "/" + CACHE_DIR
+        if not os.path.exists(self.cache_dir):
+            os.mkdir(self.cache_dir)
+        self.visited: Set[str] = set()  # the entries loaded since the last prune
+
+    def __getstate__(self):
+        # worker processes start counting from nothing, and hand back what they visited
+        return {"project_root": self.project_root, "cache_dir": self.cache_dir, "visited": set()}
+
+    def load(self, path: str) -> Document:
+        stat = os.stat(path)
+        rel_path = os.path.relpath(path, self.project_root).replace("\\", "/")
+        entry_name = hashlib.sha1(rel_path.encode("utf-8")).hexdigest() + ".json"
+        entry_path = self.cache_dir + "/" + entry_name
+        self.visited.add(entry_name)
+        entry = None
+        try:
+            entry_stat = os.stat(entry_path)
+        except FileNotFoundError:
+            entry_stat = None
+        if entry_stat is not None:
+            try:
+                with open(entry_path, encoding="utf-8") as file:
+                    entry = json.load(file)
+            except ValueError:  # half-written or otherwise broken entry, just parse it again
+                entry = None
+            if entry is not None and entry["path"] != rel_path:
+                entry = None
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns \
+                and stat.st_mtime_ns < entry_stat.st_mtime_ns:
+            return _decode_document(entry["doc"])
+        with open(path, encoding="utf-8") as file:
+            contents = file.read()
+        digest = hashlib.sha1(contents.encode("utf-8")).hexdigest()
+        if entry is not None and entry["hash"] == digest:
+            doc = _decode_document(entry["doc"])
+        else:
+            doc = parse(contents)
+        self._store(entry_path, {
+            "path": rel_path,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": digest,
+            "doc": _encode_nodes(doc.nodes)
+        })
+        return doc
+
+    def prune(self):
+        """
+        Remove the entries for every file that hasn't been loaded since the last prune, i.e. ones that were deleted or
+        renamed. Only call this after loading the whole tree, or it'll throw out entries that are still good.
+        """
+        for i in os.scandir(self.cache_dir):
+            if i.name.endswith(".json") and i.name not in self.visited:
+                try:
+                    os.remove(i.path)
+                except FileNotFoundError:
+                    pass
+        self.visited.clear()
+
+    @staticmethod
+    def _store(entry_path: str, entry: JsonSafe):
+        temp_path = entry_path + "." + str(os.getpid()) + ".tmp"
+        try:
+            with open(temp_path, mode="w", encoding="utf-8") as file:
+                json.dump(entry, file)
+        except (TypeError, ValueError):
+            # tagged or otherwise non-native KDL values don't fit in JSON, so that file just doesn't get cached
+            os.remove(temp_path)
+            return
+        os.replace(temp_path, entry_path)
+
+
+def load_document(path: str, cache: Optional[DocumentCache]) -> Document:
+    if cache is not None:
+        return cache.load(path)
+    with open(path, encoding="utf-8") as file:
+        return parse(file.read())
+
+
+def load_documents(dir: str, cache: Optional[DocumentCache]) -> Dict[str, Document]:
+    """Load every .kdl file directly inside a directory, keyed by its name without the extension."""
+    return {i.name[:-4]: load_document(dir + "/" + i.name, cache) for i in os.scandir(dir)
+            if i.is_file() and i.name.endswith(".kdl")}
+
+
+def _encode_nodes(nodes: List[Node]) -> JsonSafe:
+    return [[i.name, i.tag, i.args, list(i.props.items()), _encode_nodes(i.nodes)] for i in nodes]
+
+
+def _decode_nodes(nodes: JsonSafe) -> List[Node]:
+    return [Node(name=i[0], tag=i[1], args=i[2], props=OrderedDict(i[3]), nodes=_decode_nodes(i[4])) for i in nodes]
+
+
+def _decode_document(nodes: JsonSafe) -> Document:
+    return Document(nodes=_decode_nodes(nodes))
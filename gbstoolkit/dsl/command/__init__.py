@@ -1,10 +1,15 @@
+from importlib import import_module
+
 from .cmd_base import *  # has to import first, probably
-from .cmd_actor import *
-from .cmd_camera import *
-from .cmd_engine import *
-from .cmd_flowcontrol import *
-from .cmd_misc import *
-from .cmd_scene import *
-from .cmd_text import *
-from .cmd_timing import *
-from .cmd_variable import *
+from .cmd_spec import *
+
+# Everything else only gets imported once one of its commands is looked up in COMMANDS or KEYWORDS (see index.py)
+
+
+def __getattr__(name: str):
+    # for anything importing a command class straight from here
+    for module in sorted(set(COMMAND_MODULES.values())):
+        module = import_module("." + module, __name__)
+        if hasattr(module, name):
+            return getattr(module, name)
+    raise AttributeError("module " + __name__ + " has no attribute " + name)
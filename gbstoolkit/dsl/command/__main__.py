@@ -0,0 +1,60 @@
+"""
+Writes index.py, which says what module every command is in so they can be imported only once they're needed. Run
+`python -m gbstoolkit.dsl.command` again after adding, renaming or moving a command, or with `--check` to only see
+whether the index is out of date.
+"""
+
+import argparse
+from importlib import import_module
+import os
+import sys
+from typing import Dict, Tuple
+
+from .cmd_base import COMMANDS, KEYWORDS
+
+INDEX_FILE = os.path.join(os.path.dirname(__file__), "index.py")
+
+
+def build_index() -> Tuple[Dict[str, str], Dict[str, str]]:
+    for file in sorted(os.listdir(os.path.dirname(__file__))):
+        if file.startswith("cmd_") and file.endswith(".py"):
+            import_module("." + file[:-3], __package__)
+    # going around the registries' own lookups, so nothing in here comes from the index being replaced
+    commands = {k: v.__module__.rsplit(".", 1)[1] for k, v in dict.items(COMMANDS)}
+    keywords = {k: v.__module__.rsplit(".", 1)[1] for k, v in dict.items(KEYWORDS)}
+    return commands, keywords
+
+
+def index_source(commands: Dict[str, str], keywords: Dict[str, str]) -> str:
+    ret = "# Generated by `python -m gbstoolkit.dsl.command`, don't edit by hand!\n"
+    ret += "# Says what module every command is in, by name and by keyword, so the registries in cmd_base.py\n"
+    ret += "# can import them only once they're used.\n"
+    ret += "\nfrom typing import TYPE_CHECKING\n"
+    ret += "\nif TYPE_CHECKING:\n"
+    ret += "    # Never runs. Freezing tools like PyInstaller only find imports they can see, and import_module() isn't\n"
+    ret += "    # one, so this is what gets every command module bundled. Not `if False`, which gets compiled away.\n"
+    modules = sorted(set(commands.values()) | set(keywords.values()))
+    ret += "    from . import (  # noqa: F401\n"
+    ret += "".join("        " + i + ",\n" for i in modules)
+    ret += "    )\n"
+    for name, index in [("COMMAND_MODULES", commands), ("KEYWORD_MODULES", keywords)]:
+        ret += "\n" + name + " = {\n"
+        ret += ",\n".join('    "' + k + '": "' + index[k] + '"' for k in sorted(index.keys()))
+        ret += "\n}\n"
+    return ret
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate the index of which module every command is in")
+    parser.add_argument("--check", action="store_true", help="Only check the index, exit with 1 if it's out of date")
+    args = parser.parse_args()
+    source = index_source(*build_index())
+    with open(INDEX_FILE, encoding="utf-8") as file:
+        current = file.read()
+    if args.check:
+        print("index.py is " + ("up to date" if current == source else "out of date"))
+        sys.exit(0 if current == source else 1)
+    if current != source:
+        with open(INDEX_FILE, "w", encoding="utf-8") as file:
+            file.write(source)
+    print("Wrote " + str(len(source.splitlines())) + " lines to index.py")
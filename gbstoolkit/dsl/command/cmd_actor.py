@@ -1,14 +1,20 @@
 from collections import OrderedDict
 from typing import Dict, Optional, Union
-from uuid import UUID
 
 from .cmd_base import Command
-from ..datatypes import ActorID, UnionArgument
-from ..enums import Direction, MoveType
+from .cmd_spec import ACTOR, Arg, CommandSpec, Kind, Prop, SPRITE, UNION_DIRECTION, UNION_INT
+from ..datatypes import ActorID
+from ..enums import MoveType
 from ..marshalling import JsonSafe, serialize
 from ..util import NameUtil, NodeData
 
+MOVE_TYPE = Kind(MoveType, "serialize({0})", "MoveType.deserialize({0}).serialize()",
+                 {"serialize": serialize, "MoveType": MoveType})
+
+
 class ActorCollisionsDisableCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR))
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_COLLISIONS_DISABLE"
@@ -17,20 +23,10 @@ class ActorCollisionsDisableCommand(Command):
     def keyword() -> str:
         return "disableCollision"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [names.actor_for_id(args["actorId"])])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"actorId": names.id_for_actor(data.args[0])}
-
 
 class ActorCollisionsEnableCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR))
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_COLLISIONS_ENABLE"
@@ -39,20 +35,10 @@ class ActorCollisionsEnableCommand(Command):
     def keyword() -> str:
         return "enableCollision"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [names.actor_for_id(args["actorId"])])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"actorId": names.id_for_actor(data.args[0])}
-
 
 class ActorEmoteCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR), Arg("emoteId"))
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_EMOTE"
@@ -61,20 +47,10 @@ class ActorEmoteCommand(Command):
     def keyword() -> str:
         return "emote"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID, "emoteId": str}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [names.actor_for_id(args["actorId"]), args["emoteId"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"actorId": names.id_for_actor(data.args[0]), "emoteId": data.args[1]}
-
 
 class ActorGetDirectionCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR), Arg("direction"))
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_GET_DIRECTION"
@@ -83,20 +59,10 @@ class ActorGetDirectionCommand(Command):
     def keyword() -> str:
         return "storeDirection"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID, "direction": str}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [names.actor_for_id(args["actorId"]), args["direction"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"actorId": names.id_for_actor(data.args[0]), "direction": data.args[1]}
-
 
 class ActorGetPositionCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR), Arg("vectorX"), Arg("vectorY"))
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_GET_POSITION"
@@ -105,24 +71,10 @@ class ActorGetPositionCommand(Command):
     def keyword() -> str:
         return "storePosition"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID, "vectorX": str, "VectorY": str}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [names.actor_for_id(args["actorId"]), args["vectorX"], args["vectorY"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {
-            "actorId": names.id_for_actor(data.args[0]),
-            "vectorX": data.args[1],
-            "vectorY": data.args[2]
-        }
-
 
 class ActorHideCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR))
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_HIDE"
@@ -131,22 +83,10 @@ class ActorHideCommand(Command):
     def keyword() -> str:
         return "hide"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [names.actor_for_id(args["actorId"])])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {
-            "actorId": names.id_for_actor(data.args[0])
-        }
-
 
 class ActorInvokeCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR))
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_INVOKE"
@@ -155,20 +95,6 @@ class ActorInvokeCommand(Command):
     def keyword() -> str:
         return "interactWith"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [names.actor_for_id(args["actorId"])])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {
-            "actorId": names.id_for_actor(data.args[0])
-        }
-
 
 class ActorMoveRelativeCommand(Command):
     @staticmethod
@@ -211,6 +137,14 @@ class ActorMoveRelativeCommand(Command):
 
 
 class ActorMoveToCommand(Command):
+    spec = CommandSpec(
+        Arg("actorId", ACTOR),
+        Arg("x", UNION_INT),  # x and y 0-255
+        Arg("y", UNION_INT),
+        Prop("moveType", MOVE_TYPE, name="type"),
+        Prop("useCollisions", bool, name="collisions")
+    )
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_MOVE_TO"
@@ -219,44 +153,6 @@ class ActorMoveToCommand(Command):
     def keyword() -> str:
         return "moveTo"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        # x and y 0-255
-        return {
-            "actorId": ActorID,
-            "x": UnionArgument[int],
-            "y": UnionArgument[int],
-            "moveType": MoveType,
-            "useCollisions": bool
-        }
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(
-            OrderedDict({"type": serialize(args["moveType"]), "collisions": args["useCollisions"]}),
-            [
-                names.actor_for_id(args["actorId"]),
-                UnionArgument.format(args["x"], names),
-                UnionArgument.format(args["y"], names)
-            ]
-        )
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        if data.props is not None:
-            type = MoveType.deserialize(data.props["type"])
-            collisions = data.props["collisions"]
-        else:
-            type = MoveType.DIAGONAL
-            collisions = False
-        return {
-            "actorId": names.id_for_actor(data.args[0]),
-            "x": UnionArgument.parse(data.args[1], names),
-            "y": UnionArgument.parse(data.args[2], names),
-            "moveType": type.serialize(),
-            "useCollisions": collisions
-        }
-
 
 class ActorPushCommand(Command):
     @staticmethod
@@ -281,6 +177,8 @@ class ActorPushCommand(Command):
 
 
 class ActorSetAnimateCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR), Arg("animate", bool))
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_SET_ANIMATE"
@@ -289,20 +187,10 @@ class ActorSetAnimateCommand(Command):
     def keyword() -> str:
         return "setAnimate"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID, "animate": bool}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [names.actor_for_id(args["actorId"]), args["animate"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"actorId": names.id_for_actor(data.args[0]), "animate": data.args[1]}
-
 
 class ActorSetAnimationSpeedCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR), Arg("animSpeed", Union[None, int]))  # range null and 0-4
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_SET_ANIMATION_SPEED"
@@ -311,20 +199,10 @@ class ActorSetAnimationSpeedCommand(Command):
     def keyword() -> str:
         return "setAnimSpeed"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID, "animSpeed": Union[None, int]}  # range null and 0-4
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [names.actor_for_id(args["actorId"]), args["animSpeed"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"actorId": names.id_for_actor(data.args[0]), "animSpeed": data.args[1]}
-
 
 class ActorSetDirectionCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR), Arg("direction", UNION_DIRECTION))
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_SET_DIRECTION"
@@ -333,26 +211,10 @@ class ActorSetDirectionCommand(Command):
     def keyword() -> str:
         return "setDirection"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID, "direction": UnionArgument[Direction]}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [
-            names.actor_for_id(args["actorId"]),
-            UnionArgument.format(args["direction"], names)
-        ])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {
-            "actorId": names.id_for_actor(data.args[0]),
-            "direction": UnionArgument.parse(data.args[1], names, ("direction", Direction))
-        }
-
 
 class ActorSetFrameCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR), Arg("frame", UNION_INT))
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_SET_FRAME"
@@ -361,22 +223,10 @@ class ActorSetFrameCommand(Command):
     def keyword() -> str:
         return "setFrame"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID, "frame": UnionArgument[int]}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [
-            names.actor_for_id(args["actorId"]), UnionArgument.format(args["frame"], names)
-        ])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"actorId": names.id_for_actor(data.args[0]), "frame": UnionArgument.parse(data.args[1], names)}
-
 
 class ActorSetMovementSpeedCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR), Arg("speed", int))
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_SET_MOVEMENT_SPEED"
@@ -385,20 +235,10 @@ class ActorSetMovementSpeedCommand(Command):
     def keyword() -> str:
         return "setMoveSpeed"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID, "speed": int}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [names.actor_for_id(args["actorId"]), args["speed"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"actorId": names.id_for_actor(data.args[0]), "speed": data.args[1]}
-
 
 class ActorSetPositionCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR), Arg("x", UNION_INT), Arg("y", UNION_INT))
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_SET_POSITION"
@@ -407,31 +247,10 @@ class ActorSetPositionCommand(Command):
     def keyword() -> str:
         return "setPosition"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID, "x": UnionArgument[int], "y": UnionArgument[int]}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(
-            OrderedDict(),
-            [
-                names.actor_for_id(args["actorId"]),
-                UnionArgument.format(args["x"], names),
-                UnionArgument.format(args["y"], names)
-            ]
-        )
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {
-            "actorId": names.id_for_actor(data.args[0]),
-            "x": UnionArgument.parse(data.args[1], names),
-            "y": UnionArgument.parse(data.args[2], names)
-        }
-
 
 class ActorSetPositionRelativeCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR), Arg("x", int), Arg("y", int))
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_SET_POSITION_RELATIVE"
@@ -440,20 +259,10 @@ class ActorSetPositionRelativeCommand(Command):
     def keyword() -> str:
         return "changePosition"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID, "x": int, "y": int}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [names.actor_for_id(args["actorId"]), args["x"], args["y"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"actorId": names.id_for_actor(data.args[0]), "x": data.args[1], "y": data.args[2]}
-
 
 class ActorSetSpriteCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR), Arg("spriteSheetId", SPRITE))
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_SET_SPRITE"
@@ -462,20 +271,10 @@ class ActorSetSpriteCommand(Command):
     def keyword() -> str:
         return "setSprite"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID, "spriteSheetId": UUID}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [names.actor_for_id(args["actorId"]), names.sprite_for_id(args["spriteSheetId"])])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"actorId": names.id_for_actor(data.args[0]), "spriteSheetId": names.id_for_sprite(data.args[1])}
-
 
 class ActorShowCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR))
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_SHOW"
@@ -484,20 +283,10 @@ class ActorShowCommand(Command):
     def keyword() -> str:
         return "show"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [names.actor_for_id(args["actorId"])])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"actorId": names.id_for_actor(data.args[0])}
-
 
 class ActorStopUpdateScriptCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR))
+
     @staticmethod
     def name() -> str:
         return "EVENT_ACTOR_STOP_UPDATE"
@@ -506,20 +295,10 @@ class ActorStopUpdateScriptCommand(Command):
     def keyword() -> str:
         return "stopUpdate"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [names.actor_for_id(args["actorId"])])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"actorId": names.id_for_actor(data.args[0])}
-
 
 class PlayerBounceCommand(Command):
+    spec = CommandSpec(Arg("height"))  # TODO: enum?
+
     @staticmethod
     def name() -> str:
         return "EVENT_PLAYER_BOUNCE"
@@ -528,22 +307,10 @@ class PlayerBounceCommand(Command):
     def keyword() -> str:
         return "bounce"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"height": str}  # TODO: enum?
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [args["height"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {
-           "height": data.args[0]
-        }
-
 
 class PlayerSetSpriteCommand(Command):
+    spec = CommandSpec(Arg("spriteSheetId", SPRITE), Prop("persist", bool))
+
     @staticmethod
     def name() -> str:
         return "EVENT_PLAYER_SET_SPRITE"
@@ -552,23 +319,10 @@ class PlayerSetSpriteCommand(Command):
     def keyword() -> str:
         return "setPlayerSprite"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"spriteSheetId": UUID, "persist": bool}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict({"persist": args["persist"]}), [names.sprite_for_id(args["spriteSheetId"])])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {
-            "spriteSheetId": names.id_for_sprite(data.args[0]),
-            "persist": data.props["persist"]
-        }
-
 
 class SpritesHideCommand(Command):
+    spec = CommandSpec()
+
     @staticmethod
     def name() -> str:
         return "EVENT_SPRITES_HIDE"
@@ -577,20 +331,10 @@ class SpritesHideCommand(Command):
     def keyword() -> str:
         return "hideAll"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return None
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return None
-
 
 class SpritesShowCommand(Command):
+    spec = CommandSpec()
+
     @staticmethod
     def name() -> str:
         return "EVENT_SPRITES_SHOW"
@@ -598,15 +342,3 @@ class SpritesShowCommand(Command):
     @staticmethod
     def keyword() -> str:
         return "showAll"
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return None
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return None
\ No newline at end of file
@@ -1,25 +1,162 @@
 from abc import ABC, ABCMeta, abstractmethod
 from collections import OrderedDict
+from importlib import import_module
+from sys import intern
 from typing import Dict, List, Optional
 
 from kdl import Node
 
+from .cmd_shape import SKIPPED_NAMES, ShapeCache, compile_format, compile_parse, is_list, is_value, list_props
+from .cmd_spec import CommandSpec
+from .index import COMMAND_MODULES, KEYWORD_MODULES
 from ..marshalling import JsonSafe
-from ..util import NameUtil, NodeData, command_to_keyword
+from ..util import NameUtil, NodeData, command_to_keyword, keyword_to_command
 
-COMMANDS: Dict[str, "Command"] = {}  # Fills in automatically by subclassing Command! woooo
 
-KEYWORDS: Dict[str, "Command"] = {}
+class CommandRegistry(dict):
+    """
+    Commands by name or keyword. They get put in here as their modules are imported, and looking up one that isn't
+    yet imports the module it's in first, going by the index in index.py, so only the modules a project actually
+    uses ever get imported. Anything that goes over every command imports all of them first.
+    """
+
+    def __init__(self, modules: Dict[str, str]):
+        super().__init__()
+        self.modules = modules
+
+    def __missing__(self, key: str) -> "Command":
+        if key not in self.modules:
+            raise KeyError(key)
+        import_module("." + self.modules[key], __package__)
+        return dict.__getitem__(self, key)
+
+    def __contains__(self, key) -> bool:
+        return dict.__contains__(self, key) or key in self.modules
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        load_all_commands()
+        return super().keys()
+
+    def values(self):
+        load_all_commands()
+        return super().values()
+
+    def items(self):
+        load_all_commands()
+        return super().items()
+
+    def __iter__(self):
+        load_all_commands()
+        return super().__iter__()
+
+    def __len__(self) -> int:
+        load_all_commands()
+        return super().__len__()
+
+
+# Fills in automatically by subclassing Command! woooo
+COMMANDS: Dict[str, "Command"] = CommandRegistry(COMMAND_MODULES)
+
+KEYWORDS: Dict[str, "Command"] = CommandRegistry(KEYWORD_MODULES)
+
+_all_loaded = False
+
+
+def load_all_commands():
+    global _all_loaded
+    if not _all_loaded:
+        for module in sorted(set(COMMAND_MODULES.values())):
+            import_module("." + module, __package__)
+        _all_loaded = True
+
+
+# one Fallback for every command that isn't registered, by name and by keyword
+FALLBACKS: Dict[str, "Fallback"] = {}
+FALLBACK_KEYWORDS: Dict[str, "Fallback"] = {}
+
+
+def fallback_for_name(name: str) -> "Fallback":
+    try:
+        return FALLBACKS[name]
+    except KeyError:
+        ret = FALLBACKS[name] = Fallback(name)
+        return ret
+
+
+def command_for_name(name: str) -> "Command":
+    try:
+        return COMMANDS[name]
+    except KeyError:
+        return fallback_for_name(name)
+
+
+def command_for_keyword(keyword: str) -> "Command":
+    try:
+        return KEYWORDS[keyword]
+    except KeyError:
+        pass
+    try:
+        return FALLBACK_KEYWORDS[keyword]
+    except KeyError:
+        ret = FALLBACK_KEYWORDS[keyword] = fallback_for_name(keyword_to_command(keyword))
+        return ret
+
+
+class CommandInfo:
+    """
+    Everything the event code needs to know about a command, worked out once when it registers instead of calling
+    its static methods for every single event.
+    """
+    __slots__ = ("name", "keyword", "children_names", "is_switch", "is_custom_event_call", "is_fallback",
+                 "has_children")
+
+    def __init__(self, name: str, keyword: str, children_names: Optional[List[str]], is_fallback: bool = False):
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "keyword", keyword)
+        object.__setattr__(self, "children_names", tuple(children_names) if children_names is not None else None)
+        object.__setattr__(self, "is_switch", name == "EVENT_SWITCH")
+        object.__setattr__(self, "is_custom_event_call", name == "EVENT_CALL_CUSTOM_EVENT")
+        object.__setattr__(self, "is_fallback", is_fallback)
+        object.__setattr__(self, "has_children", children_names is not None)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("CommandInfo is read-only")
+
+    def __reduce__(self):
+        # fallbacks carry their own, and get pickled when scenes are handed to worker processes
+        return CommandInfo, (self.name, self.keyword, self.children_names, self.is_fallback)
+
+    def __repr__(self):
+        return "CommandInfo(" + self.name + ", " + self.keyword + ")"
 
 
 # Should only ever autoregister Command instances, so if not then we've got a looot more problems on our hands
 class AutoRegister(ABCMeta):
     # welcome to metaprogramming hell!
+    def __new__(mcs, name, bases, clsdict):
+        # commands with a spec get whatever they don't write themselves generated from it, before ABCMeta goes
+        # looking for abstract methods
+        spec = clsdict.get("spec")
+        if isinstance(spec, CommandSpec):
+            format, parse = spec.compile(name)
+            for k, v in [("format", format), ("parse", parse), ("required_args", spec.required_args),
+                         ("children_names", spec.children_names)]:
+                if k not in clsdict:
+                    clsdict[k] = staticmethod(v)
+        return super(AutoRegister, mcs).__new__(mcs, name, bases, clsdict)
+
     # noinspection PyTypeChecker
     def __init__(cls, name, bases, clsdict):
         if len(cls.mro()) == 4 and "name" in clsdict and "keyword" in clsdict:
             COMMANDS[cls.name()] = cls
             KEYWORDS[cls.keyword()] = cls
+            cls.info = CommandInfo(cls.name(), cls.keyword(), cls.children_names())
         super(AutoRegister, cls).__init__(name, bases, clsdict)
 
     @staticmethod
@@ -32,6 +169,9 @@ class AutoRegister(ABCMeta):
 
 
 class Command(ABC, metaclass=AutoRegister):
+    info: CommandInfo  # filled in by AutoRegister
+    spec: Optional[CommandSpec] = None  # see cmd_spec.py
+
     @staticmethod
     @abstractmethod
     def name() -> str:
@@ -86,9 +226,22 @@ class EndCommand(Command):  # TODO: good way to strip out of things/append autom
 
 # TODO: make me use JiK?
 class Fallback(Command):
+    """
+    Stands in for any command that isn't registered, like the ones plugins add, writing its args out as child nodes
+    as they are. There's only ever one for each name (see fallback_for_name), which keeps track of the shapes that
+    command's args come in, so the ones that keep coming up get their own format and parse (see cmd_shape.py).
+    """
+
     def __init__(self, name: str):
         self.fallback_name = name
         self.fallback_keyword = command_to_keyword(name)
+        self.info = CommandInfo(name, self.fallback_keyword, None, is_fallback=True)
+        self.format_shapes = ShapeCache(lambda args: compile_format(args, Fallback.format_list))
+        self.parse_shapes = ShapeCache(lambda children: compile_parse(children, Fallback.parse_list))
+
+    def __reduce__(self):
+        # the compiled shapes can't be pickled, and the process it ends up in has its own anyway
+        return fallback_for_name, (self.fallback_name,)
 
     @staticmethod
     def name() -> str:
@@ -102,61 +255,70 @@ class Fallback(Command):
     def required_args() -> Optional[Dict[str, type]]:
         return None
 
+    def format(self, args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
+        if args is None:
+            return NodeData(OrderedDict(), [], None)
+        compiled = self.format_shapes.get(tuple(args), args)
+        children = compiled(args, names) if compiled is not None else None
+        if children is None:
+            children = Fallback.format_dict(args, names)
+        return NodeData(OrderedDict(), [], children)
+
     @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        if args is not None:
-            children = []
-            for k, v in args.items():
-                if isinstance(v, dict):
-                    data = Fallback.format(v, names)
-                    children.append(Node(name=k, props=data.props, args=data.args, nodes=data.children))
-                elif isinstance(v, list):
-                    children.append(Node(
-                        name=k,
-                        props=OrderedDict({"__type": "list"}),
-                        nodes=Fallback.format_list(v, names))
-                    )
-                else:
-                    children.append(Node(name=k, args=[v]))
-            return NodeData(OrderedDict(), [], children)
-        return NodeData(OrderedDict(), [], None)
+    def format_dict(args: Dict[str, JsonSafe], names: NameUtil) -> List[Node]:
+        ret = []
+        for k, v in args.items():
+            if isinstance(v, dict):
+                ret.append(Node(name=k, nodes=Fallback.format_dict(v, names)))
+            elif isinstance(v, list):
+                ret.append(Node(name=k, props=list_props(), nodes=Fallback.format_list(v, names)))
+            else:
+                ret.append(Node(name=k, args=[v]))
+        return ret
 
     @staticmethod
     def format_list(entries: List[JsonSafe], names: NameUtil) -> List[Node]:
         ret = []
         for i in entries:
             if isinstance(i, dict):
-                ret.append(Node(name="-", nodes=Fallback.format(i, names).children))
+                ret.append(Node(name="-", nodes=Fallback.format_dict(i, names)))
             elif isinstance(i, list):
-                ret.append(Node(name="-", props=OrderedDict({"__type": "list"}), nodes=Fallback.format_list(i, names)))
+                ret.append(Node(name="-", props=list_props(), nodes=Fallback.format_list(i, names)))
             else:
                 ret.append(Node(name="-", args=[i]))
         return ret
 
+    def parse(self, data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
+        if data.children is None:
+            return {}
+        compiled = self.parse_shapes.get(tuple([i.name for i in data.children]), data.children)
+        ret = compiled(data.children, names) if compiled is not None else None
+        if ret is None:
+            ret = Fallback.parse_dict(data.children, names)
+        return ret
+
     @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
+    def parse_dict(children: List[Node], names: NameUtil) -> Dict[str, JsonSafe]:
         ret = {}
-        if data.children is not None:
-            for node in data.children:
-                if node.nodes is not None:
-                    if node.props is not None and "__type" in node.props and node.props["__type"] == "list":
-                        ret[node.name] = Fallback.parse_list(node.nodes, names)
-                    else:
-                        if node.name != "__collapse" and node.name != "__comment" and node.name != "__label":
-                            ret[node.name] = Fallback.parse(NodeData(OrderedDict(), [], node.nodes), names)
-                else:
-                    ret[node.name] = node.args[0]
+        for node in children:
+            if is_list(node):
+                ret[intern(node.name)] = Fallback.parse_list(node.nodes, names)
+            elif node.name in SKIPPED_NAMES:
+                continue
+            elif is_value(node):
+                ret[intern(node.name)] = node.args[0]
+            else:
+                ret[intern(node.name)] = Fallback.parse_dict(node.nodes, names)
         return ret
 
     @staticmethod
     def parse_list(children: List[Node], names: NameUtil) -> List[JsonSafe]:
         ret = []
         for node in children:
-            if node.nodes is not None:
-                if node.props is not None and "__type" in node.props and node.props["__type"] == "list":
-                    ret.append(Fallback.parse_list(node.nodes, names))
-                else:
-                    ret.append(Fallback.parse(NodeData(OrderedDict(), [], node.nodes), names))
-            else:
+            if is_list(node):
+                ret.append(Fallback.parse_list(node.nodes, names))
+            elif is_value(node):
                 ret.append(node.args[0])
-        return ret
\ No newline at end of file
+            else:
+                ret.append(Fallback.parse_dict(node.nodes, names))
+        return ret
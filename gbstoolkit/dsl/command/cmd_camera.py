@@ -1,12 +1,10 @@
-from collections import OrderedDict
-from typing import Dict, Optional
-
 from .cmd_base import Command
+from .cmd_spec import Arg, CommandSpec, Prop
 from ..enums import MoveType
-from ..marshalling import JsonSafe
-from ..util import NameUtil, NodeData
 
 class CameraLockCommand(Command):
+    spec = CommandSpec(Arg("speed", int))
+
     @staticmethod
     def name() -> str:
         return "EVENT_CAMERA_LOCK"
@@ -15,20 +13,10 @@ class CameraLockCommand(Command):
     def keyword() -> str:
         return "lockCamera"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"speed": int}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [args["speed"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"speed": data.args[0]}
-
 
 class CameraMoveToCommand(Command):
+    spec = CommandSpec(Arg("x", int), Arg("y", int), Prop("speed", int))
+
     @staticmethod
     def name() -> str:
         return "EVENT_CAMERA_MOVE_TO"
@@ -37,20 +25,10 @@ class CameraMoveToCommand(Command):
     def keyword() -> str:
         return "moveCameraTo"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"x": int, "y": int, "speed": int}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict({"speed": args["speed"]}), [args["x"], args["y"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"x": data.args[0], "y": data.args[1], "speed": data.props["speed"]}
-
 
 class CameraShakeCommand(Command):
+    spec = CommandSpec(Arg("time", float), Arg("shakeDirection", MoveType, default="horizontal"))
+
     @staticmethod
     def name() -> str:
         return "EVENT_CAMERA_SHAKE"
@@ -58,15 +36,3 @@ class CameraShakeCommand(Command):
     @staticmethod
     def keyword() -> str:
         return "shakeCamera"
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"shakeDirection": MoveType, "time": float}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [args["time"], args["shakeDirection"] if "shakeDirection" in args else "horizontal"])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"time": data.args[0], "shakeDirection": data.args[1]}
\ No newline at end of file
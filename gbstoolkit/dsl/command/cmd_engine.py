@@ -2,6 +2,7 @@ from collections import OrderedDict
 from typing import Dict, Optional, Union
 
 from .cmd_base import Command
+from .cmd_spec import Arg, CommandSpec, Kind, VARIABLE
 from ..datatypes import UnionArgument
 from ..enums import OverlayColor
 from ..marshalling import JsonSafe
@@ -24,6 +25,9 @@ FIELD_NAMES = {
 
 INVERSE_FIELD_NAMES = {v: k for k, v in FIELD_NAMES.items()}
 
+ENGINE_FIELD = Kind(str, "FIELD_NAMES[{0}]", "INVERSE_FIELD_NAMES[{0}]",
+                    {"FIELD_NAMES": FIELD_NAMES, "INVERSE_FIELD_NAMES": INVERSE_FIELD_NAMES})
+
 
 class EngineFieldSetCommand(Command):
     @staticmethod
@@ -55,6 +59,8 @@ class EngineFieldSetCommand(Command):
 
 
 class EngineFieldStoreCommand(Command):
+    spec = CommandSpec(Arg("engineFieldKey", ENGINE_FIELD), Arg("value", VARIABLE))
+
     @staticmethod
     def name() -> str:
         return "EVENT_ENGINE_FIELD_STORE"
@@ -62,15 +68,3 @@ class EngineFieldStoreCommand(Command):
     @staticmethod
     def keyword() -> str:
         return "storeEngineField"
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"engineFieldKey": str, "value": str}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [FIELD_NAMES[args["engineFieldKey"]], "$" + args["value"] + "$"])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"engineFieldKey": INVERSE_FIELD_NAMES[data.args[0]], "value": data.args[1][1:-1]}
@@ -1,18 +1,22 @@
 from collections import OrderedDict
-from typing import Dict, List, Optional, Tuple, Union
-from uuid import UUID
+from typing import Dict, List, Optional, Tuple
 
 from kdl import Node
 
 from .cmd_base import Command
-from ..datatypes import ActorID
+from .cmd_spec import ACTOR, Arg, CommandSpec, ELSE_PROPS, Kind, Prop, Rest, VARIABLE
 from ..enums import Direction, RelativeActorPosition
-from ..marshalling import JsonSafe, serialize
+from ..marshalling import JsonSafe
 from ..util import NameUtil, NodeData
 
+RELATIVE_POSITION = Kind(RelativeActorPosition, "RelativeActorPosition.format({0})", "RelativeActorPosition.parse({0})",
+                         {"RelativeActorPosition": RelativeActorPosition})
+
 
 # TODO: single child so make it a direct child (in event.py)
 class GroupCommand(Command):
+    spec = CommandSpec(children=["true"])
+
     @staticmethod
     def name() -> str:
         return "EVENT_GROUP"
@@ -21,24 +25,10 @@ class GroupCommand(Command):
     def keyword() -> str:
         return "group"
 
-    @staticmethod
-    def children_names() -> Optional[List[str]]:
-        return ["true"]
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return None
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return None
-
 
 class IfActorAtPositionCommand(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR), Arg("x", int), Arg("y", int), *ELSE_PROPS, children=["true", "false"])
+
     @staticmethod
     def name() -> str:
         return "EVENT_IF_ACTOR_AT_POSITION"
@@ -47,37 +37,10 @@ class IfActorAtPositionCommand(Command):
     def keyword() -> str:
         return "ifActorAtPosition"
 
-    @staticmethod
-    def children_names() -> Optional[List[str]]:
-        return ["true", "false"]
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID, "x": int, "y": int}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        props = OrderedDict({})
-        if "__disableElse" in args:
-            props["__disableElse"] = args["__disableElse"]
-        if "__collapseElse" in args:
-            props["__collapseElse"] = args["__collapseElse"]
-        return NodeData(
-            props,
-            [names.actor_for_id(args["actorId"]), args["x"], args["y"]]
-        )
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        ret = {"actorId": names.id_for_actor(data.args[0]), "x": data.args[1], "y": data.args[2]}
-        if "__disableElse" in data.props:
-            ret["__disableElse"] = data.props["__disableElse"]
-        if "__collapseElse" in data.props:
-            ret["__collapseElse"] = data.props["__collapseElse"]
-        return ret
-
 
 class IfActorFacing(Command):
+    spec = CommandSpec(Arg("actorId", ACTOR), Arg("direction", Direction), *ELSE_PROPS, children=["true", "false"])
+
     @staticmethod
     def name() -> str:
         return "EVENT_IF_ACTOR_DIRECTION"
@@ -86,37 +49,16 @@ class IfActorFacing(Command):
     def keyword() -> str:
         return "ifActorFacing"
 
-    @staticmethod
-    def children_names() -> Optional[List[str]]:
-        return ["true", "false"]
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID, "direction": Direction}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        props = OrderedDict({})
-        if "__disableElse" in args:
-            props["__disableElse"] = args["__disableElse"]
-        if "__collapseElse" in args:
-            props["__collapseElse"] = args["__collapseElse"]
-        return NodeData(
-            props,
-            [names.actor_for_id(args["actorId"]), args["direction"]]
-        )
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        ret = {"actorId": names.id_for_actor(data.args[0]), "direction": data.args[1]}
-        if "__disableElse" in data.props:
-            ret["__disableElse"] = data.props["__disableElse"]
-        if "__collapseElse" in data.props:
-            ret["__collapseElse"] = data.props["__collapseElse"]
-        return ret
-
 
 class IfActorRelativeTo(Command):
+    spec = CommandSpec(
+        Arg("actorId", ACTOR),
+        Arg("operation", RELATIVE_POSITION),
+        Arg("otherActorId", ACTOR),
+        *ELSE_PROPS,
+        children=["true", "false"]
+    )
+
     @staticmethod
     def name() -> str:
         return "EVENT_IF_ACTOR_RELATIVE_TO_ACTOR"
@@ -125,45 +67,10 @@ class IfActorRelativeTo(Command):
     def keyword() -> str:
         return "ifActorRelativeTo"
 
-    @staticmethod
-    def children_names() -> Optional[List[str]]:
-        return ["true", "false"]
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"actorId": ActorID, "otherActorId": ActorID, "operation": RelativeActorPosition}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        props = OrderedDict({})
-        if "__disableElse" in args:
-            props["__disableElse"] = args["__disableElse"]
-        if "__collapseElse" in args:
-            props["__collapseElse"] = args["__collapseElse"]
-        return NodeData(
-            props,
-            [
-                names.actor_for_id(args["actorId"]),
-                RelativeActorPosition.format(args["operation"]),
-                names.actor_for_id(args["otherActorId"])
-            ]
-        )
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        ret = {
-            "actorId": names.id_for_actor(data.args[0]),
-            "operation": RelativeActorPosition.parse(data.args[1]),
-            "otherActorId": names.id_for_actor(data.args[2])
-        }
-        if "__disableElse" in data.props:
-            ret["__disableElse"] = data.props["__disableElse"]
-        if "__collapseElse" in data.props:
-            ret["__collapseElse"] = data.props["__collapseElse"]
-        return ret
-
 
 class IfColorSupportedCommand(Command):
+    spec = CommandSpec(*ELSE_PROPS, children=["true", "false"])
+
     @staticmethod
     def name() -> str:
         return "EVENT_IF_COLOR_SUPPORTED"
@@ -172,37 +79,10 @@ class IfColorSupportedCommand(Command):
     def keyword() -> str:
         return "ifColorSupported"
 
-    @staticmethod
-    def children_names() -> Optional[List[str]]:
-        return ["true", "false"]
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return None
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        props = OrderedDict({})
-        if "__disableElse" in args:
-            props["__disableElse"] = args["__disableElse"]
-        if "__collapseElse" in args:
-            props["__collapseElse"] = args["__collapseElse"]
-        return NodeData(
-            props,
-            []
-        )
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        ret = {}
-        if "__disableElse" in data.props:
-            ret["__disableElse"] = data.props["__disableElse"]
-        if "__collapseElse" in data.props:
-            ret["__collapseElse"] = data.props["__collapseElse"]
-        return ret
-
 
 class IfSavedDataCommand(Command):
+    spec = CommandSpec(*ELSE_PROPS, children=["true", "false"])
+
     @staticmethod
     def name() -> str:
         return "EVENT_IF_SAVED_DATA"
@@ -211,37 +91,10 @@ class IfSavedDataCommand(Command):
     def keyword() -> str:
         return "ifSaveExists"
 
-    @staticmethod
-    def children_names() -> Optional[List[str]]:
-        return ["true", "false"]
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return None
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        props = OrderedDict({})
-        if "__disableElse" in args:
-            props["__disableElse"] = args["__disableElse"]
-        if "__collapseElse" in args:
-            props["__collapseElse"] = args["__collapseElse"]
-        return NodeData(
-            props,
-            []
-        )
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        ret = {}
-        if "__disableElse" in data.props:
-            ret["__disableElse"] = data.props["__disableElse"]
-        if "__collapseElse" in data.props:
-            ret["__collapseElse"] = data.props["__collapseElse"]
-        return ret
-
 
 class IfInputCommand(Command):
+    spec = CommandSpec(Rest("input"), *ELSE_PROPS, children=["true", "false"])
+
     @staticmethod
     def name() -> str:
         return "EVENT_IF_INPUT"
@@ -250,37 +103,16 @@ class IfInputCommand(Command):
     def keyword() -> str:
         return "ifAnyPressed"
 
-    @staticmethod
-    def children_names() -> Optional[List[str]]:
-        return ["true", "false"]
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"input": List[str]}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        props = OrderedDict({})
-        if "__disableElse" in args:
-            props["__disableElse"] = args["__disableElse"]
-        if "__collapseElse" in args:
-            props["__collapseElse"] = args["__collapseElse"]
-        return NodeData(
-            props,
-            args["input"]
-        )
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        ret = {"input": data.args}
-        if "__disableElse" in data.props:
-            ret["__disableElse"] = data.props["__disableElse"]
-        if "__collapseElse" in data.props:
-            ret["__collapseElse"] = data.props["__collapseElse"]
-        return ret
-
 
 class IfVariableCompareCommand(Command):
+    spec = CommandSpec(
+        Arg("vectorX", VARIABLE),
+        Arg("operation"),
+        Arg("vectorY", VARIABLE),
+        *ELSE_PROPS,
+        children=["true", "false"]
+    )
+
     @staticmethod
     def name() -> str:
         return "EVENT_IF_VALUE_COMPARE"
@@ -289,37 +121,10 @@ class IfVariableCompareCommand(Command):
     def keyword() -> str:
         return "ifCompareVars"
 
-    @staticmethod
-    def children_names() -> Optional[List[str]]:
-        return ["true", "false"]
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"vectorX": str, "operation": str, "vectorY": str}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        props = OrderedDict({})
-        if "__disableElse" in args:
-            props["__disableElse"] = args["__disableElse"]
-        if "__collapseElse" in args:
-            props["__collapseElse"] = args["__collapseElse"]
-        return NodeData(
-            props,
-            ["$" + args["vectorX"] + "$", args["operation"], "$" + args["vectorY"] + "$"]
-        )
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        ret = {"vectorX": data.args[0][1:-1], "operation": data.args[1], "vectorY": data.args[2][1:-1]}
-        if "__disableElse" in data.props:
-            ret["__disableElse"] = data.props["__disableElse"]
-        if "__collapseElse" in data.props:
-            ret["__collapseElse"] = data.props["__collapseElse"]
-        return ret
-
 
 class IfVariableFalseCommand(Command):
+    spec = CommandSpec(Arg("variable", VARIABLE), *ELSE_PROPS, children=["true", "false"])
+
     @staticmethod
     def name() -> str:
         return "EVENT_IF_FALSE"
@@ -328,37 +133,10 @@ class IfVariableFalseCommand(Command):
     def keyword() -> str:
         return "ifFalse"
 
-    @staticmethod
-    def children_names() -> Optional[List[str]]:
-        return ["true", "false"]
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"variable": str}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        props = OrderedDict({})
-        if "__disableElse" in args:
-            props["__disableElse"] = args["__disableElse"]
-        if "__collapseElse" in args:
-            props["__collapseElse"] = args["__collapseElse"]
-        return NodeData(
-            props,
-            ["$" + args["variable"] + "$"]
-        )
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        ret = {"variable": data.args[0][1:-1]}
-        if "__disableElse" in data.props:
-            ret["__disableElse"] = data.props["__disableElse"]
-        if "__collapseElse" in data.props:
-            ret["__collapseElse"] = data.props["__collapseElse"]
-        return ret
-
 
 class IfVariableFlagCompareCommand(Command):
+    spec = CommandSpec(Arg("variable", VARIABLE), Arg("flag", int), *ELSE_PROPS, children=["true", "false"])
+
     @staticmethod
     def name() -> str:
         return "EVENT_IF_FLAGS_COMPARE"
@@ -367,37 +145,10 @@ class IfVariableFlagCompareCommand(Command):
     def keyword() -> str:
         return "ifFlag"
 
-    @staticmethod
-    def children_names() -> Optional[List[str]]:
-        return ["true", "false"]
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"variable": str, "flag": int}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        props = OrderedDict({})
-        if "__disableElse" in args:
-            props["__disableElse"] = args["__disableElse"]
-        if "__collapseElse" in args:
-            props["__collapseElse"] = args["__collapseElse"]
-        return NodeData(
-            props,
-            ["$" + args["variable"] + "$", args["flag"]]
-        )
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        ret = {"variable": data.args[0][1:-1], "flag": data.args[1]}
-        if "__disableElse" in data.props:
-            ret["__disableElse"] = data.props["__disableElse"]
-        if "__collapseElse" in data.props:
-            ret["__collapseElse"] = data.props["__collapseElse"]
-        return ret
-
 
 class IfVariableTrueCommand(Command):
+    spec = CommandSpec(Arg("variable", VARIABLE), *ELSE_PROPS, children=["true", "false"])
+
     @staticmethod
     def name() -> str:
         return "EVENT_IF_TRUE"
@@ -406,37 +157,16 @@ class IfVariableTrueCommand(Command):
     def keyword() -> str:
         return "ifTrue"
 
-    @staticmethod
-    def children_names() -> Optional[List[str]]:
-        return ["true", "false"]
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"variable": str}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        props = OrderedDict({})
-        if "__disableElse" in args:
-            props["__disableElse"] = args["__disableElse"]
-        if "__collapseElse" in args:
-            props["__collapseElse"] = args["__collapseElse"]
-        return NodeData(
-            props,
-            ["$" + args["variable"] + "$"]
-        )
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        ret = {"variable": data.args[0][1:-1]}
-        if "__disableElse" in data.props:
-            ret["__disableElse"] = data.props["__disableElse"]
-        if "__collapseElse" in data.props:
-            ret["__collapseElse"] = data.props["__collapseElse"]
-        return ret
-
 
 class IfValueCompareCommand(Command):
+    spec = CommandSpec(
+        Arg("variable", VARIABLE),
+        Arg("operator"),
+        Arg("comparator", int),
+        *ELSE_PROPS,
+        children=["true", "false"]
+    )
+
     @staticmethod
     def name() -> str:
         return "EVENT_IF_VALUE"
@@ -445,37 +175,10 @@ class IfValueCompareCommand(Command):
     def keyword() -> str:
         return "ifValue"
 
-    @staticmethod
-    def children_names() -> Optional[List[str]]:
-        return ["true", "false"]
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"variable": str, "operator": str, "comparator": int}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        props = OrderedDict({})
-        if "__disableElse" in args:
-            props["__disableElse"] = args["__disableElse"]
-        if "__collapseElse" in args:
-            props["__collapseElse"] = args["__collapseElse"]
-        return NodeData(
-            props,
-            ["$" + args["variable"] + "$", args["operator"], args["comparator"]]
-        )
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        ret = {"variable": data.args[0][1:-1], "operator": data.args[1], "comparator": data.args[2]}
-        if "__disableElse" in data.props:
-            ret["__disableElse"] = data.props["__disableElse"]
-        if "__collapseElse" in data.props:
-            ret["__collapseElse"] = data.props["__collapseElse"]
-        return ret
-
 
 class InputAwaitCommand(Command):
+    spec = CommandSpec(Rest("input"))
+
     @staticmethod
     def name() -> str:
         return "EVENT_AWAIT_INPUT"
@@ -484,20 +187,10 @@ class InputAwaitCommand(Command):
     def keyword() -> str:
         return "awaitInput"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"input": List[str]}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), args["input"])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"input": data.args}
-
 
 class InputScriptRemoveCommand(Command):
+    spec = CommandSpec(Rest("input"), children=["true"])
+
     @staticmethod
     def name() -> str:
         return "EVENT_REMOVE_INPUT_SCRIPT"
@@ -506,24 +199,10 @@ class InputScriptRemoveCommand(Command):
     def keyword() -> str:
         return "removeInputScript"
 
-    @staticmethod
-    def children_names() -> Optional[List[str]]:
-        return ["true"]
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"input": List[str]}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), args["input"])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"input": data.args}
-
 
 class InputScriptSetCommand(Command):
+    spec = CommandSpec(Rest("input"), Prop("persist", bool, default=False), children=["true"])
+
     @staticmethod
     def name() -> str:
         return "EVENT_SET_INPUT_SCRIPT"
@@ -532,24 +211,10 @@ class InputScriptSetCommand(Command):
     def keyword() -> str:
         return "setInputScript"
 
-    @staticmethod
-    def children_names() -> Optional[List[str]]:
-        return ["true"]
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"input": List[str], "persist": bool}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict({"persist": args["persist"] if "persist" in args else False}), args["input"])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"input": data.args, "persist": data.props["persist"] if "persist" in data.props else False}
-
 
 class LabelDefineCommand(Command):
+    spec = CommandSpec(Arg("label"))
+
     @staticmethod
     def name() -> str:
         return "EVENT_DEFINE_LABEL"
@@ -558,20 +223,10 @@ class LabelDefineCommand(Command):
     def keyword() -> str:
         return "label"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"label": str}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [args["label"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"label": data.args[0]}
-
 
 class LabelGotoCommand(Command):
+    spec = CommandSpec(Arg("label"))
+
     @staticmethod
     def name() -> str:
         return "EVENT_GOTO_LABEL"
@@ -580,21 +235,11 @@ class LabelGotoCommand(Command):
     def keyword() -> str:
         return "goto"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"label": str}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [args["label"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"label": data.args[0]}
-
 
 # TODO: single child so make it a direct child (in event.py)
 class LoopCommand(Command):
+    spec = CommandSpec(children=["true"])
+
     @staticmethod
     def name() -> str:
         return "EVENT_LOOP"
@@ -603,22 +248,6 @@ class LoopCommand(Command):
     def keyword() -> str:
         return "loop"
 
-    @staticmethod
-    def children_names() -> Optional[List[str]]:
-        return ["true"]
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return None
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return None
-
 
 # oh god oh fuck this is a mess
 class SwitchCommand(Command):
@@ -652,9 +281,9 @@ class SwitchCommand(Command):
     @staticmethod
     def parse_children_names(data: NodeData) -> Dict[str, List[Node]]:
         ret = {}
-        for i in data.children:
+        for index, i in enumerate(data.children):
             if i.name == "case":
-                ret["true" + str(data.children.index(i))] = i.nodes
+                ret["true" + str(index)] = i.nodes
             elif i.name == "default":
                 ret["false"] = i.nodes
         return ret
@@ -668,10 +297,9 @@ class SwitchCommand(Command):
         ret = {"variable": data.args[0][1:-1]}
         choices = 0
         has_default = False
-        for i in data.children:
+        for index, i in enumerate(data.children):
             if i.name == "case":
                 choices += 1
-                index = data.children.index(i)
                 ret["value" + str(index)] = i.args[0]
                 ret["__collapseCase" + str(index)] = i.props["__collapse"] if "__collapse" in i.props else False
             elif i.name == "default":
@@ -3,10 +3,10 @@ from typing import Dict, List, Optional
 from uuid import UUID
 
 from .cmd_base import Command
+from .cmd_spec import Arg, CommandSpec, PALETTE, Prop, SONG
 from ..datatypes import ActorID, UnionArgument
 from ..enums import Direction, OverlayColor, SoundEffectType
 from ..marshalling import JsonSafe
-from ..palette import PaletteID
 from ..util import NameUtil, NodeData
 
 
@@ -52,6 +52,8 @@ class CallCustomEventCommand(Command):
 
 
 class CommentCommand(Command):
+    spec = CommandSpec(Arg("text"))
+
     @staticmethod
     def name() -> str:
         return "EVENT_COMMENT"
@@ -60,20 +62,10 @@ class CommentCommand(Command):
     def keyword() -> str:
         return "note"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"text": str}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [args["text"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"text": data.args[0]}
-
 
 class DataClearCommand(Command):
+    spec = CommandSpec()
+
     @staticmethod
     def name() -> str:
         return "EVENT_DATA_CLEAR"
@@ -82,20 +74,10 @@ class DataClearCommand(Command):
     def keyword() -> str:
         return "clearSave"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return None
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return None
-
 
 class DataLoadCommand(Command):
+    spec = CommandSpec()
+
     @staticmethod
     def name() -> str:
         return "EVENT_LOAD_DATA"
@@ -104,20 +86,10 @@ class DataLoadCommand(Command):
     def keyword() -> str:
         return "loadSave"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return None
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return None
-
 
 class DataSaveCommand(Command):
+    spec = CommandSpec()
+
     @staticmethod
     def name() -> str:
         return "EVENT_SAVE_DATA"
@@ -126,18 +98,6 @@ class DataSaveCommand(Command):
     def keyword() -> str:
         return "createSave"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return None
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return None
-
 
 class LaunchProjectileCommand(Command):
     @staticmethod
@@ -195,6 +155,8 @@ class LaunchProjectileCommand(Command):
 
 
 class MusicPlayCommand(Command):
+    spec = CommandSpec(Arg("musicId", SONG), Prop("loop", bool))
+
     @staticmethod
     def name() -> str:
         return "EVENT_MUSIC_PLAY"
@@ -203,20 +165,10 @@ class MusicPlayCommand(Command):
     def keyword() -> str:
         return "playMusic"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"musicId": UUID, "loop": bool}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict({"loop": args["loop"]}), [names.song_for_id(args["musicId"])])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"musicId": names.id_for_song(data.args[0]), "loop": data.props["loop"]}
-
 
 class MusicStopCommand(Command):
+    spec = CommandSpec()
+
     @staticmethod
     def name() -> str:
         return "EVENT_MUSIC_STOP"
@@ -225,20 +177,10 @@ class MusicStopCommand(Command):
     def keyword() -> str:
         return "stopMusic"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return None
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return None
-
 
 class OverlayHideCommand(Command):
+    spec = CommandSpec()
+
     @staticmethod
     def name() -> str:
         return "EVENT_OVERLAY_HIDE"
@@ -247,20 +189,10 @@ class OverlayHideCommand(Command):
     def keyword() -> str:
         return "hideOverlay"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return None
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return None
-
 
 class OverlayMoveToCommand(Command):
+    spec = CommandSpec(Arg("x", int), Arg("y", int), Prop("speed"))
+
     @staticmethod
     def name() -> str:
         return "EVENT_OVERLAY_MOVE_TO"
@@ -269,20 +201,10 @@ class OverlayMoveToCommand(Command):
     def keyword() -> str:
         return "moveOverlay"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"x": int, "y": int, "speed": str}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict({"speed": args["speed"]}), [args["x"], args["y"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"x": data.args[0], "y": data.args[1], "speed": data.props["speed"]}
-
 
 class OverlayShowCommand(Command):
+    spec = CommandSpec(Arg("x", int), Arg("y", int), Prop("color", OverlayColor, default="black", required=True))
+
     @staticmethod
     def name() -> str:
         return "EVENT_OVERLAY_SHOW"
@@ -291,24 +213,10 @@ class OverlayShowCommand(Command):
     def keyword() -> str:
         return "showOverlay"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"color": OverlayColor, "x": int, "y": int}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict({"color": args["color"]}), [args["x"], args["y"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {
-            "x": data.args[0],
-            "y": data.args[1],
-            "color": data.props["color"] if "color" in data.props else "black"
-        }
-
 
 class PaletteSetBackgroundCommand(Command):
+    spec = CommandSpec(*[Arg("palette" + str(i), PALETTE) for i in range(6)])
+
     @staticmethod
     def name() -> str:
         return "EVENT_PALETTE_SET_BACKGROUND"
@@ -317,48 +225,10 @@ class PaletteSetBackgroundCommand(Command):
     def keyword() -> str:
         return "setBackgroundPalette"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {
-            "palette0": PaletteID,
-            "palette1": PaletteID,
-            "palette2": PaletteID,
-            "palette3": PaletteID,
-            "palette4": PaletteID,
-            "palette5": PaletteID
-        }
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(),
-                        [names.palette_for_id(args["palette" + str(i)]) if args["palette" + str(i)] != "" else ""
-                         for i in range(6)]
-                        )
-        # kept around in case this list comp doesn't work
-        # return NodeData(OrderedDict(), [
-        #     names.palette_for_id(args["palette0"]) if args["palette0"] != "" else "",
-        #     names.palette_for_id(args["palette1"]) if args["palette1"] != "" else "",
-        #     names.palette_for_id(args["palette2"]) if args["palette2"] != "" else "",
-        #     names.palette_for_id(args["palette3"]) if args["palette3"] != "" else "",
-        #     names.palette_for_id(args["palette4"]) if args["palette4"] != "" else "",
-        #     names.palette_for_id(args["palette5"]) if args["palette5"] != "" else ""
-        # ])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"palette" + str(i): names.id_for_palette(data.args[i]) if data.args[i] != "" else "" for i in range(6)}
-        # kept around in case this dict comp doesn't work
-        # return {
-        #     "palette0": names.id_for_palette(data.args[0]) if data.args[0] != "" else "",
-        #     "palette1": names.id_for_palette(data.args[1]) if data.args[1] != "" else "",
-        #     "palette2": names.id_for_palette(data.args[2]) if data.args[2] != "" else "",
-        #     "palette3": names.id_for_palette(data.args[3]) if data.args[3] != "" else "",
-        #     "palette4": names.id_for_palette(data.args[4]) if data.args[4] != "" else "",
-        #     "palette5": names.id_for_palette(data.args[5]) if data.args[5] != "" else "",
-        # }
-
 
 class PaletteSetUICommand(Command):
+    spec = CommandSpec(Arg("palette", PALETTE))
+
     @staticmethod
     def name() -> str:
         return "EVENT_PALETTE_SET_UI"
@@ -367,22 +237,10 @@ class PaletteSetUICommand(Command):
     def keyword() -> str:
         return "setUIPalette"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"palette": PaletteID}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [names.palette_for_id(args["palette"]) if args["palette"] != "" else ""])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {
-            "palette": names.id_for_palette(data.args[0]) if data.args[0] != "" else ""
-        }
-
 
 class ScriptStopCommand(Command):
+    spec = CommandSpec()
+
     @staticmethod
     def name() -> str:
         return "EVENT_STOP"
@@ -391,18 +249,6 @@ class ScriptStopCommand(Command):
     def keyword() -> str:
         return "stop"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return None
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return None
-
 
 class SoundPlayEffectCommand(Command):
     @staticmethod
@@ -423,7 +269,7 @@ class SoundPlayEffectCommand(Command):
         if args["type"] == "beep":
             props["pitch"] = args["pitch"]
         elif args["type"] == "tone":
-            props["tone"] = args["tone"]
+            props["frequency"] = args["frequency"]
         props["wait"] = args["wait"]
         return NodeData(props, [args["type"], args["duration"]])
 
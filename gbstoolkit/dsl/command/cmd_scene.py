@@ -1,13 +1,13 @@
-from collections import OrderedDict
-from typing import Dict, Optional, Union
-from uuid import UUID
-
 from .cmd_base import Command
+from .cmd_spec import Arg, CommandSpec, Kind, Prop, SCENE
 from ..enums import Direction
-from ..marshalling import JsonSafe
-from ..util import NameUtil, NodeData
+
+FADE_SPEED = Kind(str, "int({0})", "str({0})")  # why is it a string aaaaaaaa
+
 
 class ScenePopAllStateCommand(Command):
+    spec = CommandSpec(Prop("fadeSpeed", FADE_SPEED))
+
     @staticmethod
     def name() -> str:
         return "EVENT_SCENE_POP_ALL_STATE"
@@ -16,21 +16,10 @@ class ScenePopAllStateCommand(Command):
     def keyword() -> str:
         return "popAllScenes"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"fadeSpeed": str}  # why is it a string aaaaaaaa
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict({"fadeSpeed": int(args["fadeSpeed"])}), [])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {
-            "fadeSpeed": str(data.props["fadeSpeed"])
-        }
 
 class ScenePopStateCommand(Command):
+    spec = CommandSpec(Prop("fadeSpeed", FADE_SPEED))
+
     @staticmethod
     def name() -> str:
         return "EVENT_SCENE_POP_STATE"
@@ -39,22 +28,10 @@ class ScenePopStateCommand(Command):
     def keyword() -> str:
         return "popScene"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"fadeSpeed": str}  # why is it a string aaaaaaaa
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict({"fadeSpeed": int(args["fadeSpeed"])}), [])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {
-            "fadeSpeed": str(data.props["fadeSpeed"])
-        }
-
 
 class ScenePushStateCommand(Command):
+    spec = CommandSpec()
+
     @staticmethod
     def name() -> str:
         return "EVENT_SCENE_PUSH_STATE"
@@ -63,20 +40,10 @@ class ScenePushStateCommand(Command):
     def keyword() -> str:
         return "pushScene"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return None
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return None
-
 
 class SceneResetStateCommand(Command):
+    spec = CommandSpec()
+
     @staticmethod
     def name() -> str:
         return "EVENT_SCENE_RESET_STATE"
@@ -85,20 +52,16 @@ class SceneResetStateCommand(Command):
     def keyword() -> str:
         return "clearSceneStack"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return None
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return None
-
 
 class SceneSwitchCommand(Command):
+    spec = CommandSpec(
+        Arg("sceneId", SCENE),
+        Prop("x", int),
+        Prop("y", int),
+        Prop("direction", Direction, default="", omit_default=True, required=True),
+        Prop("fadeSpeed", int)
+    )
+
     @staticmethod
     def name() -> str:
         return "EVENT_SWITCH_SCENE"
@@ -106,27 +69,3 @@ class SceneSwitchCommand(Command):
     @staticmethod
     def keyword() -> str:
         return "changeScene"
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"sceneId": UUID, "x": int, "y": int, "direction": Direction, "fadeSpeed": int}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        props = OrderedDict()
-        props["x"] = args["x"]
-        props["y"] = args["y"]
-        if args["direction"] != "":
-            props["direction"] = args["direction"]
-        props["fadeSpeed"] = args["fadeSpeed"]
-        return NodeData(props, [names.scene_for_id(args["sceneId"])])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {
-            "sceneId": names.id_for_scene(data.args[0]),
-            "x": data.props["x"],
-            "y": data.props["y"],
-            "direction": data.props["direction"] if "direction" in data.props else "",
-            "fadeSpeed": data.props["fadeSpeed"]
-        }
@@ -0,0 +1,147 @@
+"""
+Specialized format and parse for commands the toolkit doesn't know, like the ones plugins add. Fallback has to work
+out what every value is as it goes, but a plugin command's args come with the same keys holding the same kinds of
+values nearly every time, so once one shape has come up often enough, it gets compiled into straight-line code like
+the functions cmd_spec.py makes. The compiled functions check that what they're given still has that shape, and
+return None if it doesn't, so Fallback can do it the slow way instead.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from kdl import Node
+
+from ..marshalling import JsonSafe
+
+# how many times a shape has to come up before it's worth compiling, since that takes as long as a few dozen events
+COMPILE_AFTER = 4
+# and how many get compiled for one command at most, in case its args are all over the place
+MAX_SHAPES = 16
+
+# written out as part of the args, but put back from the event's props when parsing instead
+SKIPPED_NAMES = ("__collapse", "__comment", "__label")
+
+
+def list_props() -> OrderedDict:
+    ret = OrderedDict()
+    ret["__type"] = "list"
+    return ret
+
+
+def is_list(node: Node) -> bool:
+    return "__type" in node.props and node.props["__type"] == "list"
+
+
+def is_value(node: Node) -> bool:
+    # a value is written as one arg, and more args as child nodes (of which an empty dict has none)
+    return len(node.nodes) == 0 and len(node.args) > 0
+
+
+class ShapeCache:
+    """
+    The compiled functions for one command, by the keys that pick out a shape. `compile` is given the first args (or
+    nodes) it sees with a shape, and makes the function for it.
+    """
+
+    def __init__(self, compile: Callable[[Any], Callable]):
+        self.compile = compile
+        self.compiled: Dict[Hashable, Callable] = {}
+        self.seen: Dict[Hashable, int] = {}
+
+    def get(self, key: Hashable, sample: Any) -> Optional[Callable]:
+        try:
+            return self.compiled[key]
+        except KeyError:
+            pass
+        seen = self.seen.get(key, 0) + 1
+        if seen < COMPILE_AFTER or len(self.compiled) >= MAX_SHAPES:
+            self.seen[key] = seen
+            return None
+        del self.seen[key]
+        ret = self.compiled[key] = self.compile(sample)
+        return ret
+
+
+def compile_format(args: Dict[str, JsonSafe], format_list: Callable) -> Callable[[Dict[str, JsonSafe], Any],
+                                                                                   Optional[List[Node]]]:
+    """
+    The child nodes for args with the same keys as `args`, each holding the same kind of value. Lists get handed to
+    `format_list` whatever's in them. The keys of the outermost args are left to the caller to check.
+    """
+    namespace = {"Node": Node, "OrderedDict": OrderedDict, "list_props": list_props, "format_list": format_list}
+    lines = ["def format(args, names):"]
+    nodes = _format_dict(args, "args", lines, namespace)
+    lines.append("    return " + nodes)
+    exec(compile("\n".join(lines) + "\n", "<shape of plugin args>", "exec"), namespace)
+    return namespace["format"]
+
+
+def _format_dict(args: Dict[str, JsonSafe], local: str, lines: List[str], namespace: Dict[str, Any]) -> str:
+    # binds and checks every value first, so nothing gets built for args that turn out not to fit
+    nodes = []
+    for k, v in args.items():
+        value = "v" + str(len(lines))
+        lines.append("    " + value + " = " + local + "[" + repr(k) + "]")
+        if isinstance(v, dict):
+            keys = "_keys" + str(len(lines))
+            namespace[keys] = tuple(v)
+            lines.append("    if not isinstance(" + value + ", dict) or tuple(" + value + ") != " + keys + ":")
+            lines.append("        return None")
+            nodes.append("Node(" + repr(k) + ", None, [], OrderedDict(), " + _format_dict(v, value, lines, namespace)
+                         + ")")
+        elif isinstance(v, list):
+            lines.append("    if not isinstance(" + value + ", list):")
+            lines.append("        return None")
+            nodes.append("Node(" + repr(k) + ", None, [], list_props(), format_list(" + value + ", names))")
+        else:
+            lines.append("    if isinstance(" + value + ", (dict, list)):")
+            lines.append("        return None")
+            nodes.append("Node(" + repr(k) + ", None, [" + value + "], OrderedDict(), [])")
+    return "[" + ", ".join(nodes) + "]"
+
+
+def compile_parse(children: List[Node], parse_list: Callable) -> Callable[[List[Node], Any],
+                                                                         Optional[Dict[str, JsonSafe]]]:
+    """
+    The args for child nodes with the same names as `children`, each holding the same kind of value. Lists get handed
+    to `parse_list` whatever's in them. The names of the outermost nodes are left to the caller to check.
+    """
+    namespace = {"parse_list": parse_list}
+    lines = ["def parse(children, names):"]
+    args = _parse_nodes(children, "children", "c", lines)
+    lines.append("    return " + args)
+    exec(compile("\n".join(lines) + "\n", "<shape of plugin nodes>", "exec"), namespace)
+    return namespace["parse"]
+
+
+def _parse_nodes(children: List[Node], local: str, prefix: str, lines: List[str]) -> str:
+    if len(children) == 0:
+        return "{}"
+    nodes = [prefix + str(i) for i in range(len(children))]
+    # anything nested has been checked to be the right length by now, and the outermost ones are already known to be
+    lines.append("    " + "".join(i + ", " for i in nodes) + "= " + local)
+    entries = []
+    for node, child in zip(nodes, children):
+        if is_list(child):
+            lines.append('    if "__type" not in ' + node + '.props or ' + node + '.props["__type"] != "list":')
+            lines.append("        return None")
+            entries.append(repr(child.name) + ": parse_list(" + node + ".nodes, names)")
+            continue
+        # anything with props at all is left to the slow way, since that's the only way to be sure it isn't a list
+        if child.name in SKIPPED_NAMES:
+            lines.append("    if " + node + ".props:")
+        elif is_value(child):
+            lines.append("    if " + node + ".props or " + node + ".nodes or not " + node + ".args:")
+        else:
+            lines.append("    if " + node + ".props or (not " + node + ".nodes and " + node + ".args) or len(" + node
+                         + ".nodes) != " + str(len(child.nodes))
+                         + "".join(" or " + node + ".nodes[" + str(i) + "].name != " + repr(j.name)
+                                   for i, j in enumerate(child.nodes)) + ":")
+        lines.append("        return None")
+        if child.name in SKIPPED_NAMES:
+            continue
+        if is_value(child):
+            entries.append(repr(child.name) + ": " + node + ".args[0]")
+        else:
+            entries.append(repr(child.name) + ": " + _parse_nodes(child.nodes, node + ".nodes", node + "_", lines))
+    return "{" + ", ".join(entries) + "}"
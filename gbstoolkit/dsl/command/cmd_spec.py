@@ -0,0 +1,212 @@
+"""
+Declarative specs for commands whose KDL is just their arguments laid out as node args and props. A command with a
+`spec` gets its `format`, `parse`, `required_args` and `children_names` filled in when it registers, with `format` and
+`parse` generated as straight-line code for that one command instead of being written out by hand.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from ..datatypes import ActorID, UnionArgument
+from ..enums import Direction
+from ..marshalling import JsonSafe
+from ..palette import PaletteID
+from ..util import NameUtil, NodeData
+
+_MISSING = object()
+
+
+class Kind:
+    """
+    How one kind of argument gets written into KDL and read back, as Python expressions for the generated code, with
+    `{0}` standing in for the value and `names` for the NameUtil. `globals` has anything else those expressions use.
+    """
+    __slots__ = ("type", "format", "parse", "globals")
+
+    def __init__(self, type: Any, format: str = "{0}", parse: str = "{0}", globals: Optional[Dict[str, Any]] = None):
+        self.type = type
+        self.format = format
+        self.parse = parse
+        self.globals = globals if globals is not None else {}
+
+
+ACTOR = Kind(ActorID, "names.actor_for_id({0})", "names.id_for_actor({0})")
+SPRITE = Kind(UUID, "names.sprite_for_id({0})", "names.id_for_sprite({0})")
+SONG = Kind(UUID, "names.song_for_id({0})", "names.id_for_song({0})")
+SCENE = Kind(UUID, "names.scene_for_id({0})", "names.id_for_scene({0})")
+PALETTE = Kind(PaletteID, '(names.palette_for_id({0}) if {0} != "" else "")',
+               '(names.id_for_palette({0}) if {0} != "" else "")')
+VARIABLE = Kind(str, '"$" + {0} + "$"', "{0}[1:-1]")
+UNION_INT = Kind(UnionArgument[int], "UnionArgument.format({0}, names)", "UnionArgument.parse({0}, names)",
+                 {"UnionArgument": UnionArgument})
+UNION_DIRECTION = Kind(UnionArgument[Direction], "UnionArgument.format({0}, names)",
+                       'UnionArgument.parse({0}, names, ("direction", Direction))',
+                       {"UnionArgument": UnionArgument, "Direction": Direction})
+
+
+class Field:
+    """
+    One key of the command's args. Anything that isn't a Kind is taken as the type of a value that gets written as-is.
+    `default` is used in place of a missing value, on either side, or with `required` only when parsing, so format still
+    needs the value. `optional` ones are left out when they're missing.
+    """
+
+    def __init__(self, key: str, kind: Any = str, default: Any = _MISSING, optional: bool = False,
+                 required: bool = False):
+        self.key = key
+        self.kind = kind if isinstance(kind, Kind) else Kind(kind)
+        self.default = default
+        self.optional = optional
+        self.required = required
+        if required and default is _MISSING:
+            raise ValueError("Field " + key + " is only required for format if it has a default for parse")
+
+
+class Arg(Field):
+    """The next positional argument of the node."""
+
+
+class Rest(Field):
+    """All the positional arguments left over, as a list. Has to come after every Arg."""
+
+    def __init__(self, key: str, kind: Any = List[str]):
+        super().__init__(key, kind)
+
+
+class Prop(Field):
+    """
+    A property of the node, called `name` in the KDL if that's not the same as the key. With `omit_default`, it's only
+    written when it isn't the default.
+    """
+
+    def __init__(self, key: str, kind: Any = str, name: Optional[str] = None, default: Any = _MISSING,
+                 optional: bool = False, omit_default: bool = False, required: bool = False):
+        super().__init__(key, kind, default, optional, required)
+        if omit_default and default is _MISSING:
+            raise ValueError("Prop " + key + " can't leave out its default without having one")
+        self.name = name if name is not None else key
+        self.omit_default = omit_default
+
+
+# every if command passes these through as they are
+ELSE_PROPS = (Prop("__disableElse", bool, optional=True), Prop("__collapseElse", bool, optional=True))
+
+
+class CommandSpec:
+    """
+    Everything in a command's args, in the order they go in the JSON, and the names of its child scripts if it has any.
+    Props get written in the order they're listed, and any optional ones come last in the parsed args.
+    """
+
+    def __init__(self, *fields: Field, children: Optional[List[str]] = None):
+        self.fields = fields
+        self.children = children
+
+    def required_args(self) -> Optional[Dict[str, type]]:
+        ret = {i.key: i.kind.type for i in self.fields if not i.optional}
+        return ret if len(ret) > 0 else None
+
+    def children_names(self) -> Optional[List[str]]:
+        return list(self.children) if self.children is not None else None
+
+    def compile(self, name: str) -> Tuple[Callable[[Optional[Dict[str, JsonSafe]], NameUtil], NodeData],
+                                          Callable[[NodeData, NameUtil], Optional[Dict[str, JsonSafe]]]]:
+        """Generate the format and parse functions. `name` only shows up in tracebacks."""
+        namespace = {"OrderedDict": OrderedDict, "NodeData": NodeData}
+        for field in self.fields:
+            namespace.update(field.kind.globals)
+        source = "\n".join(self._format_source(namespace) + self._parse_source(namespace)) + "\n"
+        exec(compile(source, "<spec for " + name + ">", "exec"), namespace)
+        return namespace["format"], namespace["parse"]
+
+    def _format_source(self, namespace: Dict[str, Any]) -> List[str]:
+        lines = ["def format(args, names):"]
+        props = "OrderedDict()"
+        if any(type(i) == Prop for i in self.fields):
+            lines.append("    props = OrderedDict()")
+            props = "props"
+        node_args = []
+        rest = None
+        for index, field in enumerate(self.fields):
+            value = 'args["' + field.key + '"]'
+            if field.default is not _MISSING:
+                namespace["_default" + str(index)] = field.default
+                if not field.required:
+                    value = "(" + value + ' if "' + field.key + '" in args else _default' + str(index) + ")"
+            if type(field) == Rest:
+                rest = value
+            elif type(field) == Arg:
+                node_args.append(_apply(field.kind.format, value, "v" + str(index), lines, "    "))
+            else:
+                indent = "    "
+                if field.optional:
+                    lines.append('    if "' + field.key + '" in args:')
+                    indent = "        "
+                elif field.omit_default:
+                    lines.append("    v" + str(index) + " = " + value)
+                    lines.append("    if v" + str(index) + " != _default" + str(index) + ":")
+                    value = "v" + str(index)
+                    indent = "        "
+                lines.append(indent + 'props["' + field.name + '"] = '
+                             + _apply(field.kind.format, value, "v" + str(index), lines, indent))
+        if rest is None:
+            lines.append("    return NodeData(" + props + ", [" + ", ".join(node_args) + "])")
+        elif len(node_args) == 0:
+            lines.append("    return NodeData(" + props + ", " + rest + ")")
+        else:
+            lines.append("    return NodeData(" + props + ", [" + ", ".join(node_args) + "] + " + rest + ")")
+        return lines
+
+    def _parse_source(self, namespace: Dict[str, Any]) -> List[str]:
+        lines = ["def parse(data, names):"]
+        if len(self.fields) == 0:
+            return lines + ["    return None"]
+        # @args and @props get swapped for locals or for data.args and data.props once it's known which are used
+        entries = []
+        optional = []
+        position = 0
+        for index, field in enumerate(self.fields):
+            if type(field) == Rest:
+                entries.append('"' + field.key + '": ' + ("@args[" + str(position) + ":]" if position > 0 else "@args"))
+                continue
+            if type(field) == Arg:
+                value = "@args[" + str(position) + "]"
+                present = "len(@args) > " + str(position)
+                position += 1
+            else:
+                value = '@props["' + field.name + '"]'
+                present = '"' + field.name + '" in @props'
+                if field.optional:
+                    optional.append(field)
+                    continue
+            value = field.kind.parse.format(value)
+            if field.default is not _MISSING:
+                # a missing value gets the default as it is, it doesn't get read like it came from the KDL
+                value = "(" + value + " if " + present + " else _default" + str(index) + ")"
+            entries.append('"' + field.key + '": ' + value)
+        if len(optional) == 0:
+            body = "    return {" + ", ".join(entries) + "}\n"
+        else:
+            body = "    ret = {" + ", ".join(entries) + "}\n"
+            for field in optional:
+                value = field.kind.parse.format('@props["' + field.name + '"]')
+                body += '    if "' + field.name + '" in @props:\n'
+                body += '        ret["' + field.key + '"] = ' + value + "\n"
+            body += "    return ret\n"
+        for name in ["args", "props"]:
+            # only worth a local if it gets looked up more than once
+            if body.count("@" + name) > 1:
+                lines.append("    " + name + " = data." + name)
+                body = body.replace("@" + name, name)
+            else:
+                body = body.replace("@" + name, "data." + name)
+        return lines + body.splitlines()
+
+
+def _apply(template: str, value: str, local: str, lines: List[str], indent: str) -> str:
+    # a template that uses the value more than once gets it put in a local first, so it's only looked up once
+    if template.count("{0}") > 1 and not value.isidentifier():
+        lines.append(indent + local + " = " + value)
+        value = local
+    return template.format(value)
@@ -5,6 +5,7 @@ from uuid import UUID
 from kdl import Node
 
 from .cmd_base import Command
+from .cmd_spec import Arg, CommandSpec, Prop, VARIABLE
 from ..marshalling import JsonSafe, serialize
 from ..util import NameUtil, NodeData, format_dialogue, parse_dialogue
 
@@ -37,10 +38,10 @@ class MenuCommand(Command):
     @staticmethod
     def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
         ret = {"variable": data.args[0][1:-1], "items": len(data.children)}
-        for node in data.children:
-            ret["option"+str(data.children.index(node)+1)] = node.arguments[0]
+        for index, node in enumerate(data.children):
+            ret["option"+str(index+1)] = node.args[0]
         ret.update(
-            cancelOnLastOption=data.props["cancelOLastOption"],
+            cancelOnLastOption=data.props["cancelOnLastOption"],
             cancelOnB=data.props["cancelOnB"],
             layout=data.props["layout"]
         )
@@ -48,6 +49,8 @@ class MenuCommand(Command):
 
     
 class TextChoiceCommand(Command):
+    spec = CommandSpec(Arg("variable", VARIABLE), Arg("trueText"), Arg("falseText"))
+
     @staticmethod
     def name() -> str:
         return "EVENT_CHOICE"
@@ -56,18 +59,6 @@ class TextChoiceCommand(Command):
     def keyword() -> str:
         return "choice"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"variable": str, "trueText": str, "falseText": str}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), ["$" + args["variable"] + "$", args["trueText"], args["falseText"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"variable": data.args[0][1:-1], "trueText": data.args[1], "falseText": data.args[2]}
-
 
 class TextDialogueCommand(Command):
     @staticmethod
@@ -109,6 +100,13 @@ class TextDialogueCommand(Command):
 
 
 class TextSetSpeedCommand(Command):
+    spec = CommandSpec(
+        Prop("speedIn", int, name="boxIn"),
+        Prop("speedOut", int, name="boxOut"),
+        Arg("speed", int),
+        Prop("allowFastForward", bool, name="fastForward")
+    )
+
     @staticmethod
     def name() -> str:
         return "EVENT_TEXT_SET_ANIMATION_SPEED"
@@ -116,27 +114,3 @@ class TextSetSpeedCommand(Command):
     @staticmethod
     def keyword() -> str:
         return "setTextSpeed"
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"speedIn": int, "speedOut": int, "speed": int, "allowFastForward": bool}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(
-            OrderedDict({
-                "boxIn": args["speedIn"],
-                "boxOut": args["speedOut"],
-                "fastForward": args["allowFastForward"]
-            }),
-            [args["speed"]]
-        )
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {
-            "speedIn": data.props["boxIn"],
-            "speedOut": data.props["boxOut"],
-            "speed": data.args[0],
-            "allowFastForward": data.props["allowFastForward"]
-        }
\ No newline at end of file
@@ -2,11 +2,14 @@ from collections import OrderedDict
 from typing import Dict, Optional, List
 
 from .cmd_base import Command
+from .cmd_spec import Arg, CommandSpec
 from ..marshalling import JsonSafe
 from ..util import NameUtil, NodeData
 
 
 class TimerDisableCommand(Command):
+    spec = CommandSpec()
+
     @staticmethod
     def name() -> str:
         return "EVENT_TIMER_DISABLE"
@@ -15,20 +18,10 @@ class TimerDisableCommand(Command):
     def keyword() -> str:
         return "disableTimer"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return None
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return None
-
 
 class TimerRestartCommand(Command):
+    spec = CommandSpec()
+
     @staticmethod
     def name() -> str:
         return "EVENT_TIMER_RESTART"
@@ -37,18 +30,6 @@ class TimerRestartCommand(Command):
     def keyword() -> str:
         return "restartTimer"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return None
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return None
-
 
 class TimerSetScriptCommand(Command):
     @staticmethod
@@ -77,6 +58,8 @@ class TimerSetScriptCommand(Command):
 
 
 class WaitCommand(Command):
+    spec = CommandSpec(Arg("time", float))
+
     @staticmethod
     def name() -> str:
         return "EVENT_WAIT"
@@ -84,15 +67,3 @@ class WaitCommand(Command):
     @staticmethod
     def keyword() -> str:
         return "wait"
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"time": float}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [args["time"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"time": data.args[0]}
\ No newline at end of file
@@ -2,7 +2,7 @@ from collections import OrderedDict
 from typing import Dict, Optional
 
 from .cmd_base import Command
-from ..datatypes import UnionArgument
+from .cmd_spec import Arg, CommandSpec, UNION_INT, VARIABLE
 from ..marshalling import JsonSafe
 from ..util import NameUtil, NodeData
 
@@ -80,6 +80,8 @@ class VariableClearFlagsCommand(Command):
 
 
 class VariableDecCommand(Command):
+    spec = CommandSpec(Arg("variable", VARIABLE))
+
     @staticmethod
     def name() -> str:
         return "EVENT_DEC_VALUE"
@@ -88,20 +90,10 @@ class VariableDecCommand(Command):
     def keyword() -> str:
         return "decrement"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"variable": str}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [args["variable"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"variable": data.args[0][1:-1]}
-
 
 class VariableIncCommand(Command):
+    spec = CommandSpec(Arg("variable", VARIABLE))
+
     @staticmethod
     def name() -> str:
         return "EVENT_INC_VALUE"
@@ -110,18 +102,6 @@ class VariableIncCommand(Command):
     def keyword() -> str:
         return "increment"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"variable": str}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [args["variable"]])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"variable": data.args[0][1:-1]}
-
 
 class VariableMathCommand(Command):  # This one's a fun one!
     key_to_symbol = {"set": "=", "add": "+", "sub": "-", "mul": "*", "div": "/", "mod": "%"}
@@ -168,9 +148,9 @@ class VariableMathCommand(Command):  # This one's a fun one!
             ret["other"] = "true"
         elif other is False:
             ret["other"] = "false"
-        elif type(other) == int:  # TODO: hopefully this will be an int? figure this out soon!
+        elif type(other) == int or type(other) == float:  # kdl-py hands numbers back as floats
             ret["other"] = "val"
-            ret["value"] = other
+            ret["value"] = int(other)
         elif type(other) == str:
             if other[0] == "$" and other[-1] == "$":
                 ret["other"] = "var"
@@ -190,6 +170,8 @@ class VariableMathCommand(Command):  # This one's a fun one!
 
 
 class VariableSetFlagsCommand(Command):
+    spec = CommandSpec(Arg("variable", VARIABLE), *[Arg("flag" + str(i + 1), bool) for i in range(8)])
+
     @staticmethod
     def name() -> str:
         return "EVENT_SET_FLAGS"
@@ -198,34 +180,10 @@ class VariableSetFlagsCommand(Command):
     def keyword() -> str:
         return "setFlags"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {
-            "variable": str,
-            "flag1": bool,
-            "flag2": bool,
-            "flag3": bool,
-            "flag4": bool,
-            "flag5": bool,
-            "flag6": bool,
-            "flag7": bool,
-            "flag8": bool
-        }
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        nargs = ["$" + args["variable"] + "$"]
-        nargs.extend([args["flag" + str(i+1)] for i in range(8)])
-        return NodeData(OrderedDict(), nargs)
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        ret = {"variable": data.args[0][1:-1]}
-        ret.update({"flag" + str(i+1): data.args[i+1] for i in range(8)})
-        return ret
-
 
 class VariableSetFalseCommand(Command):
+    spec = CommandSpec(Arg("variable", VARIABLE))
+
     @staticmethod
     def name() -> str:
         return "EVENT_SET_FALSE"
@@ -234,20 +192,10 @@ class VariableSetFalseCommand(Command):
     def keyword() -> str:
         return "setFalse"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"variable": str}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), ["$" + args["variable"] + "$"])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"variable": data.args[0][1:-1]}
-
 
 class VariableSetTrueCommand(Command):
+    spec = CommandSpec(Arg("variable", VARIABLE))
+
     @staticmethod
     def name() -> str:
         return "EVENT_SET_TRUE"
@@ -256,20 +204,10 @@ class VariableSetTrueCommand(Command):
     def keyword() -> str:
         return "setTrue"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"variable": str}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), ["$" + args["variable"] + "$"])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"variable": data.args[0][1:-1]}
-
 
 class VariableSetValueCommand(Command):
+    spec = CommandSpec(Arg("variable", VARIABLE), Arg("value", UNION_INT))
+
     @staticmethod
     def name() -> str:
         return "EVENT_SET_VALUE"
@@ -278,21 +216,10 @@ class VariableSetValueCommand(Command):
     def keyword() -> str:
         return "setValue"
 
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return {"variable": str, "value": UnionArgument[int]}
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), ["$" + args["variable"] + "$", UnionArgument.format(args["value"], names)])
-
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return {"variable": data.args[0][1:-1], "value": UnionArgument.parse(data.args[1], names)}
-
 
 class VariablesResetCommand(Command):
+    spec = CommandSpec()
+
     @staticmethod
     def name() -> str:
         return "EVENT_RESET_VARIABLES"
@@ -300,15 +227,3 @@ class VariablesResetCommand(Command):
     @staticmethod
     def keyword() -> str:
         return "resetVariables"
-
-    @staticmethod
-    def required_args() -> Optional[Dict[str, type]]:
-        return None
-
-    @staticmethod
-    def format(args: Optional[Dict[str, JsonSafe]], names: NameUtil) -> NodeData:
-        return NodeData(OrderedDict(), [])
-
-    @staticmethod
-    def parse(data: NodeData, names: NameUtil) -> Optional[Dict[str, JsonSafe]]:
-        return None
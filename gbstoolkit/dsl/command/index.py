@@ -0,0 +1,205 @@
+# Generated by `python -m gbstoolkit.dsl.command`, don't edit by hand!
+# Says what module every command is in, by name and by keyword, so the registries in cmd_base.py
+# can import them only once they're used.
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Never runs. Freezing tools like PyInstaller only find imports they can see, and import_module() isn't
+    # one, so this is what gets every command module bundled. Not `if False`, which gets compiled away.
+    from . import (  # noqa: F401
+        cmd_actor,
+        cmd_base,
+        cmd_camera,
+        cmd_engine,
+        cmd_flowcontrol,
+        cmd_misc,
+        cmd_scene,
+        cmd_text,
+        cmd_timing,
+        cmd_variable,
+    )
+
+COMMAND_MODULES = {
+    "": "cmd_base",
+    "EVENT_ACTOR_COLLISIONS_DISABLE": "cmd_actor",
+    "EVENT_ACTOR_COLLISIONS_ENABLE": "cmd_actor",
+    "EVENT_ACTOR_EMOTE": "cmd_actor",
+    "EVENT_ACTOR_GET_DIRECTION": "cmd_actor",
+    "EVENT_ACTOR_GET_POSITION": "cmd_actor",
+    "EVENT_ACTOR_HIDE": "cmd_actor",
+    "EVENT_ACTOR_INVOKE": "cmd_actor",
+    "EVENT_ACTOR_MOVE_RELATIVE": "cmd_actor",
+    "EVENT_ACTOR_MOVE_TO": "cmd_actor",
+    "EVENT_ACTOR_PUSH": "cmd_actor",
+    "EVENT_ACTOR_SET_ANIMATE": "cmd_actor",
+    "EVENT_ACTOR_SET_ANIMATION_SPEED": "cmd_actor",
+    "EVENT_ACTOR_SET_DIRECTION": "cmd_actor",
+    "EVENT_ACTOR_SET_FRAME": "cmd_actor",
+    "EVENT_ACTOR_SET_MOVEMENT_SPEED": "cmd_actor",
+    "EVENT_ACTOR_SET_POSITION": "cmd_actor",
+    "EVENT_ACTOR_SET_POSITION_RELATIVE": "cmd_actor",
+    "EVENT_ACTOR_SET_SPRITE": "cmd_actor",
+    "EVENT_ACTOR_SHOW": "cmd_actor",
+    "EVENT_ACTOR_STOP_UPDATE": "cmd_actor",
+    "EVENT_ADD_FLAGS": "cmd_variable",
+    "EVENT_AWAIT_INPUT": "cmd_flowcontrol",
+    "EVENT_CALL_CUSTOM_EVENT": "cmd_misc",
+    "EVENT_CAMERA_LOCK": "cmd_camera",
+    "EVENT_CAMERA_MOVE_TO": "cmd_camera",
+    "EVENT_CAMERA_SHAKE": "cmd_camera",
+    "EVENT_CHOICE": "cmd_text",
+    "EVENT_CLEAR_FLAGS": "cmd_variable",
+    "EVENT_COMMENT": "cmd_misc",
+    "EVENT_DATA_CLEAR": "cmd_misc",
+    "EVENT_DEC_VALUE": "cmd_variable",
+    "EVENT_DEFINE_LABEL": "cmd_flowcontrol",
+    "EVENT_END": "cmd_base",
+    "EVENT_ENGINE_FIELD_SET": "cmd_engine",
+    "EVENT_ENGINE_FIELD_STORE": "cmd_engine",
+    "EVENT_GOTO_LABEL": "cmd_flowcontrol",
+    "EVENT_GROUP": "cmd_flowcontrol",
+    "EVENT_IF_ACTOR_AT_POSITION": "cmd_flowcontrol",
+    "EVENT_IF_ACTOR_DIRECTION": "cmd_flowcontrol",
+    "EVENT_IF_ACTOR_RELATIVE_TO_ACTOR": "cmd_flowcontrol",
+    "EVENT_IF_COLOR_SUPPORTED": "cmd_flowcontrol",
+    "EVENT_IF_FALSE": "cmd_flowcontrol",
+    "EVENT_IF_FLAGS_COMPARE": "cmd_flowcontrol",
+    "EVENT_IF_INPUT": "cmd_flowcontrol",
+    "EVENT_IF_SAVED_DATA": "cmd_flowcontrol",
+    "EVENT_IF_TRUE": "cmd_flowcontrol",
+    "EVENT_IF_VALUE": "cmd_flowcontrol",
+    "EVENT_IF_VALUE_COMPARE": "cmd_flowcontrol",
+    "EVENT_INC_VALUE": "cmd_variable",
+    "EVENT_LAUNCH_PROJECTILE": "cmd_misc",
+    "EVENT_LOAD_DATA": "cmd_misc",
+    "EVENT_LOOP": "cmd_flowcontrol",
+    "EVENT_MENU": "cmd_text",
+    "EVENT_MUSIC_PLAY": "cmd_misc",
+    "EVENT_MUSIC_STOP": "cmd_misc",
+    "EVENT_OVERLAY_HIDE": "cmd_misc",
+    "EVENT_OVERLAY_MOVE_TO": "cmd_misc",
+    "EVENT_OVERLAY_SHOW": "cmd_misc",
+    "EVENT_PALETTE_SET_BACKGROUND": "cmd_misc",
+    "EVENT_PALETTE_SET_UI": "cmd_misc",
+    "EVENT_PLAYER_BOUNCE": "cmd_actor",
+    "EVENT_PLAYER_SET_SPRITE": "cmd_actor",
+    "EVENT_REMOVE_INPUT_SCRIPT": "cmd_flowcontrol",
+    "EVENT_RESET_VARIABLES": "cmd_variable",
+    "EVENT_SAVE_DATA": "cmd_misc",
+    "EVENT_SCENE_POP_ALL_STATE": "cmd_scene",
+    "EVENT_SCENE_POP_STATE": "cmd_scene",
+    "EVENT_SCENE_PUSH_STATE": "cmd_scene",
+    "EVENT_SCENE_RESET_STATE": "cmd_scene",
+    "EVENT_SET_FALSE": "cmd_variable",
+    "EVENT_SET_FLAGS": "cmd_variable",
+    "EVENT_SET_INPUT_SCRIPT": "cmd_flowcontrol",
+    "EVENT_SET_TIMER_SCRIPT": "cmd_timing",
+    "EVENT_SET_TRUE": "cmd_variable",
+    "EVENT_SET_VALUE": "cmd_variable",
+    "EVENT_SOUND_PLAY_EFFECT": "cmd_misc",
+    "EVENT_SPRITES_HIDE": "cmd_actor",
+    "EVENT_SPRITES_SHOW": "cmd_actor",
+    "EVENT_STOP": "cmd_misc",
+    "EVENT_SWITCH": "cmd_flowcontrol",
+    "EVENT_SWITCH_SCENE": "cmd_scene",
+    "EVENT_TEXT": "cmd_text",
+    "EVENT_TEXT_SET_ANIMATION_SPEED": "cmd_text",
+    "EVENT_TIMER_DISABLE": "cmd_timing",
+    "EVENT_TIMER_RESTART": "cmd_timing",
+    "EVENT_VARIABLE_MATH": "cmd_variable",
+    "EVENT_WAIT": "cmd_timing",
+    "EVENT_WEAPON_ATTACK": "cmd_misc"
+}
+
+KEYWORD_MODULES = {
+    "": "cmd_base",
+    "addFlags": "cmd_variable",
+    "awaitInput": "cmd_flowcontrol",
+    "bounce": "cmd_actor",
+    "calculate": "cmd_variable",
+    "call": "cmd_misc",
+    "changePosition": "cmd_actor",
+    "changeScene": "cmd_scene",
+    "choice": "cmd_text",
+    "clearFlags": "cmd_variable",
+    "clearSave": "cmd_misc",
+    "clearSceneStack": "cmd_scene",
+    "createSave": "cmd_misc",
+    "decrement": "cmd_variable",
+    "dialogue": "cmd_text",
+    "disableCollision": "cmd_actor",
+    "disableTimer": "cmd_timing",
+    "emote": "cmd_actor",
+    "enableCollision": "cmd_actor",
+    "end": "cmd_base",
+    "goto": "cmd_flowcontrol",
+    "group": "cmd_flowcontrol",
+    "hide": "cmd_actor",
+    "hideAll": "cmd_actor",
+    "hideOverlay": "cmd_misc",
+    "ifActorAtPosition": "cmd_flowcontrol",
+    "ifActorFacing": "cmd_flowcontrol",
+    "ifActorRelativeTo": "cmd_flowcontrol",
+    "ifAnyPressed": "cmd_flowcontrol",
+    "ifColorSupported": "cmd_flowcontrol",
+    "ifCompareVars": "cmd_flowcontrol",
+    "ifFalse": "cmd_flowcontrol",
+    "ifFlag": "cmd_flowcontrol",
+    "ifSaveExists": "cmd_flowcontrol",
+    "ifTrue": "cmd_flowcontrol",
+    "ifValue": "cmd_flowcontrol",
+    "increment": "cmd_variable",
+    "interactWith": "cmd_actor",
+    "label": "cmd_flowcontrol",
+    "launchProjectile": "cmd_misc",
+    "loadSave": "cmd_misc",
+    "lockCamera": "cmd_camera",
+    "loop": "cmd_flowcontrol",
+    "menu": "cmd_text",
+    "moveBy": "cmd_actor",
+    "moveCameraTo": "cmd_camera",
+    "moveOverlay": "cmd_misc",
+    "moveTo": "cmd_actor",
+    "note": "cmd_misc",
+    "playMusic": "cmd_misc",
+    "playSound": "cmd_misc",
+    "popAllScenes": "cmd_scene",
+    "popScene": "cmd_scene",
+    "pushAway": "cmd_actor",
+    "pushScene": "cmd_scene",
+    "removeInputScript": "cmd_flowcontrol",
+    "resetVariables": "cmd_variable",
+    "restartTimer": "cmd_timing",
+    "setAnimSpeed": "cmd_actor",
+    "setAnimate": "cmd_actor",
+    "setBackgroundPalette": "cmd_misc",
+    "setDirection": "cmd_actor",
+    "setEngineField": "cmd_engine",
+    "setFalse": "cmd_variable",
+    "setFlags": "cmd_variable",
+    "setFrame": "cmd_actor",
+    "setInputScript": "cmd_flowcontrol",
+    "setMoveSpeed": "cmd_actor",
+    "setPlayerSprite": "cmd_actor",
+    "setPosition": "cmd_actor",
+    "setSprite": "cmd_actor",
+    "setTextSpeed": "cmd_text",
+    "setTimerScript": "cmd_timing",
+    "setTrue": "cmd_variable",
+    "setUIPalette": "cmd_misc",
+    "setValue": "cmd_variable",
+    "shakeCamera": "cmd_camera",
+    "show": "cmd_actor",
+    "showAll": "cmd_actor",
+    "showOverlay": "cmd_misc",
+    "stop": "cmd_misc",
+    "stopMusic": "cmd_misc",
+    "stopUpdate": "cmd_actor",
+    "storeDirection": "cmd_actor",
+    "storeEngineField": "cmd_engine",
+    "storePosition": "cmd_actor",
+    "switch": "cmd_flowcontrol",
+    "useWeapon": "cmd_misc",
+    "wait": "cmd_timing"
+}
@@ -3,7 +3,7 @@ from typing import Dict, Generic, Tuple, Type, TypeVar, Union
 from uuid import UUID
 
 from .enums import ActorProperty, Direction, SerializableEnum
-from .marshalling import JsonSafe, serialize, Serializable
+from .marshalling import ID_TABLE, JsonSafe, serialize, Serializable
 from .util import NameUtil
 
 
@@ -18,16 +18,14 @@ class ActorID(Serializable):
         return self.id == "$self$"
 
     def serialize(self) -> JsonSafe:
-        return str(self.id)
+        return ID_TABLE.to_str(self.id) if type(self.id) == UUID else str(self.id)
 
     @staticmethod
     def deserialize(actorid: str) -> "ActorID":
-        # trying Python's UUID value testing to check if it's a UUID
-        uuidtest = actorid.strip('{}').replace('-', '')
         if actorid.isnumeric():
             return ActorID(int(actorid))
-        elif len(uuidtest) == 32:
-            return ActorID(UUID(actorid))
+        elif ID_TABLE.is_uuid(actorid):
+            return ActorID(ID_TABLE.to_uuid(actorid))
         elif actorid == "player" or actorid == "$self$":
             return ActorID(actorid)
         else:
@@ -1,132 +1,276 @@
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from uuid import UUID
 import uuid
 
 from kdl import Node, Document
 
-from .command import Command, Fallback, SwitchCommand, COMMANDS, KEYWORDS
-from .marshalling import JsonSafe, serialize, Serializable
-from .util import NameUtil, NodeData, ProtoEvent, ProgressTracker, FormatError, map_nodes, prop_node, keyword_to_command
+from .command import Command, command_for_keyword, command_for_name
+from .marshalling import ID_TABLE, JsonSafe, int_to_uuid_str, intern_keys, serialize, Serializable, uuid_to_int
+from .util import (ChildGroups, NameUtil, NodeData, ProtoEvent, ProgressTracker, FormatError, map_event_tree, map_nodes,
+                   prop_node)
 
 
-@dataclass
 class Event(Serializable):
-    id: UUID
-    command: Command
-    args: Optional[Dict[str, JsonSafe]]
-    children: Optional[Dict[str, List["Event"]]]
+    """
+    One event in a script. Projects hold hundreds of thousands of these, so it's slotted instead of a dataclass and
+    keeps its ID as a plain 128-bit int, only turning it into a UUID when something asks for `id`.
+    """
+    __slots__ = ("id_int", "command", "args", "children")
+
+    def __init__(self, id: Union[UUID, int], command: Command, args: Optional[Dict[str, JsonSafe]],
+                 children: Optional[Dict[str, List["Event"]]]):
+        self.id_int = id if type(id) == int else id.int
+        self.command = command
+        self.args = args
+        self.children = children
+
+    @property
+    def id(self) -> UUID:
+        return UUID(int=self.id_int)
+
+    @id.setter
+    def id(self, value: UUID):
+        self.id_int = value.int
+
+    def id_str(self) -> str:
+        """The same as str(self.id), without building the UUID on the way."""
+        return int_to_uuid_str(self.id_int)
+
+    def __eq__(self, other):
+        if type(other) != Event:
+            return NotImplemented
+        return (self.id_int == other.id_int and self.command == other.command and self.args == other.args
+                and self.children == other.children)
+
+    def __repr__(self):
+        return ("Event(id=" + repr(self.id) + ", command=" + repr(self.command) + ", args=" + repr(self.args)
+                + ", children=" + repr(self.children) + ")")
+
+    # All of these walk the tree with map_event_tree instead of recursing, so the Event layer never hits the recursion
+    # limit itself, though kdl-py and json still can on very deep scripts
 
     def serialize(self) -> Dict[str, JsonSafe]:
-        if isinstance(self.command, Fallback):
-            name = self.command.fallback_name
-        else:
-            name = self.command.name()
-        ret = {"id": serialize(self.id), "command": name}
-        if self.args is not None and len(self.args) > 0:
-            ret["args"] = serialize(self.args)
-        if self.children is not None:
-            ret["children"] = serialize(self.children)
-        return ret
+        return map_event_tree([self], _expand_serialize, _serialize_event)[0]
 
     @staticmethod
     def deserialize(evt: Dict[str, JsonSafe]) -> "Event":
-        return Event(
-            id=UUID(evt["id"]),
-            command=COMMANDS[evt["command"]] if evt["command"] in COMMANDS else Fallback(evt["command"]),
-            args=evt["args"] if "args" in evt else None,
-            children={k: [Event.deserialize(i) for i in v] for k, v in evt["children"].items()} if "children" in evt
-            else None
-        )
+        return map_event_tree([evt], _expand_json, _deserialize_event)[0]
 
     def format(self, names: NameUtil) -> Node:
-        data = self.command.format(self.args, names)
-        node_children = data.children if data.children is not None else []
-        if self.children is not None and self.command.name() != "EVENT_CALL_CUSTOM_EVENT":
-            if self.command is SwitchCommand:
-                children_data = SwitchCommand.format_children_names(self.args)
-                for k, v in children_data.items():
-                    children_list = [i.format(names) for i in self.children[k]]
-                    node = Node(name=v[0], props=v[1].props, args=v[1].args, nodes=children_list)
-                    node_children.append(node)
-            elif data.children is not None and len(data.children) > 0:
-                if isinstance(self.command, Fallback):
-                    fallback_children = []
-                    for k, v in self.children.items():
-                        children_list = [i.format(names) for i in v]
-                        fallback_children.append(Node(name=k, nodes=children_list))
-                    node_children.append(Node("__children", nodes=fallback_children))
-                else:
-                    raise FormatError("event", self, "")
-            else:
-                # TODO: special-case for Group, Loop, and setTimerScript (only one child, ever)
-                for k, v in self.children.items():
-                    children_list = [i.format(names) for i in v]
-                    node_children.append(Node(name=k, nodes=children_list))
-        props = data.props
-        if props is None:
-            print("Command " + self.command.name() + " is returning None props! This is ILLEGAL!")
-        if self.args is not None:
-            if "__collapse" in self.args:
-                props["__collapse"] = self.args["__collapse"]
-            if "__comment" in self.args:
-                props["__comment"] = self.args["__comment"]
-            if "__label" in self.args:
-                props["__label"] = self.args["__label"]
-        props["__eventid"] = str(self.id)
-        if isinstance(self.command, Fallback):
-            keyword = self.command.fallback_keyword
-        else:
-            keyword = self.command.keyword()
-        return Node(name=keyword, props=props, args=data.args, nodes=node_children)
+        return map_event_tree([self], lambda event: _expand_format(event, names), _format_event)[0]
 
     @staticmethod
-    def parse(node: Node, names: NameUtil, progress: ProgressTracker) -> "Event":
-        command = KEYWORDS[node.name] if node.name in KEYWORDS else Fallback(keyword_to_command(node.name))
-        children = None
-        if command is SwitchCommand:
-            child_nodes = SwitchCommand.parse_children_names(NodeData(node.props, node.args, node.nodes))
-            children = {k: [Event.parse(i, names, progress) for i in v] for k, v in child_nodes}
-        elif len(node.nodes) > 0 and command.children_names() is not None:
-            # TODO: special-case for Group, Loop, and setTimerScript (only one child, ever)
-            children = {}
-            for child in node.nodes:
-                children[child.name] = [Event.parse(i, names, progress) for i in child.nodes]
-        elif isinstance(command, Fallback):
-            children_nodes = [i for i in node.nodes if i.name == "__children"]
-            if len(children_nodes) > 0:
-                children = {}
-                children_node = children_nodes[-1]
-                for child in children_node.nodes:
-                    children[child.name] = [Event.parse(i, names, progress) for i in child.nodes]
-                node.nodes.remove(children_node)
-        id = UUID(node.props["__eventid"]) if "__eventid" in node.props else uuid.uuid4()
-        if isinstance(command, Fallback):
-            progress.flag_missing_command(command.fallback_keyword)
-        args = command.parse(NodeData(node.props, node.args, node.nodes), names)
-        if args is None:
-            args = {}
-        if "__collapse" in node.props:
-            args["__collapse"] = node.props["__collapse"]
-        if "__comment" in node.props:
-            args["__comment"] = node.props["__comment"]
-        if "__label" in node.props:
-            args["__label"] = node.props["__label"]
-        if command.name() == "EVENT_CALL_CUSTOM_EVENT":
-            children = {"script": [Event.deprotofy(i)
-                                   for i in names.script_for_custom_event(args["customEventId"])]}
-        return Event(id=id, command=command, args=args, children=children)
+    def parse(node: Node, names: NameUtil, progress: ProgressTracker, path: str = "") -> "Event":
+        return map_event_tree([(node, path)], _expand_node,
+                              lambda state, children: _parse_event(state, children, names, progress))[0]
+
+    @staticmethod
+    def parse_script(nodes: List[Node], names: NameUtil, progress: ProgressTracker, path: str = "") -> List["Event"]:
+        """Parse a whole script. `path` is where it is in the tree, for `names.new_id` to work out any missing IDs."""
+        return map_event_tree(_at_paths(nodes, path), _expand_node,
+                              lambda state, children: _parse_event(state, children, names, progress))
 
     def protofy(self) -> ProtoEvent:
-        children = {k: [i.protofy() for i in v]
-                    for k, v in self.children.items()} if self.children is not None else None
-        return ProtoEvent(command=self.command.name(), args=self.args, children=children)
+        return map_event_tree([self], _expand_event, _protofy_event)[0]
 
     @staticmethod
     def deprotofy(proto: ProtoEvent) -> "Event":
-        children = {k: [Event.deprotofy(i) for i in v]
-                    for k, v in proto.children.items()} if proto.children is not None else None
-        return Event(id=uuid.uuid4(), command=COMMANDS[proto.command], args=proto.args, children=children)
+        return map_event_tree([(proto, "")], _expand_proto,
+                              lambda state, children: _deprotofy_event(state, children, _random_id))[0]
+
+
+def _random_id(path: str) -> UUID:
+    return uuid.uuid4()
+
+
+def _at_paths(items: List[Any], path: str) -> List[Tuple[Any, str]]:
+    return [(item, path + "/" + str(index)) for index, item in enumerate(items)]
+
+
+def _expand_event(event: Event) -> Tuple[Event, ChildGroups]:
+    return event, list(event.children.items()) if event.children is not None else None
+
+
+def _is_shared_call(event: Event) -> bool:
+    return (event.command.info.is_custom_event_call and len(event.children) == 1 and "script" in event.children
+            and type(event.children["script"]) == SharedScript)
+
+
+def _expand_serialize(event: Event) -> Tuple[Event, ChildGroups]:
+    if event.children is None or _is_shared_call(event):
+        return event, None
+    return event, list(event.children.items())
+
+
+def _serialize_event(event: Event, children: ChildGroups) -> Dict[str, JsonSafe]:
+    ret = {"id": event.id_str(), "command": event.command.info.name}
+    if event.args is not None and len(event.args) > 0:
+        ret["args"] = serialize(event.args)
+    if children is not None:
+        ret["children"] = dict(children)
+    elif event.children is not None:
+        ret["children"] = {"script": event.children["script"].serialized()}
+    return ret
+
+
+def _expand_json(evt: Dict[str, JsonSafe]) -> Tuple[Dict[str, JsonSafe], ChildGroups]:
+    return evt, list(evt["children"].items()) if "children" in evt else None
+
+
+def _deserialize_event(evt: Dict[str, JsonSafe], children: ChildGroups) -> Event:
+    return Event(
+        id=uuid_to_int(evt["id"]),
+        command=command_for_name(evt["command"]),
+        # every scene gets decoded on its own, so without this each one would have its own copy of every key
+        args=intern_keys(evt["args"]) if "args" in evt else None,
+        children=dict(children) if children is not None else None
+    )
+
+
+def _expand_format(event: Event, names: NameUtil) -> Tuple[Tuple[Event, NodeData], ChildGroups]:
+    # the command gets formatted on the way down, before its children, the same as a recursive walk would
+    info = event.command.info
+    data = event.command.format(event.args, names)
+    if event.children is None or info.is_custom_event_call:
+        return (event, data), None
+    if info.is_switch:
+        # keyed by the node name and data of each case, so _format_event doesn't have to work them out again
+        children_data = event.command.format_children_names(event.args)
+        return (event, data), [(v, event.children[k]) for k, v in children_data.items()]
+    return (event, data), list(event.children.items())
+
+
+def _format_event(state: Tuple[Event, NodeData], children: ChildGroups) -> Node:
+    event, data = state
+    info = event.command.info
+    node_children = data.children if data.children is not None else []
+    if children is not None:
+        if info.is_switch:
+            for (name, case_data), children_list in children:
+                node_children.append(Node(name=name, props=case_data.props, args=case_data.args,
+                                          nodes=children_list))
+        elif data.children is not None and len(data.children) > 0:
+            if info.is_fallback:
+                fallback_children = [Node(name=k, nodes=v) for k, v in children]
+                node_children.append(Node("__children", nodes=fallback_children))
+            else:
+                raise FormatError("event", event, "")
+        else:
+            # TODO: special-case for Group, Loop, and setTimerScript (only one child, ever)
+            for k, v in children:
+                node_children.append(Node(name=k, nodes=v))
+    props = data.props
+    if props is None:
+        print("Command " + info.name + " is returning None props! This is ILLEGAL!")
+    if event.args is not None:
+        if "__collapse" in event.args:
+            props["__collapse"] = event.args["__collapse"]
+        if "__comment" in event.args:
+            props["__comment"] = event.args["__comment"]
+        if "__label" in event.args:
+            props["__label"] = event.args["__label"]
+    props["__eventid"] = event.id_str()
+    return Node(name=info.keyword, props=props, args=data.args, nodes=node_children)
+
+
+def _expand_node(item: Tuple[Node, str]) -> Tuple[Tuple[Node, Command, str], ChildGroups]:
+    node, path = item
+    command = command_for_keyword(node.name)
+    info = command.info
+    children = None
+    if info.is_switch:
+        child_nodes = command.parse_children_names(NodeData(node.props, node.args, node.nodes))
+        children = [(k, _at_paths(v, path + "/" + k)) for k, v in child_nodes.items()]
+    elif len(node.nodes) > 0 and info.has_children:
+        # TODO: special-case for Group, Loop, and setTimerScript (only one child, ever)
+        children = [(child.name, _at_paths(child.nodes, path + "/" + child.name)) for child in node.nodes]
+    elif info.is_fallback:
+        children_nodes = [i for i in node.nodes if i.name == "__children"]
+        if len(children_nodes) > 0:
+            children_node = children_nodes[-1]
+            children = [(child.name, _at_paths(child.nodes, path + "/" + child.name))
+                        for child in children_node.nodes]
+            node.nodes.remove(children_node)
+    return (node, command, path), children
+
+
+def _parse_event(state: Tuple[Node, Command, str], children: ChildGroups, names: NameUtil,
+                 progress: ProgressTracker) -> Event:
+    node, command, path = state
+    info = command.info
+    id = uuid_to_int(node.props["__eventid"]) if "__eventid" in node.props else names.new_id(path).int
+    if info.is_fallback:
+        progress.flag_missing_command(info.keyword)
+    args = command.parse(NodeData(node.props, node.args, node.nodes), names)
+    if args is None:
+        args = {}
+    if "__collapse" in node.props:
+        args["__collapse"] = node.props["__collapse"]
+    if "__comment" in node.props:
+        args["__comment"] = node.props["__comment"]
+    if "__label" in node.props:
+        args["__label"] = node.props["__label"]
+    if info.is_custom_event_call:
+        script = names.shared_script_for_custom_event(args["customEventId"])
+        return Event(id=id, command=command, args=args, children={"script": script})
+    return Event(id=id, command=command, args=args, children=dict(children) if children is not None else None)
+
+
+def _protofy_event(event: Event, children: ChildGroups) -> ProtoEvent:
+    return ProtoEvent(command=event.command.info.name, args=event.args,
+                      children=dict(children) if children is not None else None)
+
+
+def _expand_proto(item: Tuple[ProtoEvent, str]) -> Tuple[Tuple[ProtoEvent, str], ChildGroups]:
+    proto, path = item
+    if proto.children is None:
+        return item, None
+    return item, [(k, _at_paths(v, path + "/" + k)) for k, v in proto.children.items()]
+
+
+def _deprotofy_event(item: Tuple[ProtoEvent, str], children: ChildGroups, new_id: Callable[[str], UUID]) -> Event:
+    proto, path = item
+    command = command_for_name(proto.command)
+    return Event(id=new_id(path).int, command=command, args=proto.args,
+                 children=dict(children) if children is not None else None)
+
+
+class SharedScript(list):
+    """
+    A custom event's script, built once and shared by every call to it instead of being copied into each one. It
+    can't be changed in place, so take `copy_events()` and change that instead. Its serialized form gets worked out
+    the first time it's needed and reused for every call after that.
+    """
+
+    def __init__(self, events: List[Event]):
+        super().__init__(events)
+        self._serialized: Optional[List[Dict[str, JsonSafe]]] = None
+
+    @staticmethod
+    def from_protos(protos: List[ProtoEvent], new_id: Callable[[str], UUID], path: str) -> "SharedScript":
+        return SharedScript(map_event_tree(_at_paths(protos, path), _expand_proto,
+                                           lambda state, children: _deprotofy_event(state, children, new_id)))
+
+    def serialized(self) -> List[Dict[str, JsonSafe]]:
+        if self._serialized is None:
+            self._serialized = [i.serialize() for i in self]
+        return self._serialized
+
+    def copy_events(self) -> List[Event]:
+        """A private copy of the script, with its own event IDs, to change however you like."""
+        return map_event_tree(_at_paths([i.protofy() for i in self], ""), _expand_proto,
+                              lambda state, children: _deprotofy_event(state, children, _random_id))
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Shared custom event scripts can't be changed, use copy_events() for one that can")
+
+    append = extend = insert = remove = pop = clear = sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+
+    def __reduce__(self):
+        # the cached serialization isn't worth sending anywhere
+        return SharedScript, (list(self),)
 
 
 @dataclass
@@ -152,7 +296,7 @@ class CustomEvent(Serializable):
     @staticmethod
     def deserialize(obj: Dict[str, JsonSafe], proj_index: int) -> "CustomEvent":
         return CustomEvent(
-            id=UUID(obj["id"]),
+            id=ID_TABLE.to_uuid(obj["id"]),
             name=obj["name"],
             description=obj["description"],
             variables={int(k): v["name"] for k, v in obj["variables"].items()},
@@ -164,7 +308,7 @@ class CustomEvent(Serializable):
     def format(self, names: NameUtil) -> Document:
         doc = Document()
         doc.nodes.extend([
-            prop_node("id", str(self.id)),
+            prop_node("id", self.id),
             prop_node("name", self.name),
             prop_node("description", self.description),
             prop_node("__index", self.proj_index)
@@ -185,12 +329,12 @@ class CustomEvent(Serializable):
     @staticmethod
     def parse(doc: Document, names: NameUtil, progress: ProgressTracker) -> "CustomEvent":
         contents = map_nodes(doc.nodes, ["script"])
-        id = UUID(contents["id"]) if "id" in contents else uuid.uuid4()
         name = contents["name"]
+        id = ID_TABLE.to_uuid(contents["id"]) if "id" in contents else names.new_id("custom-events/" + name)
         description = contents["description"]
         variables = {int(k[1:-1]): v for k, v in contents["variables"].items()} if "variables" in contents else {}
         actors = {int(k[1:-1]): v for k, v in contents["actors"].items()} if "actors" in contents else {}
         script_node = [i for i in doc.nodes if i.name == "script"][-1]
-        script = [Event.parse(i, names, progress) for i in script_node.nodes]
+        script = Event.parse_script(script_node.nodes, names, progress, "custom-events/" + name + "/script")
         proj_index = int(contents["__index"])
         return CustomEvent(id, name, description, variables, actors, script, proj_index)
@@ -0,0 +1,334 @@
+"""
+Writes out a scene's collisions and tile colors, which are one number for every tile, as KDL documents with a node for
+each tile that isn't empty (`all 3 4`, `palette2 0 7`, ...). The whole grid gets sorted into kinds of tile at once,
+with NumPy if it's installed and the grid is big enough to be worth it, or with a byte table otherwise. The text gets
+written straight from that, since building and then printing a Node for every one of tens of thousands of tiles is
+what used to take most of the time of formatting a big scene.
+
+They can also be written as rectangles of tiles of the same kind instead (`all 0 0 20 1`, with a width and height
+after the position), which for maps drawn in big blocks the way most are is a fraction of the size, or as a string
+of hex digits for every row (`row "ff00b0"`), one digit for each tile, which doesn't care how busy a map is and gets
+parsed a whole row at a time. Parsing takes any of them.
+
+Scenes hold them as a bytearray, a byte for every tile instead of a pointer to an int, unless something in them won't
+fit in one, which leaves them as the list they came in as.
+"""
+
+from itertools import compress, groupby
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from kdl import Document, Node
+from kdl import printing
+
+# what collision value gets written as what nodes, one code for each combination
+COLLISION_NAMES = [(), ("all",), ("up",), ("down",), ("left",), ("right",)]
+COLLISION_NAMES += [i + ("ladder",) for i in COLLISION_NAMES]
+LADDER = 6
+# what gets set in a collision value for each node name
+COLLISION_BITS = {"all": 0xF, "up": 0x1, "down": 0x2, "left": 0x4, "right": 0x8, "ladder": 0x10}
+# and for each code, which is what gets written as a digit in a row
+COLLISION_VALUES = [sum(COLLISION_BITS[j] for j in i) for i in COLLISION_NAMES]
+
+# how grids get written out: a node for every tile, for every rectangle of them, or for every row
+TILES = "tiles"
+RECTS = "rects"
+ROWS = "rows"
+GRID_FORMATS = [TILES, RECTS, ROWS]
+ROW = "row"
+
+# NumPy only gets imported for big scenes, since it takes as long to import as it saves on a handful of the biggest
+NUMPY_MIN_TILES = 32768
+
+_numpy = None
+
+# what a scene's collisions and tile colors are held as
+TileLayer = Union[bytearray, List[int]]
+
+
+def collision_code(collision: int) -> int:
+    if collision & 0xF == 0xF:
+        ret = 1
+    elif collision > 0 and collision & 0x1 > 0:
+        ret = 2
+    elif collision > 0 and collision & 0x2 > 0:
+        ret = 3
+    elif collision > 0 and collision & 0x4 > 0:
+        ret = 4
+    elif collision > 0 and collision & 0x8 > 0:
+        ret = 5
+    else:
+        ret = 0
+    return ret + LADDER if collision & 0x10 > 0 else ret
+
+
+COLLISION_TABLE = bytes(collision_code(i) for i in range(256))
+# a collision code split into the kind of tile it is, and whether it's a ladder, so each is one layer of rectangles
+KIND_TABLE = bytes(i % LADDER if i < LADDER * 2 else 0 for i in range(256))
+LADDER_TABLE = bytes(1 if LADDER <= i < LADDER * 2 else 0 for i in range(256))
+# codes to the hex digits they get written as, and hex digits back to values, with anything else as 0
+HEX_DIGITS = b"0123456789abcdef"
+HEX_TABLE = bytes(HEX_DIGITS[i % 16] for i in range(256))
+
+
+def _row_table(values: List[int]) -> bytes:
+    table = bytearray(256)
+    for digit, value in enumerate(values):
+        table[HEX_DIGITS[digit]] = value
+        table[HEX_DIGITS.upper()[digit]] = value
+    return bytes(table)
+
+
+ROW_COLLISIONS = _row_table(COLLISION_VALUES)
+ROW_TILE_COLORS = _row_table(list(range(16)))
+
+
+class GridDocument(Document):
+    """
+    A document that's been written out as text already. Its nodes only get made from that if something asks for them,
+    and from then on it prints from the nodes like any other document.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.printConfig = None
+        self._nodes: Optional[List[Node]] = None
+
+    @property
+    def nodes(self) -> List[Node]:
+        if self._nodes is None:
+            self._nodes = []
+            for line in self.text.splitlines():
+                if line == "":  # all there is to an empty document
+                    continue
+                name, *args = line.split(" ")
+                self._nodes.append(Node(name=name, args=[i[1:-1] if i.startswith('"') else int(i) for i in args]))
+        return self._nodes
+
+    def print(self, config: Optional[printing.PrintConfig] = None) -> str:
+        if self._nodes is None and (config is None or config is printing.defaults):
+            return self.text
+        return super().print(config)
+
+
+def tile_layer(values: List[int]) -> TileLayer:
+    """Values read from a .gbsproj as a bytearray, or as they are if any of them isn't an int that fits in a byte."""
+    if type(values) != list:
+        return values
+    try:
+        return bytearray(values)
+    except (TypeError, ValueError):
+        return values
+
+
+def format_collisions(collisions: TileLayer, width: int, height: int,
+                      grids: str = TILES) -> Optional[GridDocument]:
+    """A scene's collisions as a document, or None if they're anything but one plain int for every tile."""
+    return _format_grid(collisions, width, height, True, grids)
+
+
+def format_tile_colors(tile_colors: TileLayer, width: int, height: int,
+                       grids: str = TILES) -> Optional[GridDocument]:
+    """A scene's tile colors as a document, or None if they're anything but one plain int for every tile."""
+    return _format_grid(tile_colors, width, height, False, grids)
+
+
+def parse_collisions(doc: Document, width: int, height: int) -> bytearray:
+    """The collision values from a document written any way, with anything it doesn't know ignored."""
+    collisions, nodes = _parse_rows(doc, width, height, ROW_COLLISIONS)
+    for node in nodes:
+        if node.name not in COLLISION_BITS:
+            continue
+        bit = COLLISION_BITS[node.name]
+        for start, end in _spans(node, width):
+            for index in range(start, end):
+                collisions[index] |= bit
+    return collisions
+
+
+def parse_tile_colors(doc: Document, width: int, height: int) -> bytearray:
+    """The tile colors from a document written any way."""
+    tile_colors, nodes = _parse_rows(doc, width, height, ROW_TILE_COLORS)
+    for node in nodes:
+        color = int(node.name[-1])
+        for start, end in _spans(node, width):
+            for index in range(start, end):
+                tile_colors[index] = color
+    return tile_colors
+
+
+def _parse_rows(doc: Document, width: int, height: int, table: bytes) -> Tuple[bytearray, List[Node]]:
+    # the grid with every row node decoded into it, and the rest of the nodes, which get set on top of that
+    grid = bytearray(width * height if width > 0 and height > 0 else 0)
+    nodes = []
+    y = 0
+    for node in doc.nodes:
+        if node.name == ROW and len(node.args) > 0 and isinstance(node.args[0], str):
+            if y < height:
+                row = node.args[0].encode("latin-1", "replace")[:width].translate(table)
+                grid[y * width:y * width + len(row)] = row
+            y += 1
+        else:
+            nodes.append(node)
+    return grid, nodes
+
+
+def _spans(node: Node, width: int) -> Iterable[Tuple[int, int]]:
+    # the indices a node covers, as one span for each row of it
+    x = node.args[0]
+    y = node.args[1]
+    if len(node.args) < 4:
+        index = int((width * y) + x)
+        return [(index, index + 1)]
+    w = int(node.args[2])
+    return [(int((width * row) + x), int((width * row) + x) + w) for row in range(int(y), int(y) + int(node.args[3]))]
+
+
+def _format_grid(values: TileLayer, width: int, height: int, collisions: bool,
+                 grids: str) -> Optional[GridDocument]:
+    # anything else is left to the scene, which logs what's wrong with it
+    if type(width) != int or type(height) != int:
+        return None
+    size = width * height if width > 0 and height > 0 else 0
+    if len(values) < size:
+        return None
+    values = values[:size]
+    if type(values) != bytearray and not set(map(type, values)) <= {int}:
+        return None
+    text = None
+    if grids == RECTS:
+        text = _write_rects(values, width, height, collisions)
+    elif grids == ROWS:
+        text = _write_rows(values, width, height, collisions)
+    elif size >= NUMPY_MIN_TILES and _load_numpy():
+        text = _write_with_numpy(values, width, height, collisions)
+    if text is None:
+        text = _write(values, width, height, collisions)
+    return GridDocument(text if text != "" else "\n")  # same as an empty Document prints
+
+
+def _names_for(codes: Iterable[int], collisions: bool) -> Dict[int, Tuple[str, ...]]:
+    if collisions:
+        return {i: COLLISION_NAMES[i] for i in codes}
+    return {i: ("palette" + str(i),) for i in codes}
+
+
+def _codes(values: TileLayer, collisions: bool) -> Sequence[int]:
+    # what kind of tile each one is, as bytes unless there's a tile color that doesn't fit in one
+    try:
+        grid = bytes(values)
+    except ValueError:
+        if collisions:
+            return bytes(collision_code(i) for i in values)
+        return [max(i, 0) for i in values]
+    return grid.translate(COLLISION_TABLE) if collisions else grid
+
+
+def _write(values: TileLayer, width: int, height: int, collisions: bool) -> str:
+    codes = _codes(values, collisions)
+    indices = list(compress(range(len(codes)), codes))
+    codes = list(compress(codes, codes))
+    names = _names_for(set(codes), collisions)
+    xs = [" " + str(i) + " " for i in range(width)]
+    ys = [str(i) + "\n" for i in range(height)]
+    lines = []
+    for index, code in zip(indices, codes):
+        y, x = divmod(index, width)
+        position = xs[x] + ys[y]
+        for name in names[code]:
+            lines.append(name + position)
+    return "".join(lines)
+
+
+def _write_rects(values: TileLayer, width: int, height: int, collisions: bool) -> str:
+    codes = _codes(values, collisions)
+    if collisions:
+        layers = [(codes.translate(KIND_TABLE), {i: COLLISION_NAMES[i][0] for i in range(1, LADDER)}),
+                  (codes.translate(LADDER_TABLE), {1: "ladder"})]
+    else:
+        layers = [(codes, {i: "palette" + str(i) for i in set(codes)})]
+    rects = []
+    for order, (layer, names) in enumerate(layers):
+        rects += [(y, x, order, names[code], w, h) for y, x, w, h, code in _rects(layer, width, height)]
+    lines = []
+    for y, x, _, name, w, h in sorted(rects):
+        if w == 1 and h == 1:
+            lines.append(name + " " + str(x) + " " + str(y) + "\n")
+        else:
+            lines.append(name + " " + str(x) + " " + str(y) + " " + str(w) + " " + str(h) + "\n")
+    return "".join(lines)
+
+
+def _write_rows(values: TileLayer, width: int, height: int, collisions: bool) -> Optional[str]:
+    codes = _codes(values, collisions)
+    if len(codes) > 0 and max(codes) >= 16:  # a tile color that won't fit in a digit, so it gets written by tile
+        return None
+    digits = bytes(codes).translate(HEX_TABLE).decode("ascii")
+    return "".join(ROW + ' "' + digits[y * width:(y + 1) * width] + '"\n' for y in range(height))
+
+
+def _rects(layer: Sequence[int], width: int, height: int) -> List[Tuple[int, int, int, int, int]]:
+    """
+    Rectangles that cover every tile of the layer that isn't 0 exactly once, as (y, x, width, height, code). Each
+    row gets split into runs of the same code, and a run carries on the rectangle above it if that has the same
+    position, width and code, so there's never more than one rectangle open for each run of the row above.
+    """
+    ret = []
+    above: Dict[Tuple[int, int, int], List[int]] = {}
+    for y in range(height):
+        row = {}
+        x = 0
+        for code, run in groupby(layer[y * width:(y + 1) * width]):
+            w = sum(1 for _ in run)
+            if code != 0:
+                key = (x, w, code)
+                rect = above.pop(key, None)
+                if rect is None:
+                    rect = [y, x, w, 0, code]
+                rect[3] += 1
+                row[key] = rect
+            x += w
+        ret += above.values()
+        above = row
+    ret += above.values()
+    return [tuple(i) for i in ret]
+
+
+def _write_with_numpy(values: TileLayer, width: int, height: int, collisions: bool) -> Optional[str]:
+    try:
+        grid = _numpy.array(values, dtype=_numpy.int64)
+    except OverflowError:
+        return None
+    if collisions:
+        codes = _numpy.zeros(len(values), dtype=_numpy.int64)
+        # lowest priority first, so the ones that win out get written over the rest
+        positive = grid > 0
+        for code, bit in [(5, 0x8), (4, 0x4), (3, 0x2), (2, 0x1)]:
+            codes[positive & (grid & bit > 0)] = code
+        codes[grid & 0xF == 0xF] = 1
+        codes[grid & 0x10 > 0] += LADDER
+    else:
+        codes = _numpy.maximum(grid, 0)
+    indices = _numpy.flatnonzero(codes)
+    unique, which = _numpy.unique(codes[indices], return_inverse=True)
+    names = list(_names_for(unique.tolist(), collisions).values())
+    # strings in object arrays get added together like Python strings, just without a Python loop around it
+    y, x = _numpy.divmod(indices, width)
+    xs = _numpy.array([" " + str(i) + " " for i in range(width)], dtype=object)
+    ys = _numpy.array([str(i) + "\n" for i in range(height)], dtype=object)
+    positions = xs[x] + ys[y]
+    lines = _numpy.array([i[0] for i in names], dtype=object)[which] + positions
+    if any(len(i) > 1 for i in names):
+        seconds = _numpy.array([i[1] if len(i) > 1 else "" for i in names], dtype=object)[which]
+        lines += seconds + _numpy.where(seconds != "", positions, "")
+    return "".join(lines.tolist())
+
+
+def _load_numpy() -> bool:
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy is not False
@@ -0,0 +1,87 @@
+"""
+The index.kdl at the top of a tree, which lists the ID, folder name and index of every scene, actor, trigger and custom
+event. Parsing builds its name tables from that one file instead of opening every meta.kdl once just for its ID and
+then again to parse it for real. It's only a shortcut: whenever it doesn't match the tree, parsing ignores it and reads
+the IDs out of the tree the way it always has.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import os
+from typing import List, Optional
+
+from kdl import Document, Node
+
+MANIFEST = "index"  # what the document's called when the top of the tree gets loaded, from index.kdl
+
+
+@dataclass
+class ManifestEntry:
+    id: str
+    name: str  # the folder it's in, or for a custom event the file without .kdl
+    index: int
+
+    def format(self, kind: str) -> Node:
+        return Node(name=kind, args=[self.id, self.name], props=OrderedDict([("index", self.index)]))
+
+    def matches(self, id: Optional[str], index: int) -> bool:
+        """If what this points to still has the same ID and index."""
+        return id == self.id and index == self.index
+
+    @staticmethod
+    def parse(node: Node) -> "ManifestEntry":
+        return ManifestEntry(node.args[0], node.args[1], int(node.props["index"]))
+
+
+@dataclass
+class SceneEntry(ManifestEntry):
+    actors: List[ManifestEntry] = field(default_factory=list)
+    triggers: List[ManifestEntry] = field(default_factory=list)
+
+    def format(self, kind: str = "scene") -> Node:
+        ret = super().format(kind)
+        ret.nodes.extend([i.format("actor") for i in self.actors])
+        ret.nodes.extend([i.format("trigger") for i in self.triggers])
+        return ret
+
+    def matches_dir(self, scene_dir: str) -> bool:
+        """If the scene's actor and trigger folders are still exactly the ones listed."""
+        for kind, entries in [("actors", self.actors), ("triggers", self.triggers)]:
+            dirs = [i.name for i in os.scandir(scene_dir + "/" + kind) if i.is_dir()] \
+                if os.path.exists(scene_dir + "/" + kind) else []
+            if sorted(dirs) != sorted(i.name for i in entries):
+                return False
+        return True
+
+    @staticmethod
+    def parse(node: Node) -> "SceneEntry":
+        entry = ManifestEntry.parse(node)
+        return SceneEntry(entry.id, entry.name, entry.index,
+                          actors=[ManifestEntry.parse(i) for i in node.nodes if i.name == "actor"],
+                          triggers=[ManifestEntry.parse(i) for i in node.nodes if i.name == "trigger"])
+
+
+@dataclass
+class Manifest:
+    scenes: List[SceneEntry]
+    custom_events: List[ManifestEntry]
+
+    def format(self) -> Document:
+        ret = Document()
+        ret.nodes.extend([i.format() for i in self.scenes])
+        ret.nodes.extend([i.format("custom-event") for i in self.custom_events])
+        return ret
+
+    def matches(self, scene_dirs: List[str], event_files: List[str]) -> bool:
+        """If the scene folders and custom event files are still exactly the ones listed."""
+        return (sorted(scene_dirs) == sorted(i.name for i in self.scenes)
+                and sorted(event_files) == sorted(i.name + ".kdl" for i in self.custom_events))
+
+    @staticmethod
+    def parse(doc: Document) -> Optional["Manifest"]:
+        """The manifest from index.kdl, or None if it's not one this can read."""
+        try:
+            return Manifest(scenes=[SceneEntry.parse(i) for i in doc.nodes if i.name == "scene"],
+                            custom_events=[ManifestEntry.parse(i) for i in doc.nodes if i.name == "custom-event"])
+        except (IndexError, KeyError, TypeError, ValueError):
+            return None
@@ -4,7 +4,10 @@ Additional types to cover for multiple possible values in event arguments, plus
 
 from abc import ABC, abstractmethod
 from collections import OrderedDict
-from typing import Any, Dict, List, Union
+import json
+import re
+from sys import intern
+from typing import Any, Collection, Dict, Iterator, List, TextIO, Tuple, Union
 from uuid import UUID
 
 from .enums import SerializableEnum
@@ -13,11 +16,79 @@ JsonSafe = Union[Dict[str, "JsonSafe"], List["JsonSafe"], str, int, float, bool,
 
 
 class Serializable(ABC):
+    __slots__ = ()  # so slotted subclasses really don't get a __dict__
+
     @abstractmethod
     def serialize(self) -> JsonSafe:
         return NotImplemented
 
 
+# how str(uuid) writes them, which is how GB Studio and this both write them
+_CANONICAL_UUID = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+def uuid_to_int(id: str) -> int:
+    """The same as `UUID(id).int`, but about twice as quick for IDs written the usual way (nearly all of them)."""
+    if _CANONICAL_UUID.fullmatch(id) is not None:
+        return int(id.replace("-", ""), 16)
+    return UUID(id).int
+
+
+def int_to_uuid_str(id: int) -> str:
+    """The same as `str(UUID(int=id))`, without building the UUID on the way."""
+    hex = "%032x" % id
+    return hex[:8] + "-" + hex[8:12] + "-" + hex[12:16] + "-" + hex[16:20] + "-" + hex[20:]
+
+
+class IdTable:
+    """
+    Interns the IDs a project refers to, both ways, so each string only gets parsed once and each UUID only gets
+    printed once, and everything pointing at the same actor, scene, sprite etc. shares one UUID and one string. Use it
+    instead of `UUID(...)` and `str(...)` for those. It fills up as the project gets read, so `clear` it before starting
+    on another one. Event IDs stay out of it, since nothing else points at them and each one only turns up once.
+    """
+
+    def __init__(self):
+        self.ints: Dict[str, int] = {}  # every way an ID has been written -> its 128-bit int
+        self.strs: Dict[int, str] = {}  # int -> canonical string
+        self.uuids: Dict[int, UUID] = {}  # int -> UUID, only for the IDs something's asked for as a UUID
+
+    def clear(self):
+        self.ints.clear()
+        self.strs.clear()
+        self.uuids.clear()
+
+    def is_uuid(self, id: str) -> bool:
+        return id in self.ints or len(id.strip("{}").replace("-", "")) == 32
+
+    def to_int(self, id: str) -> int:
+        ret = self.ints.get(id)
+        if ret is None:
+            ret = uuid_to_int(id)
+            self.ints[id] = ret
+        return ret
+
+    def to_uuid(self, id: Union[str, int]) -> UUID:
+        id_int = id if type(id) == int else self.to_int(id)
+        ret = self.uuids.get(id_int)
+        if ret is None:
+            ret = UUID(int=id_int)
+            self.uuids[id_int] = ret
+        return ret
+
+    def to_str(self, id: Union[UUID, str, int]) -> str:
+        id_int = id if type(id) == int else (self.to_int(id) if type(id) == str else id.int)
+        ret = self.strs.get(id_int)
+        if ret is None:
+            ret = int_to_uuid_str(id_int)
+            self.strs[id_int] = ret
+            self.ints[ret] = id_int
+        return ret
+
+
+ID_TABLE = IdTable()  # the project being worked on's, there's only ever one per process
+
+
 def serialize(obj: Any) -> JsonSafe:
     if type(obj) == int or type(obj) == bool or type(obj) == str or obj is None:
         # Already safe! Go on ahead!
@@ -29,13 +100,16 @@ def serialize(obj: Any) -> JsonSafe:
         return obj
     if type(obj) == UUID:
         # A UUID! We special-case these because they're damn well everywhere in GB Studio
-        return str(obj)
+        return ID_TABLE.to_str(obj)
     elif type(obj) == dict:
         # A dict! Might not be safe yet. Map it to be sure!
         return {str(k): serialize(v) for k, v in obj.items()}
     elif type(obj) == list:
         # A list! Might not be safe yet. Map it to be sure!
         return[serialize(i) for i in obj]
+    elif type(obj) == bytearray:
+        # A scene's tiles! Every byte's already an int, so this is all it takes
+        return list(obj)
     elif isinstance(obj, Serializable):
         # We know it's serializable! Serialize it!
         return obj.serialize()
@@ -47,3 +121,121 @@ def serialize(obj: Any) -> JsonSafe:
     else:
         # We don't know how to serialize this! Give up because we don't really care about full capabilities!
         raise ValueError("Attempted to serialize un-serializable type " + str(type(obj)))
+
+
+def intern_keys(obj: JsonSafe) -> JsonSafe:
+    """Copy a decoded JSON value with every object key interned, so identical keys share one string."""
+    if type(obj) == dict:
+        return {intern(k): intern_keys(v) for k, v in obj.items()}
+    elif type(obj) == list:
+        return [intern_keys(i) for i in obj]
+    return obj
+
+
+def dump_fields(fields: Dict[str, Any], out: TextIO, indent: int = 4):
+    """
+    Write out a JSON object the same way `json.dump(serialize(serialize(fields)), out, indent=indent)` would, but
+    serialize list fields one entry at a time, writing each entry as soon as it's ready instead of holding all of it.
+    """
+    # serialize() doesn't look inside what a Serializable hands back, hence running it twice
+    out.write("{")
+    first = True
+    for k, v in fields.items():
+        out.write(("\n" if first else ",\n") + " " * indent + json.dumps(str(k)) + ": ")
+        first = False
+        if type(v) == list and len(v) > 0:
+            out.write("[")
+            for i in range(len(v)):
+                entry = json.dumps(serialize(serialize(v[i])), indent=indent).replace("\n", "\n" + " " * (indent * 2))
+                out.write(("\n" if i == 0 else ",\n") + " " * (indent * 2) + entry)
+            out.write("\n" + " " * indent + "]")
+        else:
+            out.write(json.dumps(serialize(serialize(v)), indent=indent).replace("\n", "\n" + " " * indent))
+    out.write("\n}" if not first else "}")
+
+
+class _JsonReader:
+    """Pulls JSON values out of a file a chunk at a time, so only the value being decoded has to be in memory."""
+
+    def __init__(self, file: TextIO, chunk_size: int):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _read_more(self) -> bool:
+        # read at least as much as we're already holding, so retrying a big value stays linear overall
+        chunk = self.file.read(max(self.chunk_size, len(self.buffer) - self.pos))
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        if chunk == "":
+            self.eof = True
+        return not self.eof
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\n\r":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read_more():
+                raise ValueError("Unexpected end of JSON input")
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError("Expected '" + char + "' in JSON input but got '" + self.buffer[self.pos] + "'")
+        self.pos += 1
+
+    def value(self) -> JsonSafe:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # a number cut off partway through still decodes, so make sure whatever follows it isn't more number
+                if self.eof or (end < len(self.buffer) and self.buffer[end] not in "0123456789.eE+-"):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._read_more()
+
+
+def iter_object(file: TextIO, streamed: Collection[str] = (), chunk_size: int = 1 << 16) \
+        -> Iterator[Tuple[str, Union[JsonSafe, Iterator[JsonSafe]]]]:
+    """
+    Read a top-level JSON object from a file one field at a time. Arrays under the keys in `streamed` are handed
+    back as iterators that decode one entry at a time, and have to be used before moving on to the next field.
+    """
+    reader = _JsonReader(file, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key in streamed and reader.peek() == "[":
+            entries = _iter_array(reader)
+            yield key, entries
+            for _ in entries:  # skip whatever the caller didn't read
+                pass
+        else:
+            yield key, reader.value()
+        if reader.peek() == "}":
+            return
+        reader.expect(",")
+
+
+def _iter_array(reader: _JsonReader) -> Iterator[JsonSafe]:
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.peek() == "]":
+            reader.pos += 1
+            return
+        reader.expect(",")
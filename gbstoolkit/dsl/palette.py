@@ -4,7 +4,7 @@ from uuid import UUID
 
 from kdl import Node
 
-from .marshalling import JsonSafe, serialize, Serializable
+from .marshalling import ID_TABLE, JsonSafe, serialize, Serializable
 from .util import NameUtil, map_nodes, prop_node
 
 PaletteID = Union[str, UUID]
@@ -27,9 +27,8 @@ class Palette(Serializable):
     def parse_id(id: Optional[str]) -> Optional[PaletteID]:
         if id is None:
             return None
-        uuidtest = id.strip('{}').replace('-', '')
-        if len(uuidtest) == 32:
-            return UUID(id)
+        if ID_TABLE.is_uuid(id):
+            return ID_TABLE.to_uuid(id)
         else:
             return id
 
@@ -60,7 +59,7 @@ class Palette(Serializable):
             prop_node("dark", self.colors[2]),
             prop_node("black", self.colors[3])
         ])]
-        return Node(name=names.palette_for_id(str(self.id)), nodes=nodes)
+        return Node(name=names.palette_for_id(serialize(self.id)), nodes=nodes)
 
     @staticmethod
     def parse(node: Node) -> "Palette":
@@ -1,144 +1,112 @@
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 import os
+from uuid import UUID
 
-from kdl import Document, Node, parse
+from kdl import Document, Node
 
 from .assets import Background, SpriteSheet, Song
-from .event import CustomEvent
-from .marshalling import JsonSafe, serialize, Serializable
+from .cache import DocumentCache, load_document, load_documents
+from .event import CustomEvent, SharedScript
+from .manifest import MANIFEST, Manifest, ManifestEntry, SceneEntry
+from .marshalling import ID_TABLE, JsonSafe, serialize, Serializable
 from .palette import Palette
 from .scene import Scene
 from .settings import Settings, EngineFields
-from .util import NameUtil, ProgressTracker, ProtoEvent, prop_node, map_nodes, sanitize_name
+from .util import (ACTOR, BACKGROUND, CUSTOM_EVENT, PALETTE, PROJECT_KINDS, RANDOM_IDS, SCENE, SONG, SPRITE,
+                   BufferedProgressTracker, IdSource, NameUtil, ProgressTracker, ProtoEvent, SymbolTable, TableNameUtil,
+                   map_nodes, prop_node, sanitize_name, snapshot)
 
 
-class ProjectNameUtil(NameUtil):
-    def __init__(self):
-        self.id_to_background = {}
-        self.background_to_id = {}
-        self.id_to_custom_event = {}
-        self.custom_event_to_id = {}
+class ProjectNameUtil(TableNameUtil):
+    def __init__(self, ids: IdSource = RANDOM_IDS):
+        super().__init__(SymbolTable(PROJECT_KINDS))
+        self.ids = ids
         self.custom_event_scripts = {}
+        self.custom_event_shared_scripts = {}
         self.custom_event_names = {}
-        self.id_to_palette = {}
-        self.palette_to_id = {}
-        self.id_to_scene = {}
-        self.scene_to_id = {}
-        self.id_to_song = {}
-        self.song_to_id = {}
-        self.id_to_sprite = {}
-        self.sprite_to_id = {}
-        self.custom_event_name_counts = {}
-        self.palette_name_counts = {}
-        self.scene_name_counts = {}
 
     def add_background(self, id: str, name: str):
-        self.id_to_background[id] = name
-        self.background_to_id[name] = id
+        self.table.add(BACKGROUND, id, name)
 
     def add_custom_event(self, id: str, name: str, progress: ProgressTracker):
-        if name in self.custom_event_name_counts:
-            progress.log_error("Custom event name '" + name + "' Already exists! Renaming to `" + name + " "
-                               + str(self.custom_event_name_counts[name] + 1) + "`!")
-            self.custom_event_name_counts[name] += 1
-            name += " " + str(self.custom_event_name_counts[name])
-        else:
-            self.custom_event_name_counts[name] = 1
-        self.id_to_custom_event[id] = name
-        self.custom_event_to_id[name] = id
+        renamed = self.table.unique(CUSTOM_EVENT, name)
+        if renamed is not None:
+            progress.log_error("Custom event name '" + name + "' Already exists! Renaming to `" + renamed + "`!")
+            name = renamed
+        self.table.add(CUSTOM_EVENT, id, name)
 
     def add_event_script(self, id: str, raw_name: str, script: List[ProtoEvent]):
         self.custom_event_names[id] = raw_name
         self.custom_event_scripts[id] = script
+        self.custom_event_shared_scripts.pop(id, None)
 
     def add_palette(self, id: str, name: str, progress: ProgressTracker):
-        if name in self.palette_name_counts:
-            progress.log_error("Palette name '" + name + "' Already exists! Renaming to `" + name + " "
-                               + str(self.palette_name_counts[name] + 1) + "`!")
-            self.palette_name_counts[name] += 1
-            name += " " + str(self.palette_name_counts[name])
-        else:
-            self.palette_name_counts[name] = 1
-        self.id_to_palette[id] = name
-        self.palette_to_id[name] = id
+        renamed = self.table.unique(PALETTE, name)
+        if renamed is not None:
+            progress.log_error("Palette name '" + name + "' Already exists! Renaming to `" + renamed + "`!")
+            name = renamed
+        self.table.add(PALETTE, id, name)
 
     def add_scene(self, id: str, name: str, progress: ProgressTracker):
-        if name in self.scene_name_counts:
-            progress.log_error("Scene name '" + name + "' Already exists! Renaming to " + name + " "
-                               + str(self.scene_name_counts[name] + 1))
-            self.scene_name_counts[name] += 1
-            name += " " + str(self.scene_name_counts[name])
-        else:
-            self.scene_name_counts[name] = 1
-        self.id_to_scene[id] = name
-        self.scene_to_id[name] = id
+        renamed = self.table.unique(SCENE, name)
+        if renamed is not None:
+            progress.log_error("Scene name '" + name + "' Already exists! Renaming to " + renamed)
+            name = renamed
+        self.table.add(SCENE, id, name)
 
     def add_song(self, id: str, name: str):
-        self.id_to_song[id] = name
-        self.song_to_id[name] = id
+        self.table.add(SONG, id, name)
 
     def add_sprite(self, id: str, name: str):
-        self.id_to_sprite[id] = name
-        self.sprite_to_id[name] = id
+        self.table.add(SPRITE, id, name)
 
     def actor_for_id(self, id: str) -> str:
-        if id == "player" or id == "$self$" or id.isdecimal():
+        if id in self.to_name[ACTOR] or id.isdecimal():
             return id
         raise RuntimeError("Illegal actor ID in custom events: " + id)
 
     def id_for_actor(self, name: str) -> str:
-        if name == "player" or name == "$self$" or name.isdecimal():
+        if name in self.to_id[ACTOR] or name.isdecimal():
             return name
         raise RuntimeError("Illegal actor name in custom events: " + name)
 
-    def background_for_id(self, id: str) -> str:
-        return self.id_to_background[id]
-
-    def id_for_background(self, name: str) -> str:
-        return self.background_to_id[name]
-
-    def custom_event_for_id(self, id: str) -> str:
-        return self.id_to_custom_event[id]
-
-    def id_for_custom_event(self, name: str) -> str:
-        return self.custom_event_to_id[name]
-
     def script_for_custom_event(self, id: str) -> List[ProtoEvent]:
         return self.custom_event_scripts[id]
 
-    def raw_custom_event_name(self, name: str) -> str:
-        return self.custom_event_names[self.custom_event_to_id[name]]
-
-    def palette_for_id(self, id: str) -> str:
-        return self.id_to_palette[id]
-
-    def id_for_palette(self, name: str) -> str:
-        return self.palette_to_id[name]
+    def shared_script_for_custom_event(self, id: str) -> SharedScript:
+        if id not in self.custom_event_shared_scripts:
+            self.custom_event_shared_scripts[id] = SharedScript.from_protos(self.custom_event_scripts[id], self.new_id,
+                                                                            "custom-events/" + id + "/inlined")
+        return self.custom_event_shared_scripts[id]
 
-    def scene_for_id(self, id: str) -> str:
-        return self.id_to_scene[id]
+    def raw_custom_event_name(self, name: str) -> str:
+        return self.custom_event_names[self.to_id[CUSTOM_EVENT][name]]
 
-    def id_for_scene(self, name: str) -> str:
-        return self.scene_to_id[name]
+    def trigger_for_id(self, id: str) -> str:
+        return NotImplemented
 
-    def song_for_id(self, id: str) -> str:
-        return self.id_to_song[id]
+    def id_for_trigger(self, name: str) -> str:
+        return NotImplemented
 
-    def id_for_song(self, name: str) -> str:
-        return self.song_to_id[name]
+    def new_id(self, path: str) -> UUID:
+        return self.ids.new_id(path)
 
-    def sprite_for_id(self, id: str) -> str:
-        return self.id_to_sprite[id]
 
-    def id_for_sprite(self, name: str) -> str:
-        return self.sprite_to_id[name]
+def parse_scene_dir(names: NameUtil, scene_dir: str, progress: ProgressTracker,
+                    cache: Optional[DocumentCache] = None, entry: Optional[SceneEntry] = None) -> Scene:
+    progress.set_status("Parsing contents for scene '" + scene_dir.split("/")[-1] + "'")
+    return Scene.parse(load_documents(scene_dir, cache), names, scene_dir, progress, cache, entry)
 
-    def trigger_for_id(self, id: str) -> str:
-        return NotImplemented
 
-    def id_for_trigger(self, name: str) -> str:
-        return NotImplemented
+# Runs in a worker process, so progress gets buffered and handed back to be replayed in order, along with which cache
+# entries it used
+def _parse_scene_worker(names: NameUtil, scene_dir: str, cache: Optional[DocumentCache],
+                        entry: Optional[SceneEntry]) -> Tuple[Scene, List[Tuple[str, str]], Set[str]]:
+    progress = BufferedProgressTracker()
+    scene = parse_scene_dir(names, scene_dir, progress, cache, entry)
+    return scene, progress.log, cache.visited if cache is not None else set()
 
 
 @dataclass
@@ -159,20 +127,24 @@ class Project(Serializable):
     settings: Settings
 
     def serialize(self) -> JsonSafe:
+        return {k: serialize(v) for k, v in self.fields().items()}
+
+    def fields(self) -> Dict[str, Any]:
+        """The top-level fields of the .gbsproj, not serialized yet so they can be written out one by one."""
         ret = {
             "name": self.name,
             "author": self.author,
             "_version": self.version,
             "_release": self.release,
-            "scenes": serialize(self.scenes),
-            "backgrounds": serialize(self.backgrounds),
-            "spriteSheets": serialize(self.sprite_sheets),
-            "palettes": serialize(self.palettes),
-            "customEvents": serialize(self.custom_events),
-            "music": serialize(self.music),
+            "scenes": self.scenes,
+            "backgrounds": self.backgrounds,
+            "spriteSheets": self.sprite_sheets,
+            "palettes": self.palettes,
+            "customEvents": self.custom_events,
+            "music": self.music,
             "variables": [{"id": i[0], "name": i[1]} for i in self.variables.items()],
-            "engineFieldValues": serialize(self.engine_field_values),
-            "settings": serialize(self.settings)
+            "engineFieldValues": self.engine_field_values,
+            "settings": self.settings
         }
         if self.notes is not None:
             ret["notes"] = self.notes
@@ -188,11 +160,11 @@ class Project(Serializable):
             version=obj["_version"],
             release=obj["_release"],
             notes=obj["notes"] if "notes" in obj else None,
-            scenes=[Scene.deserialize(i, obj["scenes"].index(i)) for i in obj["scenes"]],
+            scenes=[Scene.deserialize(v, i) for i, v in enumerate(obj["scenes"])],
             backgrounds=[Background.deserialize(i) for i in obj["backgrounds"]],
             sprite_sheets=[SpriteSheet.deserialize(i) for i in obj["spriteSheets"]],
             palettes=[Palette.deserialize(i) for i in obj["palettes"]],
-            custom_events=[CustomEvent.deserialize(i, obj["customEvents"].index(i)) for i in obj["customEvents"]],
+            custom_events=[CustomEvent.deserialize(v, i) for i, v in enumerate(obj["customEvents"])],
             music=[Song.deserialize(i) for i in obj["music"]],
             variables={i["id"]: i["name"] for i in obj["variables"]},
             engine_field_values=EngineFields.deserialize(obj["engineFieldValues"]) if "engineFieldValues" in obj else EngineFields(
@@ -201,29 +173,36 @@ class Project(Serializable):
             settings=Settings.deserialize(obj["settings"])
         )
 
-    def format(self, progress: ProgressTracker) -> Tuple[Dict[str, Document], NameUtil]:
+    def format(self, progress: ProgressTracker,
+               scene_headers: Optional[List[Tuple[str, str]]] = None) -> Tuple[Dict[str, Document], NameUtil]:
+        """
+        Format the project-level documents and build the names for everything else. When the scenes are left out so
+        they can be read and formatted one at a time, `scene_headers` has to give the ID and name of each of them.
+        """
+        if scene_headers is None:
+            scene_headers = [(ID_TABLE.to_str(i.id), i.name) for i in self.scenes]
         names = ProjectNameUtil()
         for background in self.backgrounds:
-            names.add_background(str(background.id), background.name)
-        for event in self.custom_events:
+            names.add_background(ID_TABLE.to_str(background.id), background.name)
+        for index, event in enumerate(self.custom_events):
             if event.name == "":
-                names.add_custom_event(str(event.id), "custom-event-" + str(self.custom_events.index(event)), progress)
+                names.add_custom_event(ID_TABLE.to_str(event.id), "custom-event-" + str(index), progress)
             else:
-                names.add_custom_event(str(event.id), sanitize_name(event.name, "custom event"), progress)
-        for palette in self.palettes:
+                names.add_custom_event(ID_TABLE.to_str(event.id), sanitize_name(event.name, "custom event"), progress)
+        for index, palette in enumerate(self.palettes):
             if palette.name == "":
-                names.add_palette(str(palette.id), "palette-" + str(self.palettes.index(palette)), progress)
+                names.add_palette(serialize(palette.id), "palette-" + str(index), progress)
             else:
-                names.add_palette(str(palette.id), sanitize_name(palette.name, "palette"), progress)
-        for scene in self.scenes:
-            if scene.name == "":
-                names.add_scene(str(scene.id), "scene-" + str(self.scenes.index(scene)), progress)
+                names.add_palette(serialize(palette.id), sanitize_name(palette.name, "palette"), progress)
+        for index, (id, name) in enumerate(scene_headers):
+            if name == "":
+                names.add_scene(id, "scene-" + str(index), progress)
             else:
-                names.add_scene(str(scene.id), sanitize_name(scene.name, "scene"), progress)
+                names.add_scene(id, sanitize_name(name, "scene"), progress)
         for song in self.music:
-            names.add_song(str(song.id), song.name)
+            names.add_song(ID_TABLE.to_str(song.id), song.name)
         for sprite in self.sprite_sheets:
-            names.add_sprite(str(sprite.id), sprite.name)
+            names.add_sprite(ID_TABLE.to_str(sprite.id), sprite.name)
         meta = Document()
         meta.nodes.extend([
             prop_node("name", self.name),
@@ -254,37 +233,42 @@ class Project(Serializable):
         # TODO: v3 fancy sprite sheets in separate folder!
         return docs, names
 
+    def manifest(self, scene_entries: List[SceneEntry], names: NameUtil) -> Manifest:
+        """The index.kdl for the tree this got formatted into, given what formatting each scene handed back."""
+        return Manifest(scenes=scene_entries,
+                        custom_events=[ManifestEntry(ID_TABLE.to_str(i.id),
+                                                     names.custom_event_for_id(ID_TABLE.to_str(i.id)), i.proj_index)
+                                       for i in self.custom_events])
+
+    @staticmethod
+    def parse(docs: Dict[str, Document], project_root: str, progress: ProgressTracker, jobs: int = 1,
+              cache: Optional[DocumentCache] = None, ids: IdSource = RANDOM_IDS) -> "Project":
+        return Project.parse_with_names(docs, project_root, progress, jobs, cache, ids)[0]
+
     @staticmethod
-    def parse(docs: Dict[str, Document], project_root: str, progress: ProgressTracker) -> "Project":
+    def parse_with_names(docs: Dict[str, Document], project_root: str, progress: ProgressTracker, jobs: int = 1,
+                         cache: Optional[DocumentCache] = None, ids: IdSource = RANDOM_IDS,
+                         use_manifest: bool = True) -> Tuple["Project", ProjectNameUtil]:
         meta = map_nodes(docs["project"].nodes, ["engineFields", "settings"])
-        backgrounds = [Background.parse(i) for i in docs["backgrounds"].nodes]
-        sprite_sheets = [SpriteSheet.parse(i) for i in docs["sprite-sheets"].nodes]
-        music = [Song.parse(i) for i in docs["music"].nodes]
+        backgrounds = [Background.parse(i, ids) for i in docs["backgrounds"].nodes]
+        sprite_sheets = [SpriteSheet.parse(i, ids) for i in docs["sprite-sheets"].nodes]
+        music = [Song.parse(i, ids) for i in docs["music"].nodes]
         variables = {i.name[1:-1]: i.args[0] for i in docs["variables"].nodes}
         palettes = [Palette.parse(i) for i in docs["palettes"].nodes]
         engine_fields = EngineFields.parse([i for i in docs["project"].nodes if i.name == "engineFields"][-1])
-        names = ProjectNameUtil()
+        names = ProjectNameUtil(ids)
         for background in backgrounds:
-            names.add_background(str(background.id), background.name)
-        for palette in palettes:
+            names.add_background(ID_TABLE.to_str(background.id), background.name)
+        for index, palette in enumerate(palettes):
             if palette.name == "":
-                names.add_palette(str(palette.id), "palette-" + str(palettes.index(palette)), progress)
+                names.add_palette(serialize(palette.id), "palette-" + str(index), progress)
             else:
-                names.add_palette(str(palette.id), sanitize_name(palette.name, "palette"), progress)
+                names.add_palette(serialize(palette.id), sanitize_name(palette.name, "palette"), progress)
         for song in music:
-            names.add_song(str(song.id), song.name)
+            names.add_song(ID_TABLE.to_str(song.id), song.name)
         for sprite in sprite_sheets:
-            names.add_sprite(str(sprite.id), sprite.name)
-        # Chicken-egg hell: have to do a first light pass of scenes to get the IDs into NameUtil before custom events
+            names.add_sprite(ID_TABLE.to_str(sprite.id), sprite.name)
         scene_dirs = [i.name for i in os.scandir(project_root + "/scenes") if i.is_dir()]
-        for i in scene_dirs:
-            progress.set_status("Parsing meta for scene '" + i + "'")
-            with open(project_root + "/scenes/" + i + "/meta.kdl", encoding="utf-8") as scene_meta:
-                doc = parse(scene_meta.read())
-                contents = map_nodes(doc.nodes)
-                if "id" in contents:
-                    names.add_scene(contents["id"], i, progress)
-        # More chicken-egg hell: have to do a light first pass of custom events to get the IDs into NameUtil too! aaa
         if os.path.exists(project_root + "/custom-events"):
             event_files = [i.name for i in os.scandir(project_root + "/custom-events")]
         else:
@@ -292,11 +276,37 @@ class Project(Serializable):
         event_docs = []
         for i in event_files:
             progress.set_status("Parsing custom event '" + i + "'")
-            with open(project_root + "/custom-events/" + i, encoding="utf-8") as event:
-                doc = parse(event.read())
-                event_docs.append(doc)
+            event_docs.append(load_document(project_root + "/custom-events/" + i, cache))
+        # index.kdl has every ID and name in it, as long as it still matches the tree
+        manifest = Manifest.parse(docs[MANIFEST]) if use_manifest and MANIFEST in docs else None
+        if manifest is not None and not manifest.matches(scene_dirs, event_files):
+            manifest = None
+        if manifest is not None:
+            # the custom events are loaded already, so they can be checked against it for free
+            event_entries = {i.name + ".kdl": i for i in manifest.custom_events}
+            for file, doc in zip(event_files, event_docs):
+                contents = map_nodes(doc.nodes, ["script"])
+                if not event_entries[file].matches(contents.get("id"), int(contents.get("__index", -1))):
+                    manifest = None
+                    break
+        if manifest is not None:
+            for entry in manifest.scenes:
+                names.add_scene(entry.id, entry.name, progress)
+        else:
+            # Chicken-egg hell: have to do a first light pass of scenes to get the IDs into NameUtil before custom
+            # events
+            for i in scene_dirs:
+                progress.set_status("Parsing meta for scene '" + i + "'")
+                doc = load_document(project_root + "/scenes/" + i + "/meta.kdl", cache)
                 contents = map_nodes(doc.nodes)
-                names.add_custom_event(contents["id"], sanitize_name(contents["name"], "custom event"), progress)
+                if "id" in contents:
+                    names.add_scene(contents["id"], i, progress)
+        # More chicken-egg hell: custom event names come from the events themselves, which are loaded already anyway,
+        # so one renamed by hand gets its new name whether or not index.kdl is up to date
+        for doc in event_docs:
+            contents = map_nodes(doc.nodes)
+            names.add_custom_event(contents["id"], sanitize_name(contents["name"], "custom event"), progress)
+        scene_entries = {i.name: i for i in manifest.scenes} if manifest is not None else {}
         # NameUtil should be safe! We can parse stuff using them now~
         settings = Settings.parse([i for i in docs["project"].nodes if i.name == "settings"][-1].nodes, names)
         custom_events: List[Optional[CustomEvent]] = [None for _ in range(len(event_docs))]
@@ -304,14 +314,32 @@ class Project(Serializable):
             event = CustomEvent.parse(i, names, progress)
             custom_events[event.proj_index] = event
             # theoretically no race condition worry - nested custom event calls are illegal
-            names.add_event_script(str(event.id), event.name, [i.protofy() for i in event.script])
+            names.add_event_script(ID_TABLE.to_str(event.id), event.name, [i.protofy() for i in event.script])
+        parsed: List[Scene] = []
+        if jobs > 1 and len(scene_dirs) > 1:
+            # names are all resolved by now, so every scene dir can be parsed independently
+            shared_names = snapshot(names)  # so they only get pickled once, not once per scene
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = [executor.submit(_parse_scene_worker, shared_names, project_root + "/scenes/" + i, cache,
+                                           scene_entries.get(i))
+                           for i in scene_dirs]
+                for future in futures:
+                    scene, log, visited = future.result()
+                    BufferedProgressTracker.replay(log, progress)
+                    if cache is not None:
+                        cache.visited.update(visited)
+                    parsed.append(scene)
+        else:
+            for i in scene_dirs:
+                parsed.append(parse_scene_dir(names, project_root + "/scenes/" + i, progress, cache,
+                                              scene_entries.get(i)))
+        if manifest is not None and not all(scene_entries[i].matches(ID_TABLE.to_str(scene.id), scene.proj_index)
+                                            for i, scene in zip(scene_dirs, parsed)):
+            # somebody's changed a scene's ID by hand, so everything that points at it has to be looked up again
+            progress.set_status("index.kdl is out of date, parsing again without it")
+            return Project.parse_with_names(docs, project_root, progress, jobs, cache, ids, False)
         scenes: List[Optional[Scene]] = [None for _ in range(len(scene_dirs))]
-        for i in scene_dirs:
-            progress.set_status("Parsing contents for scene '" + i + "'")
-            scene_dir = project_root + "/scenes/" + i
-            scene_docs = {i.name[:-4]: parse(open(scene_dir + "/" + i.name, encoding="utf-8").read()) for i in os.scandir(scene_dir)
-                          if i.is_file() and i.name.endswith(".kdl")}
-            scene = Scene.parse(scene_docs, names, scene_dir, progress)
+        for scene in parsed:
             scenes[scene.proj_index] = scene
         return Project(
             name=meta["name"],
@@ -328,4 +356,4 @@ class Project(Serializable):
             variables=variables,
             engine_field_values=engine_fields,
             settings=settings
-        )
+        ), names
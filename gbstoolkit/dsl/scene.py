@@ -1,114 +1,67 @@
 import os
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
-import uuid
+from typing import Dict, List, Optional, Tuple, Union
 from uuid import UUID
 
-from kdl import Document, Node, parse
+from kdl import Document, Node
 
 from .actor import Actor
+from .cache import DocumentCache, load_document, load_documents
 from .enums import SceneType
-from .event import Event
-from .marshalling import JsonSafe, serialize, Serializable
+from .event import Event, SharedScript
+from .grid import TILES, TileLayer, tile_layer
+from .grid import format_collisions, format_tile_colors, parse_collisions, parse_tile_colors
+from .manifest import ManifestEntry, SceneEntry
+from .marshalling import ID_TABLE, JsonSafe, serialize, Serializable
 from .palette import Palette, PaletteID
 from .trigger import Trigger
-from .util import NameUtil, ProgressTracker, ProtoEvent, map_nodes, prop_node, sanitize_name
+from .util import (ACTOR, BUILTIN_ACTORS, SCENE_KINDS, TRIGGER, NameUtil, ProgressTracker, ProtoEvent, TableNameUtil,
+                   map_nodes, prop_node, sanitize_name)
 
 
-class SceneNameUtil(NameUtil):
-    def __init__(self, parent: NameUtil):
+class SceneNameUtil(TableNameUtil):
+    def __init__(self, parent: TableNameUtil):
+        # its own actors and triggers, and everything else straight from the project's table
+        super().__init__(parent.table.overlay(SCENE_KINDS))
         self.parent = parent
-        self.id_to_actor = {}
-        self.actor_to_id = {}
-        self.id_to_trigger = {}
-        self.trigger_to_id = {}
-        self.actor_name_counts = {}
-        self.trigger_name_counts = {}
 
     def add_actor(self, id: str, name: str, progress: ProgressTracker):
-        if name == "player" or name == "$self$" or name.isdecimal():
+        if name in BUILTIN_ACTORS or name.isdecimal():
             progress.log_error("Actor name '" + name + "' in scene '" + progress.current_scene
                                + "' may overlap with built-in names! Renaming to '" + name + "-'!")
             name += "-"
-        if name in self.actor_name_counts:
+        renamed = self.table.unique(ACTOR, name)
+        if renamed is not None:
             progress.log_error("Actor name '" + name + "' Already exists in scene '"
-                               + progress.current_scene + "'! Renaming to '" + name + " "
-                               + str(self.actor_name_counts[name] + 1) + "'!")
-            self.actor_name_counts[name] += 1
-            name += " " + str(self.actor_name_counts[name])
-        else:
-            self.actor_name_counts[name] = 1
-        self.id_to_actor[id] = name
-        self.actor_to_id[name] = id
+                               + progress.current_scene + "'! Renaming to '" + renamed + "'!")
+            name = renamed
+        self.table.add(ACTOR, id, name)
 
     def add_trigger(self, id: str, name: str, progress: ProgressTracker):
-        if name in self.trigger_name_counts:
+        renamed = self.table.unique(TRIGGER, name)
+        if renamed is not None:
             progress.log_error("Trigger name '" + name + "' Already exists in scene '" + progress.current_scene
-                               + "! Renaming to '" + name + " " + str(self.trigger_name_counts[name] + 1) + "'!")
-            self.trigger_name_counts[name] += 1
-            name += " " + str(self.trigger_name_counts[name])
-        else:
-            self.trigger_name_counts[name] = 1
-        self.id_to_trigger[id] = name
-        self.trigger_to_id[name] = id
-
-    def actor_for_id(self, id: str) -> str:
-        if id == "player" or id == "$self$" or id.isdecimal():
-            return id
-        return self.id_to_actor[id]
-
-    def id_for_actor(self, name: str) -> str:
-        if name == "player" or name == "$self$" or name.isdecimal():
-            return name
-        return self.actor_to_id[name]
-
-    def background_for_id(self, id: str) -> str:
-        return self.parent.background_for_id(id)
-
-    def id_for_background(self, name: str) -> str:
-        return self.parent.id_for_background(name)
-
-    def custom_event_for_id(self, id: str) -> str:
-        return self.parent.custom_event_for_id(id)
-
-    def id_for_custom_event(self, name: str) -> str:
-        return self.parent.id_for_custom_event(name)
+                               + "! Renaming to '" + renamed + "'!")
+            name = renamed
+        self.table.add(TRIGGER, id, name)
 
     def script_for_custom_event(self, id: str) -> List[ProtoEvent]:
         return self.parent.script_for_custom_event(id)
 
-    def raw_custom_event_name(self, name: str) -> str:
-        return self.parent.raw_custom_event_name(name)
-
-    def palette_for_id(self, id: str) -> str:
-        return self.parent.palette_for_id(id)
-
-    def id_for_palette(self, name: str) -> str:
-        return self.parent.id_for_palette(name)
-
-    def scene_for_id(self, id: str) -> str:
-        return self.parent.scene_for_id(id)
+    def shared_script_for_custom_event(self, id: str) -> SharedScript:
+        return self.parent.shared_script_for_custom_event(id)
 
-    def id_for_scene(self, name: str) -> str:
-        return self.parent.id_for_scene(name)
+    def new_id(self, path: str) -> UUID:
+        return self.parent.new_id(path)
 
-    def song_for_id(self, id: str) -> str:
-        return self.parent.song_for_id(id)
-
-    def id_for_song(self, name: str) -> str:
-        return self.parent.id_for_song(name)
-
-    def sprite_for_id(self, id: str) -> str:
-        return self.parent.sprite_for_id(id)
-
-    def id_for_sprite(self, name: str) -> str:
-        return self.parent.id_for_sprite(name)
+    def raw_custom_event_name(self, name: str) -> str:
+        return self.parent.raw_custom_event_name(name)
 
     def trigger_for_id(self, id: str) -> str:
-        return self.id_to_trigger[id]
+        return self.to_name[TRIGGER][id]
 
     def id_for_trigger(self, name: str) -> str:
-        return self.trigger_to_id[name]
+        return self.to_id[TRIGGER][name]
 
 
 @dataclass
@@ -126,8 +79,8 @@ class Scene(Serializable):
     label_color: Optional[str]
     actors: List[Actor]
     triggers: List[Trigger]
-    collisions: List[int]
-    tile_colors: List[int]
+    collisions: TileLayer
+    tile_colors: TileLayer
     script: List[Event]
     player_hit1_script: List[Event]
     player_hit2_script: List[Event]
@@ -151,8 +104,8 @@ class Scene(Serializable):
             "playerHit1Script": serialize(self.player_hit1_script),
             "playerHit2Script": serialize(self.player_hit2_script),
             "playerHit3Script": serialize(self.player_hit3_script),
-            "collisions": self.collisions,
-            "tileColors": self.tile_colors
+            "collisions": serialize(self.collisions),
+            "tileColors": serialize(self.tile_colors)
         }
         if self.notes is not None:
             ret["notes"] = self.notes
@@ -163,10 +116,10 @@ class Scene(Serializable):
     @staticmethod
     def deserialize(obj: Dict[str, JsonSafe], proj_index: int) -> "Scene":
         return Scene(
-            id=UUID(obj["id"]),
+            id=ID_TABLE.to_uuid(obj["id"]),
             name=obj["name"],
             type=SceneType.deserialize(obj["type"]) if "type" in obj else SceneType.TOP_DOWN,
-            background_id=UUID(obj["backgroundId"]),
+            background_id=ID_TABLE.to_uuid(obj["backgroundId"]),
             palette_ids=[Palette.parse_id(i) for i in obj["paletteIds"]] if "paletteIds" in obj else [],
             x=obj["x"],
             y=obj["y"],
@@ -174,10 +127,10 @@ class Scene(Serializable):
             height=obj["height"],
             notes=obj["notes"] if "notes" in obj else None,
             label_color=obj["labelColor"] if "labelColor" in obj else None,
-            actors=[Actor.deserialize(i, obj["actors"].index(i)) for i in obj["actors"]],
-            triggers=[Trigger.deserialize(i, obj["triggers"].index(i)) for i in obj["triggers"]],
-            collisions=obj["collisions"],
-            tile_colors=obj["tileColors"] if "tileColors" in obj else [],
+            actors=[Actor.deserialize(v, i) for i, v in enumerate(obj["actors"])],
+            triggers=[Trigger.deserialize(v, i) for i, v in enumerate(obj["triggers"])],
+            collisions=tile_layer(obj["collisions"]),
+            tile_colors=tile_layer(obj["tileColors"]) if "tileColors" in obj else bytearray(),
             script=[Event.deserialize(i) for i in obj["script"]],
             player_hit1_script=[Event.deserialize(i) for i in obj["playerHit1Script"]] if "playerHit1Script" in obj else [],
             player_hit2_script=[Event.deserialize(i) for i in obj["playerHit2Script"]] if "playerHit1Script" in obj else [],
@@ -185,24 +138,25 @@ class Scene(Serializable):
             proj_index=proj_index
         )
 
-    def format(self, names: NameUtil, progress: ProgressTracker) -> Tuple[Dict[str, Document], NameUtil]:
+    def format(self, names: NameUtil, progress: ProgressTracker,
+               grids: str = TILES) -> Tuple[Dict[str, Document], NameUtil]:
         scene_names = SceneNameUtil(names)
-        for actor in self.actors:
+        for index, actor in enumerate(self.actors):
             if actor.name == "":
-                scene_names.add_actor(str(actor.id), "actor-" + str(self.actors.index(actor)), progress)
+                scene_names.add_actor(ID_TABLE.to_str(actor.id), "actor-" + str(index), progress)
             else:
                 scene_names.add_actor(
-                    str(actor.id),
-                    sanitize_name(actor.name, names.scene_for_id(str(self.id)) + " actor"),
+                    ID_TABLE.to_str(actor.id),
+                    sanitize_name(actor.name, names.scene_for_id(ID_TABLE.to_str(self.id)) + " actor"),
                     progress
                 )
-        for trigger in self.triggers:
+        for index, trigger in enumerate(self.triggers):
             if trigger.name == "":
-                scene_names.add_trigger(str(trigger.id), "trigger-" + str(self.triggers.index(trigger)), progress)
+                scene_names.add_trigger(ID_TABLE.to_str(trigger.id), "trigger-" + str(index), progress)
             else:
                 scene_names.add_actor(
-                    str(trigger.id),
-                    sanitize_name(trigger.name, names.scene_for_id(str(self.id)) + " trigger"),
+                    ID_TABLE.to_str(trigger.id),
+                    sanitize_name(trigger.name, names.scene_for_id(ID_TABLE.to_str(self.id)) + " trigger"),
                     progress
                 )
         meta = Document()
@@ -221,15 +175,45 @@ class Scene(Serializable):
             meta.nodes.append(Node(
                 name="palettes",
                 nodes=[Node(
-                    name="palette" + str(self.palette_ids.index(i)),
-                    args=[names.palette_for_id(serialize(i))],
-                ) for i in self.palette_ids if i is not None]
+                    name="palette" + str(i),
+                    args=[names.palette_for_id(serialize(v))],
+                ) for i, v in enumerate(self.palette_ids) if v is not None]
             ))
         if self.notes is not None:
             meta.nodes.append(prop_node("notes", self.notes))
         if self.label_color is not None:
             meta.nodes.append(prop_node("labelColor", self.label_color))
         docs = {"meta": meta}
+        hasCollisions = len(self.collisions) > 0
+        hasTileColors = len(self.tile_colors) > 0
+        collisions = format_collisions(self.collisions, self.width, self.height, grids) if hasCollisions else None
+        tile_colors = format_tile_colors(self.tile_colors, self.width, self.height, grids) if hasTileColors else None
+        if (hasCollisions and collisions is None) or (hasTileColors and tile_colors is None):
+            collisions, tile_colors = self._format_grids_by_tile(progress)
+        if hasCollisions:
+            docs["collisions"] = collisions
+        if hasTileColors:
+            docs["tile-colors"] = tile_colors
+        if len(self.script) > 0:
+            script = Document()
+            script.nodes.extend([Event.format(i, scene_names) for i in self.script])
+            docs["init"] = script
+        if len(self.player_hit1_script) > 0:
+            script = Document()
+            script.nodes.extend([Event.format(i, scene_names) for i in self.player_hit1_script])
+            docs["player-hit-1"] = script
+        if len(self.player_hit2_script) > 0:
+            script = Document()
+            script.nodes.extend([Event.format(i, scene_names) for i in self.player_hit2_script])
+            docs["player-hit-2"] = script
+        if len(self.player_hit3_script) > 0:
+            script = Document()
+            script.nodes.extend([Event.format(i, scene_names) for i in self.player_hit3_script])
+            docs["player-hit-3"] = script
+        return docs, scene_names
+
+    def _format_grids_by_tile(self, progress: ProgressTracker) -> Tuple[Document, Document]:
+        # the slow way, for collisions or tile colors that aren't what format_collisions and format_tile_colors expect
         collisions = Document()
         tile_colors = Document()
         hasCollisions = len(self.collisions) > 0
@@ -261,55 +245,60 @@ class Scene(Serializable):
                     color = self.tile_colors[index]
                     if color > 0:
                         tile_colors.nodes.append(Node(name="palette" + str(color), args=[x, y]))
-        if hasCollisions:
-            docs["collisions"] = collisions
-        if hasTileColors:
-            docs["tile-colors"] = tile_colors
-        if len(self.script) > 0:
-            script = Document()
-            script.nodes.extend([Event.format(i, scene_names) for i in self.script])
-            docs["init"] = script
-        if len(self.player_hit1_script) > 0:
-            script = Document()
-            script.nodes.extend([Event.format(i, scene_names) for i in self.player_hit1_script])
-            docs["player-hit-1"] = script
-        if len(self.player_hit2_script) > 0:
-            script = Document()
-            script.nodes.extend([Event.format(i, scene_names) for i in self.player_hit2_script])
-            docs["player-hit-2"] = script
-        if len(self.player_hit3_script) > 0:
-            script = Document()
-            script.nodes.extend([Event.format(i, scene_names) for i in self.player_hit3_script])
-            docs["player-hit-3"] = script
-        return docs, scene_names
+        return collisions, tile_colors
+
+    def manifest_entry(self, scene_names: NameUtil) -> SceneEntry:
+        """What index.kdl lists for this scene, given the names formatting it came up with."""
+        id = ID_TABLE.to_str(self.id)
+        actors = [ManifestEntry(ID_TABLE.to_str(i.id), scene_names.actor_for_id(ID_TABLE.to_str(i.id)), i.scene_index)
+                  for i in self.actors]
+        triggers = [ManifestEntry(ID_TABLE.to_str(i.id), scene_names.trigger_for_id(ID_TABLE.to_str(i.id)),
+                                  i.scene_index) for i in self.triggers]
+        return SceneEntry(id, scene_names.scene_for_id(id), self.proj_index, actors=actors, triggers=triggers)
 
     @staticmethod
-    def parse(docs: Dict[str, Document], names: NameUtil, scene_dir: str, progress: ProgressTracker) -> "Scene":
+    def parse_names(names: NameUtil, scene_dir: str, progress: ProgressTracker, cache: Optional[DocumentCache] = None,
+                    entry: Optional[SceneEntry] = None) -> Tuple[SceneNameUtil, List[str], List[str]]:
+        """The scene's names, from `entry` if it's given (and checked against the tree already), or its actor and
+        trigger metas otherwise."""
         scene_names = SceneNameUtil(names)
+        if entry is not None:
+            for i in entry.actors:
+                scene_names.add_actor(i.id, i.name, progress)
+            for i in entry.triggers:
+                scene_names.add_trigger(i.id, i.name, progress)
+            return scene_names, [i.name for i in entry.actors], [i.name for i in entry.triggers]
         # Even more chicken-egg NameUtil hell! Aaaaaaaaaaaaaaaaaaaaa
         if os.path.exists(scene_dir + "/actors"):
             actor_dirs = [i.name for i in os.scandir(scene_dir + "/actors") if i.is_dir()]
             for i in actor_dirs:
                 progress.set_status("Parsing meta for scene " + scene_dir.split("/")[-1] + " actor '" + i + "'")
-                with open(scene_dir + "/actors/" + i + "/meta.kdl", encoding="utf-8") as meta:
-                    contents = map_nodes(parse(meta.read()).nodes)
-                    scene_names.add_actor(contents["id"], i, progress)
+                contents = map_nodes(load_document(scene_dir + "/actors/" + i + "/meta.kdl", cache).nodes)
+                scene_names.add_actor(contents["id"], i, progress)
         else:
             actor_dirs = []
         if os.path.exists(scene_dir + "/triggers"):
             trigger_dirs = [i.name for i in os.scandir(scene_dir + "/triggers") if i.is_dir()]
             for i in trigger_dirs:
                 progress.set_status("Parsing meta for scene " + scene_dir.split("/")[-1] + " trigger '" + i + "'")
-                with open(scene_dir + "/triggers/" + i + "/meta.kdl", encoding="utf-8") as meta:
-                    contents = map_nodes(parse(meta.read()).nodes)
-                    scene_names.add_trigger(contents["id"], i, progress)
+                contents = map_nodes(load_document(scene_dir + "/triggers/" + i + "/meta.kdl", cache).nodes)
+                scene_names.add_trigger(contents["id"], i, progress)
         else:
             trigger_dirs = []
+        return scene_names, actor_dirs, trigger_dirs
+
+    @staticmethod
+    def parse(docs: Dict[str, Document], names: NameUtil, scene_dir: str, progress: ProgressTracker,
+              cache: Optional[DocumentCache] = None, entry: Optional[SceneEntry] = None) -> "Scene":
+        if entry is not None and not entry.matches_dir(scene_dir):
+            entry = None
+        scene_names, actor_dirs, trigger_dirs = Scene.parse_names(names, scene_dir, progress, cache, entry)
         contents = map_nodes(docs["meta"].nodes)
-        id = UUID(contents["id"]) if "id" in contents else uuid.uuid4()
+        path = "scenes/" + scene_dir.split("/")[-1]
+        id = ID_TABLE.to_uuid(contents["id"]) if "id" in contents else scene_names.new_id(path)
         name = contents["name"]
         type = SceneType.deserialize(contents["type"])
-        background_id = UUID(scene_names.id_for_background(contents["background"]))
+        background_id = ID_TABLE.to_uuid(scene_names.id_for_background(contents["background"]))
         x = contents["x"]
         y = contents["y"]
         width = int(contents["width"])
@@ -325,50 +314,30 @@ class Scene(Serializable):
         notes = contents["notes"] if "notes" in contents else None
         label_color = contents["labelColor"] if "labelColor" in contents else None
         if "collisions" in docs:
-            collisions = [0 for _ in range(width * height)]
-            doc = docs["collisions"]
-            for node in doc.nodes:
-                node_x = node.args[0]
-                node_y = node.args[1]
-                index = int((width * node_y) + node_x)
-                if node.name == "all":
-                    collisions[index] |= 0xF
-                elif node.name == "up":
-                    collisions[index] |= 0x1
-                elif node.name == "down":
-                    collisions[index] |= 0x2
-                elif node.name == "left":
-                    collisions[index] |= 0x4
-                elif node.name == "right":
-                    collisions[index] |= 0x8
-                elif node.name == "ladder":
-                    collisions[index] |= 10
+            collisions = parse_collisions(docs["collisions"], width, height)
         else:
-            collisions = []
+            collisions = bytearray()
         if "tile-colors" in docs:
-            tile_colors = [0 for _ in range(width * height)]
-            doc = docs["tile-colors"]
-            for node in doc.nodes:
-                node_x = node.args[0]
-                node_y = node.args[1]
-                index = int((width * node_y) + node_x)
-                tile_colors[index] = int(node.name[-1])
+            tile_colors = parse_tile_colors(docs["tile-colors"], width, height)
         else:
-            tile_colors = []
+            tile_colors = bytearray()
         if "init" in docs:
-            script = [Event.parse(i, scene_names, progress) for i in docs["init"].nodes]
+            script = Event.parse_script(docs["init"].nodes, scene_names, progress, path + "/init")
         else:
             script = []
         if "player-hit-1" in docs:
-            player_hit1_script = [Event.parse(i, scene_names, progress) for i in docs["player-hit-1"].nodes]
+            player_hit1_script = Event.parse_script(docs["player-hit-1"].nodes, scene_names, progress,
+                                                    path + "/player-hit-1")
         else:
             player_hit1_script = []
         if "player-hit-2" in docs:
-            player_hit2_script = [Event.parse(i, scene_names, progress) for i in docs["player-hit-2"].nodes]
+            player_hit2_script = Event.parse_script(docs["player-hit-2"].nodes, scene_names, progress,
+                                                    path + "/player-hit-2")
         else:
             player_hit2_script = []
         if "player-hit-3" in docs:
-            player_hit3_script = [Event.parse(i, scene_names, progress) for i in docs["player-hit-3"].nodes]
+            player_hit3_script = Event.parse_script(docs["player-hit-3"].nodes, scene_names, progress,
+                                                    path + "/player-hit-3")
         else:
             player_hit3_script = []
         # Finally time for the actors and triggers!
@@ -376,18 +345,21 @@ class Scene(Serializable):
         for dir in actor_dirs:
             progress.set_status("Parsing scripts for scene " + scene_dir.split("/")[-1] + " actor '" + dir + "'")
             actor_dir = scene_dir + "/actors/" + dir
-            docs = {i.name[:-4]: parse(open(actor_dir + "/" + i.name, encoding="utf-8").read()) for i in os.scandir(actor_dir)
-                    if i.is_file() and i.name.endswith(".kdl")}
-            actor = Actor.parse(docs, scene_names, progress)
+            actor = Actor.parse(load_documents(actor_dir, cache), scene_names, progress, path + "/actors/" + dir)
             actors[actor.scene_index] = actor
         triggers: List[Optional[Trigger]] = [None for _ in range(len(trigger_dirs))]
         for dir in trigger_dirs:
             progress.set_status("Parsing scripts for scene " + scene_dir.split("/")[-1] + " trigger '" + dir + "'")
             trigger_dir = scene_dir + "/triggers/" + dir
-            docs = {i.name[:-4]: parse(open(trigger_dir + "/" + i.name, encoding="utf-8").read()) for i in os.scandir(trigger_dir)
-                    if i.is_file() and i.name.endswith(".kdl")}
-            trigger = Trigger.parse(docs, scene_names, progress)
+            trigger = Trigger.parse(load_documents(trigger_dir, cache), scene_names, progress,
+                                    path + "/triggers/" + dir)
             triggers[trigger.scene_index] = trigger
+        if entry is not None:
+            # an actor or trigger whose ID got changed by hand would've been looked up under its old one
+            if not _entries_match(entry.actors, actors) or not _entries_match(entry.triggers, triggers):
+                progress.set_status("index.kdl is out of date for scene " + scene_dir.split("/")[-1]
+                                    + ", parsing it again without it")
+                return Scene.parse(docs, names, scene_dir, progress, cache)
         return Scene(
             id=id,
             name=name,
@@ -410,3 +382,8 @@ class Scene(Serializable):
             player_hit3_script=player_hit3_script,
             proj_index=proj_index
         )
+
+
+def _entries_match(entries: List[ManifestEntry], parsed: List[Optional[Union[Actor, Trigger]]]) -> bool:
+    return all(0 <= i.index < len(parsed) and parsed[i.index] is not None
+               and i.matches(ID_TABLE.to_str(parsed[i.index].id), parsed[i.index].scene_index) for i in entries)
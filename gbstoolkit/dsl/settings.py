@@ -5,7 +5,7 @@ from uuid import UUID
 from kdl import Node
 
 from .enums import Direction
-from .marshalling import JsonSafe, serialize, Serializable
+from .marshalling import ID_TABLE, JsonSafe, serialize, Serializable
 from .palette import PaletteID
 from .util import NameUtil, map_nodes, prop_node
 
@@ -95,14 +95,14 @@ class Settings(Serializable):
     @staticmethod
     def deserialize(obj: Dict[str, JsonSafe]) -> "Settings":
         id_read = obj["defaultSpritePaletteId"]
-        default_sprite_palette_id = UUID(id_read) if len(id_read) == 36 else id_read
+        default_sprite_palette_id = ID_TABLE.to_uuid(id_read) if len(id_read) == 36 else id_read
         id_read = obj["defaultUIPaletteId"]
-        default_ui_palette_id = UUID(id_read) if len(id_read) == 36 else id_read
+        default_ui_palette_id = ID_TABLE.to_uuid(id_read) if len(id_read) == 36 else id_read
         id_read = obj["playerPaletteId"] if "playerPaletteId" in obj else "default-palette-1" # should be the right value
-        player_palette_id = UUID(id_read) if len(id_read) == 36 else id_read
+        player_palette_id = ID_TABLE.to_uuid(id_read) if len(id_read) == 36 else id_read
         return Settings(
-            start_scene_id=UUID(obj["startSceneId"]) if obj["startSceneId"] != "" else None,
-            player_sprite_sheet_id=UUID(obj["playerSpriteSheetId"]),
+            start_scene_id=ID_TABLE.to_uuid(obj["startSceneId"]) if obj["startSceneId"] != "" else None,
+            player_sprite_sheet_id=ID_TABLE.to_uuid(obj["playerSpriteSheetId"]),
             start_x=obj["startX"],
             start_y=obj["startY"],
             start_move_speed=obj["startMoveSpeed"] if "startMoveSpeed" in obj else 3,
@@ -115,7 +115,8 @@ class Settings(Serializable):
             zoom=obj["zoom"],
             custom_colors_enabled=obj["customColorsEnabled"],
             custom_head=obj["customHead"] if "customHead" in obj else "",
-            default_background_palette_ids=[UUID(i) if len(i) == 36 else i for i in obj["defaultBackgroundPaletteIds"]],
+            default_background_palette_ids=[ID_TABLE.to_uuid(i) if len(i) == 36 else i
+                                            for i in obj["defaultBackgroundPaletteIds"]],
             default_sprite_palette_id=default_sprite_palette_id,
             default_ui_palette_id=default_ui_palette_id,
             player_palette_id=player_palette_id,
@@ -149,9 +150,9 @@ class Settings(Serializable):
             prop_node("customHead", self.custom_head),
             Node(name="defaultBackgroundPalettes", nodes=[
                 prop_node(
-                    "palette" + str(self.default_background_palette_ids.index(i)),
-                    names.palette_for_id(str(i))
-                ) for i in self.default_background_palette_ids
+                    "palette" + str(i),
+                    names.palette_for_id(str(v))
+                ) for i, v in enumerate(self.default_background_palette_ids)
             ]),
             prop_node("defaultSpritePalette", names.palette_for_id(str(self.default_sprite_palette_id))),
             prop_node("defaultUIPalette", names.palette_for_id(str(self.default_ui_palette_id))),
@@ -211,13 +212,14 @@ class Settings(Serializable):
         if len(split_nodes) > 0:
             split_sizes = split_nodes[-1].args
         return Settings(
-            start_scene_id=UUID(names.id_for_scene(contents["startScene"])) if contents["startScene"] is not None else None,
+            start_scene_id=(ID_TABLE.to_uuid(names.id_for_scene(contents["startScene"]))
+                            if contents["startScene"] is not None else None),
             start_x=contents["startX"],
             start_y=contents["startY"],
             start_move_speed=contents["startMoveSpeed"],
             start_anim_speed=contents["startAnimSpeed"],
             start_direction=Direction.deserialize(contents["startDirection"]),
-            player_sprite_sheet_id=UUID(names.id_for_sprite(contents["playerSpriteSheet"])),
+            player_sprite_sheet_id=ID_TABLE.to_uuid(names.id_for_sprite(contents["playerSpriteSheet"])),
             show_collisions=contents["__showCollisions"],
             show_connections=contents["__showConnections"],
             world_scroll_x=contents["__worldScrollX"],
@@ -1,12 +1,11 @@
 from dataclasses import dataclass
 from typing import Dict, List, Optional
-import uuid
 from uuid import UUID
 
 from kdl import Document
 
 from .event import Event
-from .marshalling import JsonSafe, serialize, Serializable
+from .marshalling import ID_TABLE, JsonSafe, serialize, Serializable
 from .util import NameUtil, ProgressTracker, prop_node, map_nodes
 
 
@@ -41,7 +40,7 @@ class Trigger(Serializable):
     @staticmethod
     def deserialize(obj: Dict[str, JsonSafe], scene_index: int) -> "Trigger":
         return Trigger(
-            id=UUID(obj["id"]),
+            id=ID_TABLE.to_uuid(obj["id"]),
             name=obj["name"] if "name" in obj else "",
             x=obj["x"],
             y=obj["y"],
@@ -75,12 +74,15 @@ class Trigger(Serializable):
         return docs
 
     @staticmethod
-    def parse(docs: Dict[str, Document], names: NameUtil, progress: ProgressTracker) -> "Trigger":
+    def parse(docs: Dict[str, Document], names: NameUtil, progress: ProgressTracker, path: str = "") -> "Trigger":
         meta = docs["meta"]
         contents = map_nodes(meta.nodes)
-        script = [Event.parse(i, names, progress) for i in docs["interact"].nodes] if "interact" in docs else []
+        if "interact" in docs:
+            script = Event.parse_script(docs["interact"].nodes, names, progress, path + "/interact")
+        else:
+            script = []
         return Trigger(
-            id=UUID(contents["id"]) if "id" in contents else uuid.uuid4(),
+            id=ID_TABLE.to_uuid(contents["id"]) if "id" in contents else names.new_id(path),
             name=contents["name"] if "name" in contents else "",
             x=contents["x"],
             y=contents["y"],
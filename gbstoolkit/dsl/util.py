@@ -1,10 +1,13 @@
 from abc import ABC, abstractmethod
 from collections import OrderedDict
 from dataclasses import dataclass
+import pickle
 import platform
 from queue import SimpleQueue
 import re
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, TypeVar, Union
+from uuid import UUID
+import uuid
 
 from kdl import Document, Node
 
@@ -14,11 +17,56 @@ from .marshalling import JsonSafe, Serializable, serialize
 # Weird median class to avoid circular refs, wheeee
 @dataclass
 class ProtoEvent:
+    __slots__ = ("command", "args", "children")
     command: str
     args: Optional[Dict[str, JsonSafe]]
     children: Optional[Dict[str, List["ProtoEvent"]]]
 
 
+S = TypeVar("S")  # a node in the tree being walked
+R = TypeVar("R")  # what each node gets turned into
+
+ChildGroups = Optional[List[Tuple[Hashable, List[Any]]]]
+
+
+def map_event_tree(roots: List[S], expand: Callable[[S], Tuple[Any, ChildGroups]],
+                   build: Callable[[Any, ChildGroups], R]) -> List[R]:
+    """
+    Turn a list of event trees into a list of something else, using an explicit stack instead of recursion. That only
+    takes the Event layer out of the recursion limit: kdl-py still renders and parses documents recursively, and so
+    does json, so end to end a script still can't nest much past a few hundred levels. `expand` gets called on every
+    node on the way down, and returns whatever state `build` needs plus the node's children as (key, list of child
+    nodes) pairs, or None if it has no children.
+    `build` gets called on the way back up with that state and the same pairs, but holding the built children.
+    Nodes get built in the same order a recursive walk would build them: children first, siblings in order.
+    """
+    ret: List[R] = []
+    # every frame: [state, child groups, group index, iterator over that group, built groups, list to put its result in]
+    stack = [[None, [(None, roots)], 0, iter(roots), [(None, ret)], None]]
+    while len(stack) > 0:
+        frame = stack[-1]
+        groups = frame[1]
+        if frame[2] < len(groups):
+            built = frame[4][frame[2]][1]
+            for child in frame[3]:
+                state, child_groups = expand(child)
+                if child_groups is None:
+                    built.append(build(state, None))
+                else:
+                    first = iter(child_groups[0][1]) if len(child_groups) > 0 else None
+                    stack.append([state, child_groups, 0, first, [(k, []) for k, _ in child_groups], built])
+                    break
+            else:
+                frame[2] += 1
+                if frame[2] < len(groups):
+                    frame[3] = iter(groups[frame[2]][1])
+            continue
+        stack.pop()
+        if frame[5] is not None:
+            frame[5].append(build(frame[0], frame[4]))
+    return ret
+
+
 class NameUtil(ABC):
 
     @abstractmethod
@@ -49,6 +97,10 @@ class NameUtil(ABC):
     def script_for_custom_event(self, id: str) -> List[ProtoEvent]:
         return NotImplemented
 
+    @abstractmethod
+    def shared_script_for_custom_event(self, id: str) -> List["Event"]:  # a SharedScript, from event.py
+        return NotImplemented
+
     @abstractmethod
     def raw_custom_event_name(self, name: str) -> str:
         return NotImplemented
@@ -93,6 +145,172 @@ class NameUtil(ABC):
     def id_for_trigger(self, name: str) -> str:
         return NotImplemented
 
+    @abstractmethod
+    def new_id(self, path: str) -> UUID:
+        return NotImplemented
+
+
+# the kinds of things that get names
+ACTOR = "actor"
+BACKGROUND = "background"
+CUSTOM_EVENT = "custom-event"
+PALETTE = "palette"
+SCENE = "scene"
+SONG = "song"
+SPRITE = "sprite"
+TRIGGER = "trigger"
+PROJECT_KINDS = [ACTOR, BACKGROUND, CUSTOM_EVENT, PALETTE, SCENE, SONG, SPRITE]
+SCENE_KINDS = [ACTOR, TRIGGER]  # the ones each scene has its own of
+# actors every scene (and custom event) can point at, which are their own IDs and names
+BUILTIN_ACTORS = ["player", "$self$"]
+
+
+class SymbolTable:
+    """
+    Every name that's been given out, for every kind of thing: `to_name[kind][id]` and `to_id[kind][name]`. A scene's
+    table is an `overlay` on its project's, with its own dicts for its own kinds and the project's very same dicts for
+    everything else, so making one copies nothing and looking something up never has to go through the project.
+    Overlays pickle along with what they share, same as any other dicts.
+    """
+
+    __slots__ = ("to_name", "to_id", "counts")
+
+    def __init__(self, kinds: Iterable[str]):
+        self.to_name: Dict[str, Dict[str, str]] = {i: {} for i in kinds}
+        self.to_id: Dict[str, Dict[str, str]] = {i: {} for i in kinds}
+        self.counts: Dict[str, Dict[str, int]] = {i: {} for i in kinds}  # how many times each name's been asked for
+        if ACTOR in self.to_name:
+            for i in BUILTIN_ACTORS:
+                self.add(ACTOR, i, i)
+
+    def overlay(self, kinds: Iterable[str]) -> "SymbolTable":
+        ret = SymbolTable(kinds)
+        for kind in self.to_name.keys():
+            if kind not in ret.to_name:
+                ret.to_name[kind] = self.to_name[kind]
+                ret.to_id[kind] = self.to_id[kind]
+                ret.counts[kind] = self.counts[kind]
+        return ret
+
+    def add(self, kind: str, id: str, name: str):
+        self.to_name[kind][id] = name
+        self.to_id[kind][name] = id
+
+    def unique(self, kind: str, name: str) -> Optional[str]:
+        """None the first time a name's asked for, or what to rename it to every time after."""
+        counts = self.counts[kind]
+        if name in counts:
+            counts[name] += 1
+            return name + " " + str(counts[name])
+        counts[name] = 1
+        return None
+
+
+class TableNameUtil(NameUtil, ABC):
+    """The lookups every NameUtil does, straight out of a SymbolTable. Actor IDs that are numbers are their own name."""
+
+    def __init__(self, table: SymbolTable):
+        self.table = table
+        self.to_name = table.to_name
+        self.to_id = table.to_id
+
+    def actor_for_id(self, id: str) -> str:
+        try:
+            return self.to_name[ACTOR][id]
+        except KeyError:
+            if id.isdecimal():
+                return id
+            raise
+
+    def id_for_actor(self, name: str) -> str:
+        try:
+            return self.to_id[ACTOR][name]
+        except KeyError:
+            if name.isdecimal():
+                return name
+            raise
+
+    def background_for_id(self, id: str) -> str:
+        return self.to_name[BACKGROUND][id]
+
+    def id_for_background(self, name: str) -> str:
+        return self.to_id[BACKGROUND][name]
+
+    def custom_event_for_id(self, id: str) -> str:
+        return self.to_name[CUSTOM_EVENT][id]
+
+    def id_for_custom_event(self, name: str) -> str:
+        return self.to_id[CUSTOM_EVENT][name]
+
+    def palette_for_id(self, id: str) -> str:
+        return self.to_name[PALETTE][id]
+
+    def id_for_palette(self, name: str) -> str:
+        return self.to_id[PALETTE][name]
+
+    def scene_for_id(self, id: str) -> str:
+        return self.to_name[SCENE][id]
+
+    def id_for_scene(self, name: str) -> str:
+        return self.to_id[SCENE][name]
+
+    def song_for_id(self, id: str) -> str:
+        return self.to_name[SONG][id]
+
+    def id_for_song(self, name: str) -> str:
+        return self.to_id[SONG][name]
+
+    def sprite_for_id(self, id: str) -> str:
+        return self.to_name[SPRITE][id]
+
+    def id_for_sprite(self, name: str) -> str:
+        return self.to_id[SPRITE][name]
+
+
+T = TypeVar("T")
+
+
+class _Snapshot:
+    __slots__ = ("data",)
+
+    def __init__(self, obj: Any):
+        self.data = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+    def __reduce__(self):
+        return pickle.loads, (self.data,)
+
+
+def snapshot(obj: T) -> T:
+    """
+    Pickle something as it is now, once, for handing to worker process after worker process: each of them only has to
+    copy the bytes, and gets back the object itself. Only good for that, since it's not the object until it's unpickled.
+    """
+    # noinspection PyTypeChecker
+    return _Snapshot(obj)
+
+
+# Any fixed UUID works here, it just has to never change
+DERIVED_ID_NAMESPACE = UUID("5b0d3d1e-6a4f-4c1b-9a8e-3f2e7c9d1b40")
+
+
+class IdSource:
+    """
+    Comes up with IDs for anything parsed without one. By default they're random, same as GB Studio makes them. With
+    `derived`, they're worked out from where the thing is in the tree instead (e.g. "scenes/Town/actors/Bob/init/3"),
+    so parsing the same tree twice gives the same project.
+    """
+
+    def __init__(self, derived: bool = False):
+        self.derived = derived
+
+    def new_id(self, path: str) -> UUID:
+        if self.derived:
+            return uuid.uuid5(DERIVED_ID_NAMESPACE, path)
+        return uuid.uuid4()
+
+
+RANDOM_IDS = IdSource()
+
 
 @dataclass
 class NodeData:
@@ -166,6 +384,33 @@ class QueueProgressTracker(ProgressTracker):
                             + "LemmaEOF or the plugin dev know to add compat!")
 
 
+class BufferedProgressTracker(ProgressTracker):
+    """Records progress updates so they can be replayed into another tracker later, e.g. from a worker process."""
+
+    def __init__(self):
+        super().__init__()
+        self.log = []
+
+    def set_status(self, status: str):
+        self.log.append(("status", status))
+
+    def log_error(self, error: str):
+        self.log.append(("error", error))
+
+    def flag_missing_command(self, command: str):
+        self.log.append(("missing", command))
+
+    @staticmethod
+    def replay(log: List[Tuple[str, str]], progress: ProgressTracker):
+        for kind, message in log:
+            if kind == "status":
+                progress.set_status(message)
+            elif kind == "error":
+                progress.log_error(message)
+            elif kind == "missing":
+                progress.flag_missing_command(message)
+
+
 class FormatError(Exception):
     """Exception raised when parsing .gbsproj JSON into KDL."""
 
@@ -0,0 +1,116 @@
+"""
+The GUI, kept on its own so tkinter only ever gets imported when it's actually opened. Format and parse then work
+(and start quicker) on machines without Tk, like most headless CI boxes.
+"""
+
+import os
+from queue import SimpleQueue
+from threading import Thread
+import tkinter
+from tkinter import CENTER, END, filedialog, Frame, StringVar, ttk
+
+from . import format_project, parse_project
+from .dsl.util import QueueProgressTracker
+
+
+class Application(Frame):
+    def __init__(self, master=None):
+        super().__init__(master)
+        self.master = master
+        self.grid()
+        self.status = StringVar()
+        self.errors = StringVar()
+        self.status_queue = SimpleQueue()
+        self.errors_queue = SimpleQueue()
+        self.proj_file_label = ttk.Label(self, text=".gbsproj location")
+        self.proj_file_field = ttk.Entry(self)
+        self.proj_file_browse = ttk.Button(self, text="Browse...", command=self.browse_file)
+        self.proj_dir_label = ttk.Label(self, text=".kdl tree location")
+        self.proj_dir_field = ttk.Entry(self)
+        self.proj_dir_browse = ttk.Button(self, text="Browse...", command=self.browse_dir)
+        self.format_btn = ttk.Button(self, text="Convert .gbsproj to .kdl tree", command=self.execute_format)
+        self.parse_btn = ttk.Button(self, text="Convert .kdl tree to .gbsproj", command=self.execute_parse)
+        self.status_label = ttk.Label(self, textvar=self.status, justify=CENTER)
+        self.error_label = ttk.Label(self, textvar=self.errors, foreground="red", justify=CENTER)
+        self.proj_file_label.grid(row=0, column=0)
+        self.proj_file_field.grid(row=0, column=1)
+        self.proj_file_browse.grid(row=0, column=2)
+        self.proj_dir_label.grid(row=1, column=0)
+        self.proj_dir_field.grid(row=1, column=1)
+        self.proj_dir_browse.grid(row=1, column=2)
+        self.format_btn.grid(row=2, column=0)
+        self.parse_btn.grid(row=2, column=2)
+        self.status_label.grid(row=3, column=0, columnspan=3)
+        self.error_label.grid(row=4, column=0, columnspan=3)
+
+    def browse_file(self):
+        result = filedialog.askopenfilename(filetypes=[("GB Studio projects", "*.gbsproj")])
+        self.proj_file_field.delete(0, END)
+        self.proj_file_field.insert(0, result)
+
+    def browse_dir(self):
+        result = filedialog.askdirectory()
+        self.proj_dir_field.delete(0, END)
+        self.proj_dir_field.insert(0, result)
+
+    def execute_format(self):
+        file = self.proj_file_field.get()
+        dir = self.proj_dir_field.get()
+        can_run = True
+        errors = []
+        if file == "" or not os.path.exists(file):
+            can_run = False
+            errors.append("Cound not find file '" + file + "'")
+        if dir == "" or not os.path.exists(dir):
+            can_run = False
+            errors.append("Could not find directory '" + dir + "'")
+        if can_run:
+            self.master.after(50, self.update_status())
+            exec_thread = Thread(
+                target=format_project,
+                args=(file, dir, QueueProgressTracker(self.status_queue, self.errors_queue))
+            )
+            exec_thread.start()
+        else:
+            self.status.set("Could not format project")
+            self.errors.set("\n".join(errors))
+
+    def execute_parse(self):
+        file = self.proj_file_field.get()
+        dir = self.proj_dir_field.get()
+        can_run = True
+        errors = []
+        if file == "" or not os.path.exists(file):
+            can_run = False
+            errors.append("Cound not find file '" + file + "'")
+        if dir == "" or not os.path.exists(dir):
+            can_run = False
+            errors.append("Could not find directory '" + dir + "'")
+        if can_run:
+            self.master.after(50, self.update_status())
+            exec_thread = Thread(
+                target=parse_project,
+                args=(file, dir, QueueProgressTracker(self.status_queue, self.errors_queue))
+            )
+            exec_thread.start()
+        else:
+            self.status.set("Could not parse project")
+            self.errors.set("\n".join(errors))
+
+    def update_status(self):
+        while not self.status_queue.empty():
+            self.status.set(self.status_queue.get())
+        while not self.errors_queue.empty():
+            current = self.errors.get()
+            if current == "":
+                self.errors.set(self.errors_queue.get())
+            else:
+                self.errors.set(current + "\n" + self.errors_queue.get())
+        self.master.after(50, self.update_status)
+
+
+def run_gui():
+    root = tkinter.Tk()
+    app = Application(root)
+    app.master.title("GBS Toolkit")
+    app.mainloop()
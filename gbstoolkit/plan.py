@@ -0,0 +1,106 @@
+"""
+Plans the directories a format run writes into, so the output tree only gets checked once instead of once per file.
+"""
+
+from bisect import bisect_left
+import os
+from typing import Dict, List, Optional, Set
+
+from .dsl.util import ProgressTracker
+
+
+class OutputPlan:
+    """
+    Remembers what's already in the output tree, so each directory only gets listed once. Directories get planned
+    ahead of the writes and created in one sweep, parents first, and files get written without checking for them
+    first. Only the root gets listed up front; every other directory gets listed when it's planned and turns out to
+    be there already, so nothing format doesn't write to (a .git folder, the cache, a removed scene) ever gets
+    listed. Paths are relative to the tree root, with "" being the root itself.
+    Keeps count of every filesystem call it makes, since on network and Windows drives those are most of the time.
+    """
+
+    def __init__(self, project_root: str):
+        self.project_root = project_root
+        self.existing: Dict[str, Set[str]] = {}  # directory -> names of the files already in it
+        self.subdirs: Dict[str, Set[str]] = {}  # directory -> names of the directories already in it
+        self.missing: Set[str] = set()  # directories found not to be there
+        self.planned: Set[str] = set()
+        self.syscalls = 0
+        self._sorted_dirs: Optional[List[str]] = None
+
+    def path(self, rel_path: str) -> str:
+        return self.project_root + "/" + rel_path if rel_path != "" else self.project_root
+
+    def scan(self):
+        self._list("")
+
+    def _list(self, rel_dir: str) -> bool:
+        """List one directory, without going into the ones in it. Returns if it was there."""
+        self.syscalls += 1
+        try:
+            entries = list(os.scandir(self.path(rel_dir)))
+        except FileNotFoundError:
+            self.missing.add(rel_dir)
+            return False
+        self.existing[rel_dir] = {i.name for i in entries if not i.is_dir()}
+        self.subdirs[rel_dir] = {i.name for i in entries if i.is_dir()}
+        self._sorted_dirs = None
+        return True
+
+    def add_dir(self, rel_dir: str):
+        self.planned.add(rel_dir)
+
+    def create_dirs(self):
+        # sorting puts every directory after its parent
+        for rel_dir in sorted(self.planned):
+            if rel_dir in self.existing:
+                continue
+            parent, _, name = rel_dir.rpartition("/")
+            # a listed parent already says if it's there, so only list what's known to be
+            if rel_dir in self.missing or (parent in self.subdirs and name not in self.subdirs[parent]) \
+                    or not self._list(rel_dir):
+                self.syscalls += 1
+                try:
+                    os.mkdir(self.path(rel_dir))
+                except FileExistsError:
+                    # on a case-insensitive drive, something renamed only by case is still there under its old name
+                    pass
+                self.missing.discard(rel_dir)
+                self.existing[rel_dir] = set()
+                self.subdirs[rel_dir] = set()
+                if parent in self.subdirs and rel_dir != "":
+                    self.subdirs[parent].add(name)
+                self._sorted_dirs = None
+        self.planned.clear()
+
+    def export(self, rel_dir: str, name: str, contents: str, progress: ProgressTracker) -> bool:
+        """Write a rendered document, unless the file on disk already holds exactly that. Returns if it was written."""
+        path = self.path(rel_dir + "/" + name if rel_dir != "" else name)
+        files = self.existing[rel_dir]
+        if name in files:
+            self.syscalls += 1
+            with open(path, encoding="utf-8") as existing:
+                if existing.read() == contents:
+                    progress.set_status("Unchanged " + path)
+                    return False
+        self.syscalls += 1
+        with open(path, mode="w", encoding="utf-8") as out:
+            out.write(contents)
+            progress.set_status("Exported " + path + "!")
+        files.add(name)
+        return True
+
+    def subplan(self, rel_dir: str) -> "OutputPlan":
+        """A plan for just one directory of the tree, small enough to hand to a worker process."""
+        if self._sorted_dirs is None:
+            self._sorted_dirs = sorted(self.existing.keys())
+        ret = OutputPlan(self.project_root)
+        # everything under it sorts right after it, though "a b" can land between "a" and "a/b"
+        index = bisect_left(self._sorted_dirs, rel_dir)
+        while index < len(self._sorted_dirs) and self._sorted_dirs[index].startswith(rel_dir):
+            key = self._sorted_dirs[index]
+            if key == rel_dir or key.startswith(rel_dir + "/"):
+                ret.existing[key] = set(self.existing[key])
+                ret.subdirs[key] = set(self.subdirs[key])
+            index += 1
+        return ret
@@ -0,0 +1,197 @@
+"""
+Keeps a .gbsproj in sync with a .kdl tree, reparsing only the parts of the tree that changed.
+"""
+
+import os
+import time
+import traceback
+from typing import Dict, List, Optional, Set, Tuple
+
+from .dsl.actor import Actor
+from .dsl.cache import CACHE_DIR, DocumentCache, load_document, load_documents
+from .dsl.event import CustomEvent, Event
+from .dsl.marshalling import ID_TABLE, dump_fields
+from .dsl.project import Project, ProjectNameUtil, parse_scene_dir
+from .dsl.scene import Scene
+from .dsl.trigger import Trigger
+from .dsl.util import RANDOM_IDS, SCENE, IdSource, ProgressTracker
+
+Fingerprints = Dict[str, Tuple[int, int]]
+
+
+class ProjectWatcher:
+    """
+    Holds a parsed project and its names in memory. Every poll compares the mtime and size of each .kdl file in the
+    tree against the last poll, and only reparses what changed:
+     - a file in an actor or trigger folder reparses just that actor or trigger
+     - any other file in a scene folder, or an actor or trigger being added or removed, reparses that scene
+     - a custom event file reparses that event, plus every scene that calls it, since its script gets inlined there
+    Anything that changes the project-level names (the top-level files, or a scene or custom event being added,
+    removed or renamed) falls back to parsing the whole tree again.
+    """
+
+    def __init__(self, project_root: str, project_file: str, progress: ProgressTracker, jobs: int = 1,
+                 cache: Optional[DocumentCache] = None, ids: IdSource = RANDOM_IDS):
+        self.project_root = project_root
+        self.project_file = project_file
+        self.progress = progress
+        self.jobs = jobs
+        self.cache = cache
+        self.ids = ids
+        self.project: Optional[Project] = None
+        self.names: Optional[ProjectNameUtil] = None
+        self.fingerprints: Optional[Fingerprints] = None
+        self.stale = True
+        self.backed_up = False
+
+    def scan(self) -> Fingerprints:
+        ret = {}
+        dirs = [""]
+        while len(dirs) > 0:
+            rel_dir = dirs.pop()
+            for entry in os.scandir(self.project_root + "/" + rel_dir if rel_dir != "" else self.project_root):
+                path = rel_dir + "/" + entry.name if rel_dir != "" else entry.name
+                if entry.is_dir():
+                    if entry.name != CACHE_DIR:
+                        dirs.append(path)
+                elif entry.name.endswith(".kdl"):
+                    stat = entry.stat()
+                    ret[path] = (stat.st_mtime_ns, stat.st_size)
+        return ret
+
+    def poll(self) -> bool:
+        """Bring the .gbsproj up to date with the tree if anything changed. Returns if it was written."""
+        fingerprints = self.scan()
+        if fingerprints == self.fingerprints:
+            return False
+        old = self.fingerprints if self.fingerprints is not None else {}
+        self.fingerprints = fingerprints
+        changed = {k for k in fingerprints.keys() | old.keys() if fingerprints.get(k) != old.get(k)}
+        added_or_removed = fingerprints.keys() ^ old.keys()
+        try:
+            if self.stale or not self.update(changed, added_or_removed):
+                self.reparse()
+        except Exception as err:
+            # most likely a file that's halfway through being saved, so wait for the next change to try again
+            traceback.print_exc()
+            self.progress.log_error("Could not update project: " + str(err))
+            self.stale = True
+            return False
+        self.stale = False
+        self.write()
+        return True
+
+    def reparse(self):
+        # the old project is about to be thrown away, so drop its IDs too, or a long watch keeps every ID it ever saw
+        ID_TABLE.clear()
+        self.progress.set_status("Parsing project metadata and assets")
+        docs = load_documents(self.project_root, self.cache)
+        self.project, self.names = Project.parse_with_names(docs, self.project_root, self.progress, self.jobs,
+                                                            self.cache, self.ids)
+        if self.cache is not None:
+            self.cache.prune()  # the whole tree just got loaded, so whatever wasn't is for a file that's gone
+
+    def update(self, changed: Set[str], added_or_removed: Set[str]) -> bool:
+        """Reparse only what changed. Returns False if the whole tree has to be parsed again instead."""
+        scene_dirs: Set[str] = set()
+        entity_dirs: Dict[str, Set[Tuple[str, str]]] = {}
+        event_files: Set[str] = set()
+        for path in changed:
+            parts = path.split("/")
+            if parts[0] == "custom-events" and len(parts) == 2 and path not in added_or_removed:
+                event_files.add(path)
+            elif parts[0] == "scenes" and len(parts) >= 3:
+                if parts[2] == "meta.kdl" and path in added_or_removed:
+                    return False  # a whole scene was added or removed
+                if len(parts) == 5 and parts[2] in ["actors", "triggers"] and parts[4] != "meta.kdl":
+                    entity_dirs.setdefault(parts[1], set()).add((parts[2], parts[3]))
+                else:
+                    scene_dirs.add(parts[1])
+            else:
+                return False
+        for path in sorted(event_files):
+            self.progress.set_status("Parsing custom event '" + path.split("/")[-1] + "'")
+            event = CustomEvent.parse(load_document(self.project_root + "/" + path, self.cache), self.names,
+                                      self.progress)
+            id = ID_TABLE.to_str(event.id)
+            renamed = self.names.custom_event_names.get(id) != event.name
+            if renamed or not 0 <= event.proj_index < len(self.project.custom_events):
+                return False
+            self.project.custom_events[event.proj_index] = event
+            self.names.add_event_script(id, event.name, [i.protofy() for i in event.script])
+            for scene in self.project.scenes:
+                if _scene_calls_custom_event(scene, id):
+                    scene_dirs.add(self.names.scene_for_id(ID_TABLE.to_str(scene.id)))
+        for dir in sorted(scene_dirs):
+            scene = parse_scene_dir(self.names, self.project_root + "/scenes/" + dir, self.progress, self.cache)
+            renamed = self.names.to_id[SCENE].get(dir) != ID_TABLE.to_str(scene.id)
+            if renamed or not 0 <= scene.proj_index < len(self.project.scenes):
+                return False
+            self.project.scenes[scene.proj_index] = scene
+        scenes_by_id = {ID_TABLE.to_str(i.id): i for i in self.project.scenes}
+        for dir, entities in sorted(entity_dirs.items()):
+            if dir in scene_dirs:
+                continue
+            if dir not in self.names.to_id[SCENE] or self.names.to_id[SCENE][dir] not in scenes_by_id:
+                return False
+            scene = scenes_by_id[self.names.to_id[SCENE][dir]]
+            scene_dir = self.project_root + "/scenes/" + dir
+            scene_names, _, _ = Scene.parse_names(self.names, scene_dir, self.progress, self.cache)
+            for kind, entity in sorted(entities):
+                self.progress.set_status("Parsing scripts for scene " + dir + " " + kind[:-1] + " '" + entity + "'")
+                docs = load_documents(scene_dir + "/" + kind + "/" + entity, self.cache)
+                path = "scenes/" + dir + "/" + kind + "/" + entity
+                if kind == "actors":
+                    actor = Actor.parse(docs, scene_names, self.progress, path)
+                    if not 0 <= actor.scene_index < len(scene.actors):
+                        return False
+                    scene.actors[actor.scene_index] = actor
+                else:
+                    trigger = Trigger.parse(docs, scene_names, self.progress, path)
+                    if not 0 <= trigger.scene_index < len(scene.triggers):
+                        return False
+                    scene.triggers[trigger.scene_index] = trigger
+        return True
+
+    def write(self):
+        if not self.backed_up and os.path.exists(self.project_file):
+            if os.path.exists(self.project_file + ".bak"):
+                os.remove(self.project_file + ".bak")
+            os.rename(self.project_file, self.project_file + ".bak")
+        self.backed_up = True
+        # write next to it and swap it in, so GB Studio never sees a half-written project
+        temp_file = self.project_file + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as out:
+            dump_fields(self.project.fields(), out)
+        os.replace(temp_file, self.project_file)
+
+
+def _calls_custom_event(events: List[Event], id: str) -> bool:
+    for event in events:
+        if event.command.info.is_custom_event_call and event.args["customEventId"] == id:
+            return True
+        if event.children is not None and any(_calls_custom_event(v, id) for v in event.children.values()):
+            return True
+    return False
+
+
+def _scene_calls_custom_event(scene: Scene, id: str) -> bool:
+    scripts = [scene.script, scene.player_hit1_script, scene.player_hit2_script, scene.player_hit3_script]
+    for actor in scene.actors:
+        scripts.extend([actor.script, actor.start_script, actor.update_script, actor.hit1_script, actor.hit2_script,
+                        actor.hit3_script])
+    for trigger in scene.triggers:
+        scripts.append(trigger.script)
+    return any(_calls_custom_event(i, id) for i in scripts)
+
+
+def watch_project(project_root: str, project_file: str, progress: ProgressTracker, jobs: int = 1,
+                  use_cache: bool = False, interval: float = 0.25, derive_ids: bool = False):
+    cache = DocumentCache(project_root) if use_cache else None
+    watcher = ProjectWatcher(project_root, project_file, progress, jobs, cache, IdSource(derive_ids))
+    progress.set_status("Watching " + project_root + " for changes, press Ctrl+C to stop")
+    while True:
+        start = time.monotonic()
+        if watcher.poll():
+            progress.set_status("Project converted to JSON! Took " + str(round(time.monotonic() - start, 3)) + "s")
+        time.sleep(interval)
@@ -31,7 +31,7 @@ setuptools.setup(
         "Topic :: Software Development :: Build Tools",
         "Typing :: Typed"
     ],
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=["benchmarks", "benchmarks.*"]),
     python_requires=">3.6",
     install_requires=[
         "kdl-py"
@@ -0,0 +1,13 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_command_index_up_to_date():
+    """gbstoolkit/dsl/command/index.py has to be regenerated after adding, renaming or moving a command."""
+    result = subprocess.run([sys.executable, "-m", "gbstoolkit.dsl.command", "--check"], cwd=ROOT,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr + \
+        "Run `python -m gbstoolkit.dsl.command` to regenerate it."